@@ -1,79 +1,164 @@
 import maya.cmds as cmds
 import maya.mel as mel
 import json
+import os
+import hashlib
+import tempfile
+import time
+import contextlib
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+import numpy as np
 
 
 # Script used to setup iouri anim before export to marvelous and houdini
 
-#def to get objects with namespace
-def find_object_with_namespace(base_name):
-    objects = cmds.ls(f"*:{base_name}") or cmds.ls(base_name)
-    if not objects:
-        raise ValueError(f"Object '{base_name}' isn't found")
-    return objects[0]
+@contextlib.contextmanager
+def timed_span(name, **info):
+    """Prints how long a step of the bake took (same calls as the profiler of ULTIMATE_EXPORTER)."""
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        print(f"{name}: {time.perf_counter() - start:.2f}s")
+
+
+# Iouri's hierarchy, indexed once per run so every step of the baker resolves names with a dict lookup
+iouri_index = {}
+
+def build_iouri_index():
+    """Indexes every Iouri in the scene as {namespace: {short name: full path}}, with one listRelatives per rig."""
+    iouri_index.clear()
+    for root in cmds.ls("Iouri_Iouri", recursive=True, long=True) or []:
+        namespace = root.rsplit("|", 1)[-1].rpartition(":")[0]
+        nodes = {}
+        for path in cmds.listRelatives(root, allDescendents=True, fullPath=True) or []:
+            nodes.setdefault(path.rsplit("|", 1)[-1].rpartition(":")[2], path)
+        iouri_index[namespace] = nodes
+    return iouri_index
+
+def get_iouri_index():
+    """Returns the Iouri index, building it if this run didn't yet."""
+    return iouri_index or build_iouri_index()
+
+def find_iouri_node(base_name, namespace):
+    """Returns the full path of a node from the given Iouri's hierarchy (namespace ignored in base_name)."""
+    node = get_iouri_index().get(namespace, {}).get(base_name)
+    if not node:
+        raise ValueError(f"Object '{base_name}' isn't found in Iouri '{namespace}'")
+    return node
+
+# Bake engine used by bake_selected_animation: "bakeResults" (steps the scene, safe with simulations)
+# or "openmaya" (samples the plugs with the API and writes the curves directly, much faster)
+BakeEngine = "bakeResults"
+BakeTolerance = 1e-4
+
+# Cloth pose loaded 100 frames before the first key
+ClothPoseFile = "S:\\SIC3D\\SIC5\\Projects\\KAMARADE\\02-PROD\\SCRIPTS\\Hubert\\ClothPose.json"  # Adjust path to the pose file
+
+# Baked keys are reduced after the bake, a key is dropped when the curve stays within this error without it (UI units)
+KeyReduction = True
+KeyReductionTolerance = {
+    "animCurveTA": 0.05,   # degrees
+    "animCurveTL": 0.01,   # scene distance unit
+    "animCurveTU": 0.001,
+}
+
+# Bake QC, spikes are measured in robust z-scores (median/MAD of the channel over the shot)
+QcOutlierThreshold = 8.0
+QcScaleFloor = 0.01  # Smallest spread a channel is given, so nearly static channels don't flag every wobble
+QcRangeScaleFloor = 0.05  # Same, relative to the channel's range over the shot, for channels that hold still most of the time
+QcFlipThreshold = 90.0  # Degrees in one frame
+QcPrerollSpeedRatio = 1.0  # The pre-roll shouldn't move faster than the shot does
+
+# Space attributes that have to be put back after loading the cloth pose, per side
+SPACE_ATTRIBUTES = [
+    ("arm_{side}_ctl", "OrientSpace"),
+    ("arm_{side}_PV_ctl", "ParentSpace"),
+    ("hand_{side}_IK_ctl", "ParentSpace"),
+    ("leg_{side}_PV_ctl", "ParentSpace"),
+    ("ankle_{side}_IK_ctl", "ParentSpace"),
+]
+
+# Rig manifests (controllers, keyable attributes and defaults) are discovered once per rig file version
+RigManifestDirectory = "S:\\SIC3D\\SIC5\\Projects\\KAMARADE\\02-PROD\\SCRIPTS\\Hubert\\RigManifests"
+CONTROLLER_SET = "Iouri_Controllers"  # Used first if the rig has it
+CONTROLLER_SUFFIXES = ("_ctl", "_ctrl")
+EXTRA_CONTROLLERS = ["FLY", "TRAJ", "WORLD"]  # Top controllers that don't follow the naming
+rig_manifests = {}
+rig_file_hashes = {}
+
+def get_rig_file_hash(rig_file):
+    """Hashes the rig file content, once per file version and Maya session."""
+    stat = os.stat(rig_file)
+    key = (rig_file, stat.st_mtime, stat.st_size)
+    if key not in rig_file_hashes:
+        file_hash = hashlib.sha1()
+        with open(rig_file, "rb") as rig:
+            for chunk in iter(lambda: rig.read(16 * 1024 * 1024), b""):
+                file_hash.update(chunk)
+        rig_file_hashes[key] = file_hash.hexdigest()
+    return rig_file_hashes[key]
+
+def discover_rig_controllers(namespace):
+    """Finds the controllers of an Iouri (set, controller tags, then naming) with their keyable attributes and defaults."""
+    nodes = get_iouri_index()[namespace]
+    prefix = f"{namespace}:" if namespace else ""
+
+    controllers = []
+    if cmds.objExists(prefix + CONTROLLER_SET):
+        controllers = cmds.sets(prefix + CONTROLLER_SET, q=True) or []
+    if not controllers:
+        tags = cmds.ls(prefix + "*", type="controller") or []
+        controllers = cmds.listConnections([f"{tag}.controllerObject" for tag in tags], source=True, destination=False) or []
+    if not controllers:
+        controllers = [path for name, path in nodes.items() if name.endswith(CONTROLLER_SUFFIXES) or name in EXTRA_CONTROLLERS]
+
+    manifest = {}
+    for ctrl in cmds.ls(controllers, type="transform", long=True) or []:
+        short_name = ctrl.rsplit("|", 1)[-1].rpartition(":")[2]
+        if nodes.get(short_name) != ctrl:
+            continue  # Not part of this Iouri
+        attrs = cmds.listAttr(ctrl, keyable=True, unlocked=True) or []
+        manifest[short_name] = {attr: (cmds.attributeQuery(attr, node=ctrl, listDefault=True) or [0.0])[0] for attr in attrs}
+    return dict(sorted(manifest.items()))
+
+def get_rig_manifest(namespace):
+    """Returns {controller: {attr: default}} for an Iouri, from the on-disk cache when the rig file didn't change."""
+    if namespace in rig_manifests:
+        return rig_manifests[namespace]
+
+    root = cmds.ls(f"{namespace}:Iouri_Iouri" if namespace else "Iouri_Iouri", long=True)[0]
+    manifest_path = None
+    if cmds.referenceQuery(root, isNodeReferenced=True):
+        rig_file = cmds.referenceQuery(root, filename=True, withoutCopyNumber=True)
+        manifest_path = os.path.join(RigManifestDirectory, f"{get_rig_file_hash(rig_file)}.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r") as manifest_file:
+                rig_manifests[namespace] = json.load(manifest_file)["controllers"]
+            return rig_manifests[namespace]
+
+    controllers = discover_rig_controllers(namespace)
+    if manifest_path:
+        # Written next to the final name then renamed, so other artists never read half a file
+        os.makedirs(RigManifestDirectory, exist_ok=True)
+        temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as manifest_file:
+            json.dump({"rig_file": rig_file, "controllers": controllers}, manifest_file, indent=4)
+        os.replace(temp_path, manifest_path)
+        print(f"Rig manifest written for {rig_file}: {len(controllers)} controllers")
+    else:
+        print(f"Iouri '{namespace}' isn't referenced, controllers discovered without caching")
+    rig_manifests[namespace] = controllers
+    return controllers
 
 def select_iouri_controllers():
-    """Selects Iouri's controllers."""
-    controllers = [
-        "COG_ctl", "FLY", "TRAJ", "WORLD", "ankle_L_IK_ctl", "ankle_R_IK_ctl", "armMid_L_ctl", "armMid_R_ctl", "arm_L_IK_ctl", 
-        "arm_L_PV_ctl", "arm_L_ctl", "arm_L_options_ctl", "arm_L_pin_ctrl", "arm_L_tweaker01_ctl", "arm_L_tweaker02_ctl", 
-        "arm_L_tweaker03_ctl", "arm_L_tweaker04_ctl", "arm_R_IK_ctl", "arm_R_PV_ctl", "arm_R_ctl", "arm_R_options_ctl", 
-        "arm_R_pin_ctrl", "arm_R_tweaker01_ctl", "arm_R_tweaker02_ctl", "arm_R_tweaker03_ctl", "arm_R_tweaker04_ctl", 
-        "bottomSpine_IK_ctl", "breath_ctl", "button_L0_ctl", "button_L1_ctl", "button_R0_ctl", "button_R1_ctl", "cheek_L0_ctl", 
-        "cheek_L1_ctl", "cheek_L2_ctl", "cheek_L3_ctl", "cheek_L_main_ctl", "cheek_R0_ctl", "cheek_R1_ctl", "cheek_R2_ctl", 
-        "cheek_R3_ctl", "cheek_R_main_ctl", "clav_L_ctl", "clav_R_ctl", "collar_C0_ctl", "collar_C1_ctl", "collar_L0_ctl", 
-        "collar_L1_ctl", "collar_L2_ctl", "collar_R0_ctl", "collar_R1_ctl", "collar_R2_ctl", "collar_orient_L_ctl", 
-        "collar_orient_R_ctl", "collar_orient_back_ctl", "collar_orient_front_ctl", "ear_L_ctl", "ear_R_ctl", "elbow_L_ctl", 
-        "elbow_R_ctl", "eye_L00_ctl", "eye_L_L_ctl", "eye_R00_ctl", "eye_R_L_ctl", "eyebrow_L_ctl", "eyebrow_R_ctl", 
-        "eyebrow_xtra_L0_ctl", "eyebrow_xtra_L1_ctl", "eyebrow_xtra_L2_ctl", "eyebrow_xtra_L3_ctl", "eyebrow_xtra_R0_ctl", 
-        "eyebrow_xtra_R1_ctl", "eyebrow_xtra_R2_ctl", "eyebrow_xtra_R3_ctl", "foot_L_ctl", "foot_R_ctl", "forearmMid_L_ctl", 
-        "forearmMid_R_ctl", "forearm_L_ctl", "forearm_L_tweaker01_ctl", "forearm_L_tweaker02_ctl", "forearm_L_tweaker03_ctl", 
-        "forearm_L_tweaker04_ctl", "forearm_R_ctl", "forearm_R_tweaker01_ctl", "forearm_R_tweaker02_ctl", "forearm_R_tweaker03_ctl", 
-        "forearm_R_tweaker04_ctl", "frown_ctl", "hand_L_IK_ctl", "hand_R_IK_ctl", "head_ctl", "head_option_ctl", "hip_L_IK_ctl", 
-        "hip_R_IK_ctl", "hips_IK_ctl", "hips_L_ctl", "hips_R_ctl", "jaw_C0_ctl", "jaw_rotate_ctl", "kneeMid_L_ctl", "kneeMid_R_ctl", 
-        "knee_L_ctl", "knee_L_tweaker01_ctl", "knee_L_tweaker02_ctl", "knee_L_tweaker03_ctl", "knee_L_tweaker04_ctl", "knee_R_ctl", 
-        "knee_R_tweaker01_ctl", "knee_R_tweaker02_ctl", "knee_R_tweaker03_ctl", "knee_R_tweaker04_ctl", "knee_ribbon_L_ctl", 
-        "knee_ribbon_R_ctl", "legMid_L_ctl", "legMid_R_ctl", "leg_L_PV_ctl", "leg_L_options_ctl", "leg_L_pin_ctrl", 
-        "leg_L_tweaker01_ctl", "leg_L_tweaker02_ctl", "leg_L_tweaker03_ctl", "leg_L_tweaker04_ctl", "leg_R_PV_ctl", 
-        "leg_R_options_ctl", "leg_R_pin_ctrl", "leg_R_tweaker01_ctl", "leg_R_tweaker02_ctl", "leg_R_tweaker03_ctl", 
-        "leg_R_tweaker04_ctl", "lids_down_L0_ctl", "lids_down_L1_ctl", "lids_down_L2_ctl", "lids_down_R0_ctl", 
-        "lids_down_R1_ctl", "lids_down_R2_ctl", "lids_down_main_L0_ctl", "lids_down_main_R0_ctl", "lids_side_L0_ctl", 
-        "lids_side_L1_ctl", "lids_side_R0_ctl", "lids_side_R_ctl", "lids_up_L0_ctl", "lids_up_L1_ctl", "lids_up_L2_ctl", "lids_up_R0_ctl", 
-        "lids_up_R1_ctl", "lids_up_R2_ctl", "lids_up_main_L0_ctl", "lids_up_main_R0_ctl", "lip_down_C0_ctl", "lip_down_L0_ctl", 
-        "lip_down_R0_ctl", "lip_side_L0_ctl", "lip_side_R0_ctl", "lip_up_C0_ctl", "lip_up_L0_ctl", "lip_up_R0_ctl", "lookAt_L_ctl", 
-        "lookAt_R_ctl", "lookAt_ctl", "lower_lip_ctrl", "lowerteeth_ctl", "meta_L_ctl", "meta_R_ctl", "metamiddle_L_ctl", 
-        "metamiddle_R_ctl", "metapinky_L_ctl", "metapinky_R_ctl", "metapointer_L_ctl", "metapointer_R_ctl", "metaring_L_ctl", 
-        "metaring_R_ctl", "midSpine_IK_ctl", "midSpine_ctl", "middle_01_L_ctl", "middle_01_R_ctl", "middle_02_L_ctl", 
-        "middle_02_R_ctl", "middle_03_L_ctl", "middle_03_R_ctl", "middle_L_IK_ctl", "middle_L_IK_pivot_ctl", "middle_L_pv_ctl", 
-        "middle_R_IK_ctl", "middle_R_IK_pivot_ctl", "middle_R_pv_ctl", "middle_base_L_ctl", "middle_base_R_ctl", "mouth_L_ctl", 
-        "mouth_R_ctl", "mouth_ctrl", "neck_01_ctl", "neck_02_ctl", "neck_03_ctl", "nose_ctl", "nostril_L_ctl", "nostril_R_ctl", 
-        "pinky_01_L_ctl", "pinky_01_R_ctl", "pinky_02_L_ctl", "pinky_02_R_ctl", "pinky_03_L_ctl", "pinky_03_R_ctl", "pinky_L_IK_ctl", 
-        "pinky_L_IK_pivot_ctrl", "pinky_L_pv_ctl", "pinky_R_IK_ctl", "pinky_R_IK_pivot_ctrl", "pinky_R_pv_ctl", "pinky_base_L_ctl", 
-        "pinky_base_R_ctl", "pointer_01_L_ctl", "pointer_01_R_ctl", "pointer_02_L_ctl", "pointer_02_R_ctl", "pointer_03_L_ctl", 
-        "pointer_03_R_ctl", "pointer_L_IK_ctl", "pointer_L_IK_pivot_ctl", "pointer_L_pv_ctl", "pointer_R_IK_ctl", 
-        "pointer_R_IK_pivot_ctl", "pointer_R_pv_ctl", "pointer_base_L_ctl", "pointer_base_R_ctl", "ring_01_L_ctl", 
-        "ring_01_R_ctl", "ring_02_L_ctl", "ring_02_R_ctl", "ring_03_L_ctl", "ring_03_R_ctl", "ring_L_IK_ctl", "ring_L_IK_pivot_ctrl", "ring_L_pv_ctl", 
-        "ring_R_IK_ctl", "ring_R_IK_pivot_ctrl", "ring_R_pv_ctl", "ring_base_L_ctl", "ring_base_R_ctl", "spine_L_options_ctl", "spine_tweak_01_ctl", 
-        "spine_tweak_02_ctl", "spine_tweak_03_ctl", "spine_tweak_04_ctl", "spine_tweak_05_ctl", "throat_ctl", "thumb_01_L_ctl", "thumb_01_R_ctl", 
-        "thumb_02_L_ctl", "thumb_02_R_ctl", "thumb_03_L_ctl", "thumb_03_R_ctl", "thumb_L_IK_ctl", "thumb_L_IK_pivot_ctl", "thumb_L_pv_ctl", "thumb_R_IK_ctl", 
-        "thumb_R_IK_pivot_ctl", "thumb_R_pv_ctl", "thumb_base_L_ctl", "thumb_base_R_ctl", "toes_L_ctl", "toes_R_ctl", "tongue_01_ctl", "tongue_02_ctl", 
-        "tongue_03_ctl", "tongue_04_ctl", "tongue_05_ctl", "topSpine_IK_ctl", "topSpine_ctl", "upper_lip_ctrl", "upperteeth_ctl", "wrist_L_ctl", "wrist_R_ctl"
-
-    ]
-    
+    """Selects Iouri's controllers, as listed in each rig's manifest."""
     selected_controls = []
-    iouri_children = cmds.listRelatives("Iouri_Iouri", allDescendents=True, fullPath=True) or []   
-    
-    for ctrl in controllers:
-        # Find all possible matches for this controller name
-        all_matches = cmds.ls(f"*:{ctrl}") or cmds.ls(ctrl)
-        
-        # Find the first match that's in Iouri's hierarchy
-        for match in all_matches:
-            full_path = cmds.ls(match, long=True)[0]
-            if full_path in iouri_children:
-                selected_controls.append(match)
-                break
+    # Fresh index for this run, every Iouri in the scene gets its controllers selected
+    rig_manifests.clear()
+    for namespace, nodes in build_iouri_index().items():
+        selected_controls.extend(nodes[ctrl] for ctrl in get_rig_manifest(namespace) if ctrl in nodes)
     
     if selected_controls:
         cmds.select(selected_controls, replace=True)
@@ -86,69 +171,579 @@ def select_iouri_controllers():
 select_iouri_controllers()
 
 
-def switch_to_ik(side):
+# IK controller matched on each FK node, in order: the FK arm, the elbow for the pole vector, the wrist locator for the hand
+IK_MATCH_TARGETS = [
+    ("arm_{side}_IK_ctl", "arm_{side}_ctl"),
+    ("arm_{side}_PV_ctl", "elbow_{side}_ctl"),
+    ("hand_{side}_IK_ctl", "wrist_{side}_ik_loc"),
+]
+TRANSFORM_CHANNELS = ["translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ", "scaleX", "scaleY", "scaleZ"]
+
+
+def get_matrix(node, attr, context=om.MDGContext.kNormal):
+    """Reads a matrix attribute of a node, optionally at another time."""
+    plug = om.MSelectionList().add(f"{node}.{attr}").getPlug(0)
+    return om.MFnMatrixData(plug.asMObject(context)).matrix()
+
+
+def compute_ik_match(namespace, side, context=om.MDGContext.kNormal):
+    """Returns {IK controller: 9 channel values (internal units)} putting the IK arm on the FK arm, matrices only.
+
+    Reads every matrix before anything moves: when a controller is under another one of the list,
+    its parent matrix is carried by the new world matrix of that controller.
+    """
+    new_worlds = {}
+    channels = {}
+    for target_name, source_name in IK_MATCH_TARGETS:
+        target = find_iouri_node(target_name.format(side=side), namespace)
+        source = find_iouri_node(source_name.format(side=side), namespace)
+        world = get_matrix(source, "worldMatrix[0]", context)
+        parent_world = get_matrix(target, "offsetParentMatrix", context) * get_matrix(target, "parentMatrix[0]", context)
+
+        ancestors = [node for node in new_worlds if target.startswith(node + "|")]
+        if ancestors:
+            old_ancestor_world, new_ancestor_world = new_worlds[max(ancestors, key=len)]
+            parent_world = parent_world * old_ancestor_world.inverse() * new_ancestor_world
+        new_worlds[target] = (get_matrix(target, "worldMatrix[0]", context), world)
+
+        local = om.MTransformationMatrix(world * parent_world.inverse())
+        rotate_order = om.MSelectionList().add(f"{target}.rotateOrder").getPlug(0).asInt()
+        rotation = local.rotation().reorder(rotate_order)
+        channels[target] = [*local.translation(om.MSpace.kTransform), rotation.x, rotation.y, rotation.z,
+                            *local.scale(om.MSpace.kTransform)]
+    return channels
+
+
+def get_free_plugs(node):
+    """Transform channel plugs of a node that can take a value: not locked, and not driven by anything else than a curve."""
+    plugs = {}
+    for attr in TRANSFORM_CHANNELS:
+        plug = om.MSelectionList().add(f"{node}.{attr}").getPlug(0)
+        if plug.isLocked or (plug.isDestination and not plug.source().node().hasFn(om.MFn.kAnimCurve)):
+            continue
+        plugs[attr] = plug
+    return plugs
+
+
+def get_curve_type(plug):
+    """Animation curve type for a plug, and the factor from its UI units to internal units."""
+    if plug.attribute().hasFn(om.MFn.kUnitAttribute):
+        unit_type = om.MFnUnitAttribute(plug.attribute()).unitType()
+        if unit_type == om.MFnUnitAttribute.kAngle:
+            return "animCurveTA", om.MAngle(1.0, om.MAngle.uiUnit()).asRadians()
+        if unit_type == om.MFnUnitAttribute.kDistance:
+            return "animCurveTL", om.MDistance(1.0, om.MDistance.uiUnit()).asCentimeters()
+    return "animCurveTU", 1.0
+
+
+def create_curve(plug, plug_name, times, values):
+    """Connects a new animation curve holding the keys to the plug, values in internal units. Made with commands so it undoes."""
+    curve_type, scale = get_curve_type(plug)
+    # Same names as bakeResults gives its curves
+    curve = cmds.createNode(curve_type, name=plug.partialName(includeNodeName=True, useLongNames=True).replace(".", "_").replace(":", "_"), skipSelect=True)
+    # Same as a .ma file, every time/value pair of the curve in one setAttr
+    cmds.setAttr(f"{curve}.ktv[0:{len(times) - 1}]", *np.column_stack([times, np.asarray(values) / scale]).ravel().tolist())
+    cmds.connectAttr(f"{curve}.output", plug_name, force=True)
+    return curve
+
+
+def switch_arms_to_ik(arms):
+    """Matches the IK arms on the FK arms and turns SwitchIK on, for every (namespace, side).
+
+    Every match is computed before anything moves, then set with setAttr so it undoes with the rest of the bake.
+    """
     try:
-        # Get Objects with right side and namespaces
-        arm_options_ctl = find_object_with_namespace(f"arm_{side}_options_ctl")
-        arm_ctl = find_object_with_namespace(f"arm_{side}_ctl")
-        arm_ik = find_object_with_namespace(f"arm_{side}_ik")
-        elbow_ctl = find_object_with_namespace(f"elbow_{side}_ctl")
-        elbow_ik = find_object_with_namespace(f"elbow_{side}_ik")
-        wrist_ctl = find_object_with_namespace(f"wrist_{side}_ctl")
-        wrist_ik = find_object_with_namespace(f"wrist_{side}_ik")
-        arm_ik_ctl = find_object_with_namespace(f"arm_{side}_IK_ctl")
-        arm_pv_ctl = find_object_with_namespace(f"arm_{side}_PV_ctl")
-        hand_ik_ctl = find_object_with_namespace(f"hand_{side}_IK_ctl")
-        wrist_ik_loc = find_object_with_namespace(f"wrist_{side}_ik_loc")
+        matches = [compute_ik_match(namespace, side) for namespace, side in arms]
+        switches = [find_iouri_node(f"arm_{side}_options_ctl", namespace) for namespace, side in arms]
     except ValueError as e:
         cmds.error(str(e))
 
-
-    # Switch from FK to IK
-    cmds.matchTransform(arm_ik_ctl, arm_ctl)
-    cmds.matchTransform(arm_pv_ctl, elbow_ctl)
-    cmds.matchTransform(hand_ik_ctl, wrist_ik_loc)
-
-    # Do the Switch IK
-    cmds.setAttr(f"{arm_options_ctl}.SwitchIK", 1)
+    for channels in matches:
+        for node, values in channels.items():
+            for attr, plug in get_free_plugs(node).items():
+                cmds.setAttr(f"{node}.{attr}", values[TRANSFORM_CHANNELS.index(attr)] / get_curve_type(plug)[1])
+    for arm_options_ctl in switches:
+        cmds.setAttr(f"{arm_options_ctl}.SwitchIK", 1)
+
+
+def match_ik_over_range(arms, start_frame, end_frame):
+    """Keys the IK arms on the FK arms on every frame of the range, for every (namespace, side). SwitchIK is left to the caller.
+
+    Each channel gets a new linear curve made with commands, the keys its old curve had outside the range are kept.
+    """
+    time_unit = om.MTime.uiUnit()
+    frames = np.arange(start_frame, end_frame + 1)
+    values = {}
+    for frame in frames:
+        context = om.MDGContext(om.MTime(float(frame), time_unit))
+        for namespace, side in arms:
+            for node, channels in compute_ik_match(namespace, side, context).items():
+                values.setdefault(node, []).append(channels)
+
+    new_curves = []
+    for node, node_values in values.items():
+        node_values = np.array(node_values)
+        for attr, plug in get_free_plugs(node).items():
+            times, keys = frames, node_values[:, TRANSFORM_CHANNELS.index(attr)]
+            if plug.isDestination:
+                old_curve = om.MFnDependencyNode(plug.source().node()).name()
+                old_times, old_values = read_curves([old_curve])[old_curve]
+                outside = (old_times < start_frame) | (old_times > end_frame)
+                times = np.concatenate([old_times[outside], frames])
+                keys = np.concatenate([old_values[outside] * get_curve_type(plug)[1], keys])
+                order = np.argsort(times, kind="stable")
+                times, keys = times[order], keys[order]
+                if not cmds.ls(old_curve, readOnly=True):
+                    cmds.delete(old_curve)
+            new_curves.append(create_curve(plug, f"{node}.{attr}", times, keys))
+
+    if new_curves:
+        cmds.keyTangent(new_curves, inTangentType="linear", outTangentType="linear")
+
+
+# Poses are compiled once to NumPy arrays here, and recompiled when the JSON changes
+PoseCacheDirectory = os.path.join(tempfile.gettempdir(), "IouriPoseCache")
+
+
+def compile_pose(file_path):
+    """Returns the pose as arrays (controllers, controller_index, attributes, values), from the local cache when it's up to date."""
+    mtime = os.path.getmtime(file_path)
+    path_hash = hashlib.sha1(os.path.abspath(file_path).lower().encode("utf-8")).hexdigest()[:12]
+    cache_path = os.path.join(PoseCacheDirectory, f"{os.path.splitext(os.path.basename(file_path))[0]}_{path_hash}.npz")
+
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cache:
+            if float(cache["mtime"]) == mtime:
+                return {key: cache[key] for key in ("controllers", "controller_index", "attributes", "values")}
+
+    with open(file_path, "r") as jsonFile:
+        pose_data = json.load(jsonFile)
+    entries = [(ctrl_index, attr, value) for ctrl_index, attrs in enumerate(pose_data.values()) for attr, value in attrs.items()]
+    pose = {
+        "controllers": np.array(list(pose_data), dtype=str),
+        "controller_index": np.array([entry[0] for entry in entries], dtype=np.int32),
+        "attributes": np.array([entry[1] for entry in entries], dtype=str),
+        "values": np.array([entry[2] for entry in entries], dtype=np.float64),
+    }
+
+    # Written next to the cache then swapped in, so another Maya never reads half a file
+    os.makedirs(PoseCacheDirectory, exist_ok=True)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+    np.savez(temp_path, mtime=mtime, **pose)
+    os.replace(temp_path, cache_path)
+    return pose
 
 
 def load_pose(file_path):
-    """Loads a pose from a JSON file and applies it to the corresponding controls, Iouri specific"""
+    """Loads a pose from a JSON file and applies it to the corresponding controls of every Iouri, as one undo step.
+
+    Every setAttr of the pose runs in one MEL script, each one caught on its own so a locked or connected plug only skips itself.
+    """
     try:
-        with open(file_path, "r") as jsonFile:
-            pose_data = json.load(jsonFile)
-        
-        # Get Iouri's hierarchy once (with full paths)
-        iouri_children = cmds.listRelatives("Iouri_Iouri", allDescendents=True, fullPath=True) or []
-        
-        for ctrl, attrs in pose_data.items():
-            # Find all possible matches for this controller name
-            all_matches = cmds.ls(f"*:{ctrl}") or cmds.ls(ctrl)
-            
-            # Find the first match that's in Iouri's hierarchy
-            target_ctrl = None
-            for match in all_matches:
-                full_path = cmds.ls(match, long=True)[0]
-                if full_path in iouri_children:
-                    target_ctrl = match
-                    break
-            
-            if target_ctrl:  # Only proceed if we found the correct controller
-                for attr, value in attrs.items():
-                    try:
-                        cmds.setAttr(f"{target_ctrl}.{attr}", value)
-                    except Exception as e:
-                        print(f"Could not set {target_ctrl}.{attr}: {e}")
-            else:
-                print(f"Control {ctrl} not found in Iouri's hierarchy")
-        
-        print(f"Pose loaded successfully from {file_path}")
+        pose = compile_pose(file_path)
+        controllers = pose["controllers"]
+        commands = []
+
+        for namespace, nodes in get_iouri_index().items():
+            targets = [nodes.get(ctrl) for ctrl in controllers]
+            for ctrl, target_ctrl in zip(controllers, targets):
+                if not target_ctrl:
+                    print(f"Control {ctrl} not found in Iouri '{namespace}' hierarchy")
+
+            for ctrl_index, attr, value in zip(pose["controller_index"], pose["attributes"], pose["values"]):
+                target_ctrl = targets[ctrl_index]
+                if target_ctrl:
+                    plug = f"{target_ctrl}.{attr}"
+                    commands.append(f'if (catch(`setAttr "{plug}" {float(value)!r}`)) warning "Could not set {plug}";')
+
+        # setAttr takes UI units, like the pose file, and converts the value for int, enum and bool attributes
+        cmds.undoInfo(openChunk=True, chunkName="load_pose")
+        try:
+            if commands:
+                mel.eval("\n".join(commands))
+        finally:
+            cmds.undoInfo(closeChunk=True)
+        print(f"Pose loaded successfully from {file_path} ({len(commands)} plugs)")
     except Exception as e:
         print(f"Failed to load pose: {e}")
 
 
-def bake_selected_animation():
+def bake_selected_animation(engine=None):
+    """Bakes the selected controllers and sets up the cloth pre-roll, as a single undo step.
+
+    engine is "bakeResults" or "openmaya", BakeEngine is used when it isn't given.
+    """
+    cmds.undoInfo(openChunk=True, chunkName="bake_selected_animation")
+    try:
+        with timed_span("bake_selected_animation total"):
+            bake_selected_animation_steps(engine or BakeEngine)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+
+def get_first_key_frames(anim_curves):
+    """Returns {first key frame: [curves]} for the given animation curves, read through the API (no command per curve)."""
+    selection = om.MSelectionList()
+    for curve in anim_curves:
+        selection.add(curve)
+    time_unit = om.MTime.uiUnit()
+    curves_by_first_key = {}
+    for index, curve in enumerate(anim_curves):
+        curve_fn = oma.MFnAnimCurve(selection.getDependNode(index))
+        if curve_fn.numKeys:
+            curves_by_first_key.setdefault(curve_fn.input(0).asUnits(time_unit), []).append(curve)
+    return curves_by_first_key
+
+
+def bake_with_openmaya(objects, start_frame, end_frame):
+    """Bakes every keyable plug of the objects: samples them with MDGContext, then writes each curve with one setAttr.
+
+    Doesn't step the scene like bakeResults(simulation=True), so anything simulated (nCloth, hair, dynamics)
+    still needs the bakeResults engine. A few frames are checked against the scene stepped like bakeResults does,
+    nothing is written and False is returned when they don't match. The curves are made with commands so the bake undoes.
+    """
+    selection = om.MSelectionList()
+    plug_names = []
+    for obj in objects:
+        for attr in cmds.listAttr(obj, keyable=True, unlocked=True) or []:
+            try:
+                selection.add(f"{obj}.{attr}")
+            except RuntimeError:
+                continue  # Compound/multi attributes listAttr gives but that can't be keyed as is
+            plug_names.append(f"{obj}.{attr}")
+    plugs = [selection.getPlug(index) for index in range(selection.length())]
+
+    # Sample every plug at every frame into one preallocated frames x plugs array (internal units)
+    time_unit = om.MTime.uiUnit()
+    frames = np.arange(start_frame, end_frame + 1)
+    values = np.empty((len(frames), len(plugs)))
+    for frame_index, frame in enumerate(frames):
+        context = om.MDGContext(om.MTime(float(frame), time_unit))
+        values[frame_index] = [plug.asDouble(context) for plug in plugs]
+
+    # Reference: the scene stepped to a few frames like bakeResults does, the samples have to give back the same values
+    current_time = cmds.currentTime(query=True)
+    check_frames = np.linspace(0, len(frames) - 1, min(len(frames), 5)).astype(int)
+    try:
+        for frame_index in check_frames:
+            cmds.currentTime(float(frames[frame_index]), update=True)
+            reference = np.array([plug.asDouble() for plug in plugs])
+            worst = np.abs(reference - values[frame_index]).max(initial=0.0)
+            if worst > BakeTolerance:
+                cmds.warning(f"OpenMaya bake differs from the scene by {worst} at frame {frames[frame_index]}, baking with bakeResults instead")
+                return False
+    finally:
+        cmds.currentTime(current_time, update=True)
+
+    # Replace whatever drove each plug (curve, constraint...) by a fresh curve holding all the samples
+    old_curves = cmds.listConnections(plug_names, type="animCurve", source=True, destination=False) or []
+    deletable = sorted(set(old_curves) - set(cmds.ls(old_curves, readOnly=True)))
+    if deletable:
+        cmds.delete(deletable)
+
+    # Curve type and UI units from each attribute, the samples are in internal units
+    new_curves = [create_curve(plug, plug_name, frames, values[:, plug_index])
+                  for plug_index, (plug, plug_name) in enumerate(zip(plugs, plug_names))]
+
+    if new_curves:
+        cmds.keyTangent(new_curves, inTangentType="linear", outTangentType="linear")
+    return True
+
+
+# Middle axis of each Maya rotate order (xyz, yzx, zxy, xzy, yxz, zyx), the one that flips in the gimbal alternative
+ROTATE_ORDER_MIDDLE_AXIS = [1, 2, 0, 2, 0, 1]
+TIME_CURVE_TYPES = ["animCurveTL", "animCurveTA", "animCurveTU", "animCurveTT"]
+
+
+def get_curve_connections(objects):
+    """Returns {(object, attribute): curve} for the time based curves driving the objects, in one query."""
+    connections = cmds.listConnections(objects, type="animCurve", source=True, destination=False, connections=True) or []
+    curves = {}
+    for plug, curve in zip(connections[0::2], connections[1::2]):
+        if cmds.nodeType(curve) in TIME_CURVE_TYPES:
+            obj, attr = plug.rsplit(".", 1)
+            curves[(obj, attr)] = curve
+    return curves
+
+
+def read_curves(anim_curves):
+    """Reads every key of the curves into NumPy arrays: {curve: (times, values)}, in UI units."""
+    curves = {}
+    for curve in anim_curves:
+        keys = cmds.keyframe(curve, query=True, timeChange=True, valueChange=True) or []
+        curves[curve] = (np.array(keys[0::2]), np.array(keys[1::2]))
+    return curves
+
+
+def write_curves(curves):
+    """Writes back curves read with read_curves: {curve: (times, values)} in UI units, linear keys.
+
+    The times are the curve's key times or some of them: the other keys are cut, then every value goes in one setAttr,
+    all through commands so it undoes with the rest of the bake.
+    """
+    for curve, (times, values) in curves.items():
+        kept = set(np.asarray(times).tolist())
+        dropped = [(frame, frame) for frame in cmds.keyframe(curve, query=True, timeChange=True) or [] if frame not in kept]
+        if dropped:
+            cmds.cutKey(curve, time=dropped, clear=True)
+        if len(times):
+            cmds.setAttr(f"{curve}.ktv[0:{len(times) - 1}]", *np.column_stack([times, values]).ravel().tolist())
+    if curves:
+        cmds.keyTangent(list(curves), inTangentType="linear", outTangentType="linear")
+
+
+def unwrap_euler(rotations, middle_axes):
+    """Euler filter for N rotations over K keys at once, (N, K, 3) in degrees.
+
+    Every key takes the closest equivalent of either its own angles or the gimbal alternative
+    (first + 180, 180 - middle, last + 180) to the previous filtered key.
+    """
+    filtered = rotations.copy()
+    alternative_scale = np.ones((len(rotations), 3))
+    alternative_scale[np.arange(len(rotations)), middle_axes] = -1.0
+
+    def closest(angles, reference):
+        return angles + 360.0 * np.round((reference - angles) / 360.0)
+
+    for key in range(1, rotations.shape[1]):
+        previous = filtered[:, key - 1]
+        same = closest(rotations[:, key], previous)
+        alternative = closest(rotations[:, key] * alternative_scale + 180.0, previous)
+        use_alternative = np.abs(alternative - previous).sum(axis=1) < np.abs(same - previous).sum(axis=1) - 1e-6
+        filtered[:, key] = np.where(use_alternative[:, None], alternative, same)
+    return filtered
+
+
+def euler_filter_curves(objects):
+    """Euler filters every rotate curve of the objects together in NumPy, and writes back only the curves that changed."""
+    curve_connections = get_curve_connections(objects)
+    rotate_curves = {key: curve for key, curve in curve_connections.items() if key[1] in ("rotateX", "rotateY", "rotateZ")}
+    curve_data = read_curves(rotate_curves.values())
+
+    # Objects with their three rotate curves keyed on the same frames are filtered together, as full rotations
+    groups = {}
+    single_curves = set(rotate_curves.values())
+    for obj in {obj for obj, attr in rotate_curves}:
+        curves = [rotate_curves.get((obj, attr)) for attr in ("rotateX", "rotateY", "rotateZ")]
+        if None in curves:
+            continue
+        times = curve_data[curves[0]][0]
+        if all(np.array_equal(curve_data[curve][0], times) for curve in curves[1:]):
+            groups.setdefault(times.tobytes(), []).append((obj, curves))
+            single_curves.difference_update(curves)
+
+    changed = {}
+    for members in groups.values():
+        times = curve_data[members[0][1][0]][0]
+        rotations = np.stack([np.stack([curve_data[curve][1] for curve in curves], axis=-1) for obj, curves in members])
+        middle_axes = [ROTATE_ORDER_MIDDLE_AXIS[cmds.getAttr(f"{obj}.rotateOrder")] for obj, curves in members]
+        filtered = unwrap_euler(rotations, middle_axes)
+        for member_index, (obj, curves) in enumerate(members):
+            for axis, curve in enumerate(curves):
+                if np.abs(filtered[member_index, :, axis] - rotations[member_index, :, axis]).max(initial=0.0) > 1e-6:
+                    changed[curve] = (times, filtered[member_index, :, axis])
+
+    # Lone rotate curves can only be unwrapped to the closest angle
+    for curve in single_curves:
+        times, values = curve_data[curve]
+        unwrapped = np.unwrap(values, period=360.0)
+        if np.abs(unwrapped - values).max(initial=0.0) > 1e-6:
+            changed[curve] = (times, unwrapped)
+
+    write_curves(changed)
+    print(f"Euler filter: {len(changed)} of {len(rotate_curves)} rotate curves fixed.")
+    return changed
+
+
+def get_pose_channels(objects, frame):
+    """Splits the curve driven channels of the objects into the ones to key at the pose frame and the static ones.
+
+    A channel is keyed when its curve moves, or when the pose or the IK switch moved it away from its curve.
+    """
+    curve_connections = get_curve_connections(objects)
+    curve_data = read_curves(curve_connections.values())
+    plugs = om.MSelectionList()
+    curves = om.MSelectionList()
+    for (obj, attr), curve in curve_connections.items():
+        plugs.add(f"{obj}.{attr}")
+        curves.add(curve)
+
+    time = om.MTime(float(frame), om.MTime.uiUnit())
+    animated, static = [], []
+    for index, ((obj, attr), curve) in enumerate(curve_connections.items()):
+        # Both values in internal units, the plug holds the posed value until the time changes
+        curve_value = oma.MFnAnimCurve(curves.getDependNode(index)).evaluate(time)
+        moved = abs(plugs.getPlug(index).asDouble() - curve_value) > BakeTolerance
+        if moved or np.ptp(curve_data[curve][1]) > BakeTolerance:
+            animated.append(f"{obj}.{attr}")
+        else:
+            static.append(f"{obj}.{attr}")
+    return animated, static
+
+
+def simplify_keys(times, values, tolerances, protected):
+    """Ramer-Douglas-Peucker over N curves sharing the same K key times, (N, K) values.
+
+    Every pass splits each segment at its worst key, for all the curves at once, until the linear
+    interpolation of the kept keys is within tolerance. Returns the (N, K) kept mask and the max error per curve.
+    """
+    curve_count, key_count = values.shape
+    keep = np.zeros((curve_count, key_count), dtype=bool)
+    keep[:, [0, -1]] = True
+    keep[:, protected] = True
+    key_index = np.arange(key_count)
+    while True:
+        # Previous and next kept key of every key
+        previous = np.maximum.accumulate(np.where(keep, key_index, 0), axis=1)
+        following = np.minimum.accumulate(np.where(keep, key_index, key_count - 1)[:, ::-1], axis=1)[:, ::-1]
+        start_values = np.take_along_axis(values, previous, axis=1)
+        end_values = np.take_along_axis(values, following, axis=1)
+        span = times[following] - times[previous]
+        weight = np.divide(times - times[previous], span, out=np.zeros_like(span), where=span > 0)
+        error = np.abs(values - (start_values + (end_values - start_values) * weight))
+        error[keep] = 0.0
+
+        rows, columns = np.nonzero(error > tolerances[:, None])
+        if not len(rows):
+            return keep, error.max(axis=1)
+        # Keep the worst key of every segment that is out of tolerance
+        segments = previous[rows, columns]
+        order = np.lexsort((-error[rows, columns], segments, rows))
+        rows, columns, segments = rows[order], columns[order], segments[order]
+        worst = np.ones(len(rows), dtype=bool)
+        worst[1:] = (rows[1:] != rows[:-1]) | (segments[1:] != segments[:-1])
+        keep[rows[worst], columns[worst]] = True
+
+
+def reduce_baked_keys(anim_curves, protect_until):
+    """Removes the baked keys that linear interpolation already gives within KeyReductionTolerance.
+
+    Keys up to protect_until (pose, pre-roll and first key) and the last key of every curve are always kept.
+    """
+    curve_types = {curve: curve_type for curve_type in KeyReductionTolerance
+                   for curve in cmds.ls(anim_curves, type=curve_type)}
+    curve_data = read_curves(curve_types)
+
+    # Curves keyed on the same frames are reduced together
+    groups = {}
+    for curve, (times, values) in curve_data.items():
+        groups.setdefault(times.tobytes(), []).append(curve)
+
+    reduced = {}
+    keys_before = keys_after = 0
+    max_error = 0.0
+    for curves in groups.values():
+        times = curve_data[curves[0]][0]
+        values = np.stack([curve_data[curve][1] for curve in curves])
+        tolerances = np.array([KeyReductionTolerance[curve_types[curve]] for curve in curves])
+        keep, errors = simplify_keys(times, values, tolerances, times <= protect_until)
+        keys_before += values.size
+        keys_after += int(keep.sum())
+        max_error = max(max_error, float(errors.max(initial=0.0)))
+        for curve_index, curve in enumerate(curves):
+            if not keep[curve_index].all():
+                reduced[curve] = (times[keep[curve_index]], values[curve_index, keep[curve_index]])
+
+    write_curves(reduced)
+    print(f"Key reduction: {keys_before} -> {keys_after} keys on {len(curve_data)} curves, max error {max_error:.5f}.")
+    return reduced
+
+
+def get_channel_matrix(objects, frames):
+    """Samples every curve driven channel of the objects on the frames: channel names and a frames x channels matrix (UI units)."""
+    curve_connections = get_curve_connections(objects)
+    curve_data = read_curves(curve_connections.values())
+    channels = [key for key, curve in curve_connections.items() if len(curve_data[curve][0])]
+    matrix = np.empty((len(frames), len(channels)))
+    for channel_index, channel in enumerate(channels):
+        times, values = curve_data[curve_connections[channel]]
+        matrix[:, channel_index] = np.interp(frames, times, values)  # Baked curves are linear, and constant outside their keys
+    return channels, matrix
+
+
+def run_bake_qc(objects):
+    """Checks the baked animation for what breaks cloth sims: velocity and acceleration spikes, flips, and a rough pre-roll.
+
+    Spikes are measured against each channel's own median/MAD over the shot, floored by a fraction of the channel's range.
+    Returns the report per controller, or None when there was nothing to check (no keys, shot too short).
+    """
+    start_frame = cmds.playbackOptions(q=True, min=True)
+    end_frame = cmds.playbackOptions(q=True, max=True)
+    first_frame = min(cmds.keyframe(objects, query=True, timeChange=True) or [start_frame])
+    frames = np.arange(np.floor(first_frame), end_frame + 1)
+    channels, matrix = get_channel_matrix(objects, frames)
+    # Needs at least one acceleration inside the shot, the medians of nothing would be NaN
+    if not channels or len(frames) < 3 or (frames[1:-1] <= start_frame).all():
+        return None
+
+    # velocity[i] goes from frames[i] to frames[i + 1], acceleration[i] is on frames[i + 1]
+    velocity = np.diff(matrix, axis=0)
+    acceleration = np.diff(velocity, axis=0)
+    in_shot_velocity = frames[1:] > start_frame
+    in_shot_acceleration = frames[1:-1] > start_frame
+    # Constant channels can't have spikes, they're left out rather than measured against a spread of 0
+    moving = np.ptp(matrix, axis=0) > 0
+    range_floor = np.maximum(QcRangeScaleFloor * np.ptp(matrix[frames >= start_frame], axis=0), QcScaleFloor)
+
+    def outliers(values, in_shot):
+        median = np.median(values[in_shot], axis=0)
+        scale = np.maximum(1.4826 * np.median(np.abs(values[in_shot] - median), axis=0), range_floor)
+        return (np.abs(values - median) > QcOutlierThreshold * scale) & in_shot[:, None] & moving, scale
+
+    velocity_outliers, velocity_scale = outliers(velocity, in_shot_velocity)
+    acceleration_outliers, acceleration_scale = outliers(acceleration, in_shot_acceleration)
+    is_rotation = np.array([attr.startswith("rotate") for obj, attr in channels])
+    flips = (np.abs(velocity) > QcFlipThreshold) & is_rotation & moving
+
+    # Pre-roll: not faster than the shot itself, and no jump where it hands over to the animation
+    preroll_speed = np.abs(velocity[~in_shot_velocity]).max(axis=0, initial=0.0)
+    shot_speed = np.abs(velocity[in_shot_velocity]).max(axis=0, initial=0.0)
+    preroll_too_fast = preroll_speed > np.maximum(shot_speed * QcPrerollSpeedRatio, QcScaleFloor)
+    join = np.abs(acceleration[frames[1:-1] == start_frame]).max(axis=0, initial=0.0)
+    shot_acceleration = np.abs(acceleration[in_shot_acceleration]).max(axis=0, initial=0.0)
+    preroll_jump = (join > np.maximum(QcOutlierThreshold * acceleration_scale, shot_acceleration)) & moving
+
+    report = {}
+    problems = {"velocity_outliers": velocity_outliers, "acceleration_outliers": acceleration_outliers, "flips": flips}
+    for problem, mask in problems.items():
+        offset = 2 if problem == "acceleration_outliers" else 1
+        for row, column in zip(*np.nonzero(mask)):
+            obj, attr = channels[column]
+            report.setdefault(obj, {}).setdefault(attr, {}).setdefault(problem, []).append(float(frames[row + offset]))
+    for column in np.nonzero(preroll_too_fast | preroll_jump)[0]:
+        obj, attr = channels[column]
+        report.setdefault(obj, {}).setdefault(attr, {}).update({
+            "preroll_max_speed": float(preroll_speed[column]),
+            "shot_max_speed": float(shot_speed[column]),
+            "preroll_join_acceleration": float(join[column]),
+        })
+
+    print(f"Bake QC: {len(report)} of {len({obj for obj, attr in channels})} controllers flagged "
+          f"({int(velocity_outliers.any(axis=0).sum())} channels with velocity spikes, "
+          f"{int(acceleration_outliers.any(axis=0).sum())} with acceleration spikes, {int(flips.any(axis=0).sum())} with flips, "
+          f"{int((preroll_too_fast | preroll_jump).sum())} with a rough pre-roll).")
+    return report
+
+
+def write_bake_qc_report(objects, report_path):
+    """Runs the bake QC on the objects and writes the per controller report as JSON."""
+    report = run_bake_qc(objects)
+    if report is None:
+        cmds.warning("Bake QC: no baked keys or shot too short, nothing was checked.")
+    with open(report_path, "w") as report_file:
+        json.dump({
+            # Nothing checked isn't a pass
+            "status": "not_checked" if report is None else "flagged" if report else "pass",
+            "frame_range": [cmds.playbackOptions(q=True, min=True), cmds.playbackOptions(q=True, max=True)],
+            "thresholds": {"outlier": QcOutlierThreshold, "range_floor": QcRangeScaleFloor, "flip": QcFlipThreshold,
+                           "preroll_speed_ratio": QcPrerollSpeedRatio},
+            "controllers": report or {},
+        }, report_file, indent=4)
+    print(f"Bake QC report written: {report_path}")
+    return report
+
+
+def bake_selected_animation_steps(engine):
     # Get the currently selected objects
     selected_objects = cmds.ls(selection=True)
 
@@ -156,12 +751,15 @@ def bake_selected_animation():
         cmds.warning("No objects selected. Please select objects to bake.")
         return
 
-    # Set bakeResults options (you can adjust these to your needs)
-    cmds.bakeResults(selected_objects,
-                     time=(cmds.playbackOptions(q=True, min=True), cmds.playbackOptions(q=True, max=True)),
-                     sampleBy=1,  # Adjust sample rate, 1 means every frame
-                     preserveOutsideKeys=True,
-                     simulation=True)  # Use the simulation flag
+    with timed_span(f"bake ({engine})", nodes=len(selected_objects)):
+        # The OpenMaya engine falls back to bakeResults when its samples don't match the scene
+        if not (engine == "openmaya" and bake_with_openmaya(selected_objects, cmds.playbackOptions(q=True, min=True), cmds.playbackOptions(q=True, max=True))):
+            # Set bakeResults options (you can adjust these to your needs)
+            cmds.bakeResults(selected_objects,
+                             time=(cmds.playbackOptions(q=True, min=True), cmds.playbackOptions(q=True, max=True)),
+                             sampleBy=1,  # Adjust sample rate, 1 means every frame
+                             preserveOutsideKeys=True,
+                             simulation=True)  # Use the simulation flag
     
     print("Baking complete for selected objects.")
     
@@ -169,72 +767,60 @@ def bake_selected_animation():
     anim_layers = cmds.ls(type='animLayer')
     
     if anim_layers and len(anim_layers) > 1:
-        for obj in selected_objects:
-            # Find animation layers connected to the object's animation curves
-            anim_curves = cmds.listConnections(obj, type="animCurve") or []
-            affected_layers = set()
-    
-            for curve in anim_curves:
-                layers = cmds.listConnections(curve, type="animLayer") or []
-                affected_layers.update(layers)
-    
-            # Skip if no animation layers are found
-            if not affected_layers:
-                continue
-    
-            # Remove animation layers except 'BaseAnimation'
-            for layer in affected_layers:
-                if layer != "BaseAnimation":
-                    try:
-                        cmds.setAttr(f"{layer}.lock", False)
-                        mel.eval(f'delete {layer}')
-                    except Exception as e:
-                        cmds.warning(f"Failed to delete layer {layer}: {str(e)}")
+        # Find animation layers connected to the objects' animation curves, in one query for every object
+        anim_curves = cmds.listConnections(selected_objects, type="animCurve") or []
+        affected_layers = set(cmds.listConnections(anim_curves, type="animLayer") or []) if anim_curves else set()
+
+        # Remove animation layers except 'BaseAnimation'
+        for layer in affected_layers:
+            if layer != "BaseAnimation":
+                try:
+                    cmds.setAttr(f"{layer}.lock", False)
+                    mel.eval(f'delete {layer}')
+                except Exception as e:
+                    cmds.warning(f"Failed to delete layer {layer}: {str(e)}")
                     
-    # Delete Every Frame out of range! 
+    # Delete Every Frame out of range! One cut before and one after the range, over every curve at once
     start_frame = cmds.playbackOptions(q=True, min=True)
     end_frame = cmds.playbackOptions(q=True, max=True)
-    
-    selected_objects = cmds.ls(selection=True)
-    if not selected_objects:
-        cmds.warning("No objects selected. Please select objects with animation.")
+
+    # Time based curves only, driven keys don't have frames to trim
+    anim_curves = cmds.ls(cmds.keyframe(selected_objects, query=True, name=True) or [],
+                          type=["animCurveTL", "animCurveTA", "animCurveTU", "animCurveTT"])
+    if not anim_curves:
+        cmds.warning("No animation found on the selected objects.")
         return
-    
-    for obj in selected_objects:
-        anim_curves = cmds.listConnections(obj, type='animCurve') or []
-        for curve in anim_curves:
-            key_times = cmds.keyframe(curve, query=True, timeChange=True) or []
-            for key_time in key_times:
-                if key_time < start_frame or key_time > end_frame:
-                    cmds.cutKey(curve, time=(key_time, key_time))
+
+    with timed_span("trim_keys", curves=len(anim_curves)):
+        key_times = cmds.keyframe(anim_curves, query=True, timeChange=True) or []
+        if min(key_times) < start_frame:
+            cmds.cutKey(anim_curves, time=(min(key_times), start_frame - 0.001), clear=True)
+        if max(key_times) > end_frame:
+            cmds.cutKey(anim_curves, time=(end_frame + 0.001, max(key_times)), clear=True)
 
     # Initialize flag to track completion of the operation
     operation_completed = False
     
-    # Key the first frame and copy to a frame 25 frames before
-    for obj in selected_objects:
-        # Get all keyed frames for the object
-        keyed_frames = cmds.keyframe(obj, q=True, timeChange=True)
-        
-        if not keyed_frames:
-            cmds.warning(f"No keyframes found for {obj}.")
-            continue
-        
-        # Get the first keyed frame (smallest time value)
-        first_key_frame = min(keyed_frames)
-        
-        
-        # Now copy and paste to 25 frames earlier
-        new_frame = first_key_frame - 25
-        if new_frame < 1:  # Avoid negative or zero frames
-            new_frame = 1
-        
-        # Copy keyframes to the new frame (fixing the 'time' argument)
-        cmds.copyKey(obj, time=(first_key_frame, first_key_frame))
-        cmds.pasteKey(obj, time=(new_frame, new_frame))
-        
-        # Indicate that the operation was completed for this object
-        operation_completed = True
+    # Copy the first key of every curve 25 frames before, one copy/paste per distinct first frame
+    with timed_span("preroll_copy", curves=len(anim_curves)):
+        curves_by_first_key = get_first_key_frames(anim_curves)
+        for first_frame, curves in curves_by_first_key.items():
+            new_frame = first_frame - 25
+            if new_frame < 1:  # Avoid negative or zero frames
+                new_frame = 1
+
+            cmds.copyKey(curves, time=(first_frame, first_frame))
+            cmds.pasteKey(curves, time=(new_frame, new_frame))
+
+            # Indicate that the operation was completed for these curves
+            operation_completed = True
+
+    if not curves_by_first_key:
+        cmds.warning("No keyframes found on the selected objects.")
+        return
+
+    # Get the first keyed frame (smallest time value)
+    first_key_frame = min(curves_by_first_key)
     
     # Calculate the pose application frame (100 frames before the first keyframe)
     pose_apply_frame = first_key_frame - 100
@@ -244,42 +830,17 @@ def bake_selected_animation():
     # Set the current frame to the first frame
     cmds.currentTime(first_key_frame)
  
-    #Store every value needed to fix the cloth bind pose to fit first keyframe pose IK and parent spaces   
-    arm_L_options_ctl = find_object_with_namespace("arm_L_options_ctl")
-    arm_R_options_ctl = find_object_with_namespace("arm_R_options_ctl")
-    
-    switch_ik_value_L = cmds.getAttr(f"{arm_L_options_ctl}.SwitchIK")
-    switch_ik_value_R = cmds.getAttr(f"{arm_R_options_ctl}.SwitchIK")
-    
-    arm_L_ctl = find_object_with_namespace("arm_L_ctl")
-    arm_R_ctl = find_object_with_namespace("arm_R_ctl")
-
-    arm_L_orient_space = cmds.getAttr(f"{arm_L_ctl}.OrientSpace")
-    arm_R_orient_space = cmds.getAttr(f"{arm_R_ctl}.OrientSpace")
-
-    arm_L_PV_ctl = find_object_with_namespace("arm_L_PV_ctl")
-    arm_R_PV_ctl = find_object_with_namespace("arm_R_PV_ctl")
-
-    arm_L_PV_parent_space = cmds.getAttr(f"{arm_L_PV_ctl}.ParentSpace")
-    arm_R_PV_parent_space = cmds.getAttr(f"{arm_R_PV_ctl}.ParentSpace")
-
-    hand_L_IK_ctl = find_object_with_namespace("hand_L_IK_ctl")
-    hand_R_IK_ctl = find_object_with_namespace("hand_R_IK_ctl")
-
-    hand_L_IK_parent_space = cmds.getAttr(f"{hand_L_IK_ctl}.ParentSpace")
-    hand_R_IK_parent_space = cmds.getAttr(f"{hand_R_IK_ctl}.ParentSpace")
-
-    leg_L_PV_ctl = find_object_with_namespace("leg_L_PV_ctl")
-    leg_R_PV_ctl = find_object_with_namespace("leg_R_PV_ctl")
-
-    leg_L_PV_parent_space = cmds.getAttr(f"{leg_L_PV_ctl}.ParentSpace")
-    leg_R_PV_parent_space = cmds.getAttr(f"{leg_R_PV_ctl}.ParentSpace")
-
-    ankle_L_IK_ctl = find_object_with_namespace("ankle_L_IK_ctl")
-    ankle_R_IK_ctl = find_object_with_namespace("ankle_R_IK_ctl")
-
-    ankle_L_IK_parent_space = cmds.getAttr(f"{ankle_L_IK_ctl}.ParentSpace")
-    ankle_R_IK_parent_space = cmds.getAttr(f"{ankle_R_IK_ctl}.ParentSpace")
+    #Store every value needed to fix the cloth bind pose to fit first keyframe pose IK and parent spaces, for every Iouri
+    stored_states = {}
+    for namespace in get_iouri_index():
+        switch_ik_values = {}
+        spaces = {}
+        for side in "LR":
+            switch_ik_values[side] = cmds.getAttr(find_iouri_node(f"arm_{side}_options_ctl", namespace) + ".SwitchIK")
+            for ctrl, attr in SPACE_ATTRIBUTES:
+                plug = f"{find_iouri_node(ctrl.format(side=side), namespace)}.{attr}"
+                spaces[plug] = cmds.getAttr(plug)
+        stored_states[namespace] = (switch_ik_values, spaces)
     
 
     
@@ -287,52 +848,54 @@ def bake_selected_animation():
     cmds.currentTime(pose_apply_frame)
 
     # Load the pose 100 frames before the first keyed frame
-    pose_file_path = "S:\\SIC3D\\SIC5\\Projects\\KAMARADE\\02-PROD\\SCRIPTS\\Hubert\\ClothPose.json"  # Adjust path to the pose file
-    load_pose(pose_file_path)
-
-    # Apply the Switcher Code 
-    if switch_ik_value_L == 1.0:
-        switch_to_ik("L")
-        # Filter if switched
-        cmds.filterCurve(hand_L_IK_ctl, startTime=pose_apply_frame, endTime=first_key_frame, filter='euler')
-
-    if switch_ik_value_R == 1.0:
-        switch_to_ik("R")
-        # Filter if switched
-        cmds.filterCurve(hand_R_IK_ctl, startTime=pose_apply_frame, endTime=first_key_frame, filter='euler')
-    
-    # Change attributes based on the other stored values
-    cmds.setAttr(f"{arm_L_ctl}.OrientSpace", arm_L_orient_space)
-    cmds.setAttr(f"{arm_R_ctl}.OrientSpace", arm_R_orient_space)
-
-    cmds.setAttr(f"{arm_L_PV_ctl}.ParentSpace", arm_L_PV_parent_space)
-    cmds.setAttr(f"{arm_R_PV_ctl}.ParentSpace", arm_R_PV_parent_space)
-
-    cmds.setAttr(f"{hand_L_IK_ctl}.ParentSpace", hand_L_IK_parent_space)
-    cmds.setAttr(f"{hand_R_IK_ctl}.ParentSpace", hand_R_IK_parent_space)
-
-    cmds.setAttr(f"{leg_L_PV_ctl}.ParentSpace", leg_L_PV_parent_space)
-    cmds.setAttr(f"{leg_R_PV_ctl}.ParentSpace", leg_R_PV_parent_space)
-
-    cmds.setAttr(f"{ankle_L_IK_ctl}.ParentSpace", ankle_L_IK_parent_space)
-    cmds.setAttr(f"{ankle_R_IK_ctl}.ParentSpace", ankle_R_IK_parent_space)
+    with timed_span("load_pose"):
+        load_pose(ClothPoseFile)
+
+    # Apply the Switcher Code, every arm that was in IK at once
+    with timed_span("switch_to_ik"):
+        ik_arms = [(namespace, side) for namespace, (switch_ik_values, spaces) in stored_states.items()
+                   for side in "LR" if switch_ik_values[side] == 1.0]
+        if ik_arms:
+            switch_arms_to_ik(ik_arms)
+
+    for namespace, (switch_ik_values, spaces) in stored_states.items():
+        # Change attributes based on the other stored values
+        for plug, value in spaces.items():
+            cmds.setAttr(plug, value)
     
     
-    # Set keyframes for every attribute at the pose application frame
-    for obj in selected_objects:
-        attrs = cmds.listAttr(obj, k=True)  # Get all keyed attributes
-        for attr in attrs:
-            try:
-                cmds.setKeyframe(obj, time=pose_apply_frame, attribute=attr)
-            except Exception as e:
-                cmds.warning(f"Failed to key {obj}.{attr}: {str(e)}")
-
-    # Set all keyframes to linear interpolation
-    for obj in selected_objects:
-        cmds.keyTangent(obj, inTangentType="linear", outTangentType="linear")
+    # Key the pose only on the channels that move or that the pose changed, in one call
+    with timed_span("pose_keys", nodes=len(selected_objects)):
+        pose_channels, static_channels = get_pose_channels(selected_objects, pose_apply_frame)
+        print(f"Pose keys: {len(pose_channels)} channels keyed, {len(static_channels)} static channels left alone.")
+        try:
+            if pose_channels:
+                cmds.setKeyframe(pose_channels, time=pose_apply_frame)
+        except Exception as e:
+            cmds.warning(f"Failed to key the pose: {str(e)}")
+
+    # Euler filter every rotate curve, the IK switch and the pose can flip anything on the rig
+    with timed_span("euler_filter", curves=len(anim_curves)):
+        euler_filter_curves(selected_objects)
+
+    # Set all keyframes to linear interpolation, in one call over every curve
+    with timed_span("linear_tangents"):
+        cmds.keyTangent(selected_objects, inTangentType="linear", outTangentType="linear")
+
+    # Drop the baked keys the curves don't need, everything up to the first key stays for the cloth pre-roll
+    if KeyReduction:
+        with timed_span("key_reduction", curves=len(anim_curves)):
+            reduce_baked_keys(anim_curves, first_key_frame)
     
     if operation_completed:
         print("Keyframe operations (keying, pasting, applying pose, and linear tangents) completed for all selected objects.")
 
-# Run the bake function
-bake_selected_animation()
\ No newline at end of file
+# Run the bake function, the QC checks the controllers that were baked
+baked_controllers = cmds.ls(selection=True)
+bake_selected_animation()
+
+# Check the bake before it goes to Marvelous and Houdini, the report sits next to the scene
+scene_path = cmds.file(q=True, sceneName=True)
+qc_report_path = f"{os.path.splitext(scene_path)[0]}_bake_qc.json" if scene_path else os.path.join(tempfile.gettempdir(), "bake_qc.json")
+with timed_span("bake_qc"):
+    write_bake_qc_report(baked_controllers, qc_report_path)
\ No newline at end of file
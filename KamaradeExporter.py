@@ -1,5 +1,20 @@
 import maya.cmds as cmds
 import os
+import json
+import time
+import contextlib
+import re
+import ctypes
+import getpass
+import shutil
+import tempfile
+import hashlib
+import queue
+import threading
+import subprocess
+import maya.utils
+import maya.api.OpenMaya as om
+import numpy as np
 
 # Auto exports kat, iouri and props in the right place based on the name of file etc
 
@@ -8,24 +23,54 @@ ExportIouri = True
 ExportKat = True
 ExportProps = True
 ExportCameras = True
+SplitStaticObjects = False  # Objects that never move or deform go to a separate single frame _STATIC.abc, off until the loaders read those
+ExportFxPointCache = False  # Also write IOURI_FX as memory-mappable .npy point caches for Houdini
+StaticSampleCount = 5  # Frames sampled to tell static objects apart, all frames are only checked to confirm one
 StartFrame = 901
-export_done = False  # Flag to control execution
+active_export_folder = None  # Local folder of the export running right now, removed if it gets cancelled
 
+# Version folders (V01, V02...) and the lock files used to claim them
+VERSION_PATTERN = re.compile(r"^V(\d+)(?:\.lock)?$")
 
-# POPUP DEF, It's also here that the other defs are called
+# Every publish appends one JSON line here, latest versions are looked up in it instead of listing folders on the share
+PublishCatalogPath = "S:\\SIC3D\\SIC5\\Projects\\KAMARADE\\05-SHOTS\\_publish_catalog.jsonl"
+
+# Exports are written on the local disk first, then uploaded to the share in the background
+LocalScratchDirectory = os.path.join(tempfile.gettempdir(), "KamaradePublish")
+UploadChunkSize = 64 * 1024 * 1024  # Big sequential writes are way faster over SMB than Ogawa's small blocks
+upload_queue = queue.Queue()
+upload_thread = None
+
+# Published versions get checked by Publish_Validator.py in a background process, from what the exports were meant to be
+PublishValidatorPath = "S:\\SIC3D\\SIC5\\Projects\\KAMARADE\\02-PROD\\SCRIPTS\\Hubert\\Publish_Validator.py"
+# The content checks need the Alembic Python bindings, that's Houdini's hython. Empty to look for the latest installed Houdini
+ValidatorPython = ""
+HoudiniInstallDirectory = "C:\\Program Files\\Side Effects Software"
+exported_alembics = []  # Manifest entries of the alembics of the export running right now
+exported_assets = {}  # Asset of every file or folder the running export wrote in the version folder, for the catalog
+
+# Profiling, every publish writes a timing report in its version folder
+WriteChromeTrace = False  # Also write a trace that can be opened in chrome://tracing
+profile_spans = []
+
+
+# POPUP DEF, the Apply button queues the export job directly
 def export_options_popup():
-    global ExportIouri, ExportKat, ExportProps, ExportCameras, export_done
+    global ExportIouri, ExportKat, ExportProps, ExportCameras, SplitStaticObjects, ExportFxPointCache
 
     def apply_settings(*args):
-        """ Updates global variables and closes the UI. """
-        global ExportIouri, ExportKat, ExportProps, ExportCameras, StartFrame, export_done
+        """ Updates global variables, closes the UI and queues the export. """
+        global ExportIouri, ExportKat, ExportProps, ExportCameras, SplitStaticObjects, ExportFxPointCache, StartFrame
         ExportIouri = cmds.checkBox("cb_iouri", query=True, value=True)
         ExportKat = cmds.checkBox("cb_kat", query=True, value=True)
         ExportProps = cmds.checkBox("cb_props", query=True, value=True)
         ExportCameras = cmds.checkBox("cb_cameras", query=True, value=True)
+        SplitStaticObjects = cmds.checkBox("cb_split_static", query=True, value=True)
+        ExportFxPointCache = cmds.checkBox("cb_fx_points", query=True, value=True)
         StartFrame = cmds.intField("start_frame", query=True, value=True)
-        export_done = True  # Mark export as done
         cmds.deleteUI("export_options_win")
+        # Deferred so the window is gone before the export starts
+        cmds.evalDeferred(run_export_job, lowestPriority=True)
     
     # Delete existing UI if necessary
     if cmds.window("export_options_win", exists=True):
@@ -39,47 +84,334 @@ def export_options_popup():
     cmds.checkBox("cb_kat", label="Export Kat", value=ExportKat)
     cmds.checkBox("cb_props", label="Export Props", value=ExportProps)
     cmds.checkBox("cb_cameras", label="Export Cameras", value=ExportCameras)
+    cmds.checkBox("cb_split_static", label="Static objects in a single frame _STATIC.abc", value=SplitStaticObjects)
+    cmds.checkBox("cb_fx_points", label="IOURI_FX point cache (.npy) for Houdini", value=ExportFxPointCache)
     cmds.text(label="Start Frame:")
     cmds.intField("start_frame", value=StartFrame)
     cmds.button(label="Apply", command=apply_settings)
 
     cmds.showWindow(win)
 
-    # Wait until the user presses "Apply"
-    def check_export_done():
-        if export_done:
-            # Continue with the rest of the script after Apply is pressed
-            print(f"ExportIouri: {ExportIouri}, ExportKat: {ExportKat}, ExportProps: {ExportProps}, ExportCameras: {ExportCameras}, StartFrame: {StartFrame}")
-            # Rename cameras if we export them
-            if ExportCameras == True:
-                rename_cameras()
-            # Call the export function here
-            export_alembic()
-                
-        else:
-            cmds.scriptJob(runOnce=True, idleEvent=check_export_done)
-
-    cmds.scriptJob(runOnce=True, idleEvent=check_export_done)
-
-# Call the function to display the popup
-export_options_popup()
-
-
-
+def run_export_job():
+    """Runs the export behind a progress window, Esc cancels it between two export steps."""
+    global active_export_folder
+    print(f"ExportIouri: {ExportIouri}, ExportKat: {ExportKat}, ExportProps: {ExportProps}, ExportCameras: {ExportCameras}, StartFrame: {StartFrame}")
+    cmds.progressWindow(title="Kamarade Export", status="Starting export...", isInterruptable=True, progress=0, maxValue=100)
+    try:
+        # Rename cameras if we export them
+        if ExportCameras == True:
+            rename_cameras()
+        export_alembic()
+    except ExportCancelled:
+        # Nothing was handed to the uploader yet, so nothing gets published
+        if active_export_folder:
+            shutil.rmtree(active_export_folder, ignore_errors=True)
+        cmds.warning("Export cancelled, nothing was published.")
+    finally:
+        active_export_folder = None
+        cmds.progressWindow(endProgress=True)
+
+def update_export_progress(status, max_value=100):
+    """Starts a new step in the progress window, stops the export if the artist cancelled."""
+    if cmds.about(batch=True):
+        return
+    if cmds.progressWindow(query=True, isCancelled=True):
+        raise ExportCancelled()
+    cmds.progressWindow(edit=True, status=status, progress=0, maxValue=max(max_value, 1))
 
+def abc_frame_progress(frame, start_frame):
+    """Per frame callback of AbcExport (-pythonPerFrameCallback), moves the progress bar."""
+    if not cmds.about(batch=True):
+        cmds.progressWindow(edit=True, progress=int(frame - start_frame))
 
 
 # DEFS
 
+class ExportCancelled(Exception):
+    """Raised when the artist cancels the export from the progress window."""
+
+def read_publish_catalog():
+    """Every publish recorded in the catalog, oldest first. Lines that didn't finish writing are skipped."""
+    records = []
+    if not os.path.exists(PublishCatalogPath):
+        return records
+    with open(PublishCatalogPath, "r", encoding="utf-8") as catalog:
+        for line in catalog:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+@contextlib.contextmanager
+def catalog_lock(timeout=30):
+    """Exclusive lock file next to the catalog, so two publishes never write the same line at once."""
+    lock_path = PublishCatalogPath + ".lock"
+    deadline = time.time() + timeout
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            # A lock older than the timeout belongs to a Maya that crashed
+            try:
+                if time.time() - os.path.getmtime(lock_path) > timeout:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            if time.time() > deadline:
+                raise TimeoutError(f"Publish catalog is locked: {lock_path}")
+            time.sleep(0.2)
+    try:
+        yield
+    finally:
+        os.remove(lock_path)
+
+def append_to_publish_catalog(version_folder, publish_folder, file_hashes, local_folder):
+    """Appends one line about a published version to the catalog: shot, files (asset, size, hash, frame range), timings."""
+    anim_folder = os.path.dirname(publish_folder)
+    scene_base = os.path.basename(anim_folder)
+
+    # Frame ranges and assets from the publish manifest, timings from the profile reports, all still in the local folder
+    frame_ranges = {}
+    assets = {}
+    manifest_path = os.path.join(local_folder, "publish_manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as manifest_file:
+            manifest = json.load(manifest_file)
+        frame_ranges = {entry["file"]: entry["frame_range"] for entry in manifest["alembics"]}
+        assets = manifest.get("assets", {})
+    timings = {}
+    for name in os.listdir(local_folder):
+        if name.endswith("_profile.json"):
+            with open(os.path.join(local_folder, name), "r") as report_file:
+                timings[name[:-len("_profile.json")]] = json.load(report_file)["total"]
+
+    files = []
+    for relative_path, (size, file_hash) in sorted(file_hashes.items()):
+        top_name = relative_path.replace("\\", "/").split("/")[0]
+        # Exports record their asset, the reports get theirs from the file name
+        asset = assets.get(top_name) or os.path.splitext(top_name)[0]
+        if asset.startswith(scene_base + "_"):
+            asset = asset[len(scene_base) + 1:]
+        files.append({"file": relative_path, "asset": asset, "size": size, "sha1": file_hash,
+                      "frame_range": frame_ranges.get(relative_path)})
+
+    record = {
+        "shot": os.path.basename(os.path.dirname(anim_folder)),
+        "scene": scene_base,
+        "publish_folder": publish_folder,
+        "version": os.path.basename(version_folder),
+        "user": getpass.getuser(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "timestamp": time.time(),
+        "files": files,
+        "timings": timings,
+    }
+    line = (json.dumps(record) + "\n").encode("utf-8")
+    with catalog_lock():
+        with open(PublishCatalogPath, "ab+") as catalog:
+            # A line cut short by a crash gets closed first, so the records after it stay readable
+            catalog.seek(0, os.SEEK_END)
+            if catalog.tell() > 0:
+                catalog.seek(-1, os.SEEK_END)
+                if catalog.read(1) != b"\n":
+                    line = b"\n" + line
+            catalog.write(line)
+
+def create_staging_folder(base_path):
+    """Creates a private staging folder inside the hidden .staging folder of the given base path."""
+    staging_root = os.path.join(base_path, ".staging")
+    os.makedirs(staging_root, exist_ok=True)
+    if os.name == "nt":
+        # Hide it in the explorer so nobody grabs files from a publish that isn't finished
+        ctypes.windll.kernel32.SetFileAttributesW(staging_root, 0x02)
+    return tempfile.mkdtemp(prefix=f"{getpass.getuser()}_", dir=staging_root)
+
 def get_next_version_folder(base_path):
-    """Finds the next available version folder inside the given base path."""
-    version = 1
+    """Claims the next version number with an exclusive lock file and returns its (not yet created) folder path.
+
+    The latest version comes from the publish catalog, the folder only gets listed when the catalog doesn't know it yet.
+    """
+    published = [int(record["version"][1:]) for record in read_publish_catalog()
+                 if os.path.normcase(record["publish_folder"]) == os.path.normcase(base_path)]
     while True:
+        if published:
+            # Versions claimed or published since the last catalog line are skipped
+            version = max(published) + 1
+            while os.path.exists(os.path.join(base_path, f"V{version:02d}")) or os.path.exists(os.path.join(base_path, f"V{version:02d}.lock")):
+                version += 1
+        else:
+            # One listing to find the highest version, claimed numbers (.lock) count as taken too
+            taken = [int(match.group(1)) for match in map(VERSION_PATTERN.match, os.listdir(base_path)) if match]
+            version = max(taken, default=0) + 1
         version_folder = os.path.join(base_path, f"V{version:02d}")
-        if not os.path.exists(version_folder):
-            os.makedirs(version_folder)
-            return version_folder
-        version += 1
+        try:
+            os.close(os.open(version_folder + ".lock", os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            continue  # Someone claimed it between the listing and the lock, look again
+        return version_folder
+
+def promote_staging_folder(staging_folder, base_path):
+    """Renames a finished staging folder to the next version folder, so a version only ever shows up complete."""
+    version_folder = get_next_version_folder(base_path)
+    try:
+        os.rename(staging_folder, version_folder)
+    finally:
+        os.remove(version_folder + ".lock")
+    return version_folder
+
+@contextlib.contextmanager
+def timed_span(name, **info):
+    """Times a phase of the publish. Extra info (frames, nodes, file sizes...) can be added to the yielded dict."""
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        profile_spans.append({"name": name, "start": start, "duration": time.perf_counter() - start, **info})
+
+def write_profile_report(folder, report_name):
+    """Writes the recorded spans as a JSON report, and as a Chrome trace (chrome://tracing) if asked."""
+    if not profile_spans:
+        return
+    origin = min(span["start"] for span in profile_spans)
+    spans = [dict(span, start=span["start"] - origin) for span in profile_spans]
+    report = {
+        "scene": cmds.file(q=True, sn=True),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "total": max(span["start"] + span["duration"] for span in spans),
+        "spans": spans,
+    }
+    with open(os.path.join(folder, f"{report_name}_profile.json"), "w") as report_file:
+        json.dump(report, report_file, indent=4)
+
+    if WriteChromeTrace:
+        events = [
+            {"name": span["name"], "ph": "X", "pid": 1, "tid": 1,
+             "ts": span["start"] * 1e6, "dur": span["duration"] * 1e6,
+             "args": {key: value for key, value in span.items() if key not in ("name", "start", "duration")}}
+            for span in spans
+        ]
+        with open(os.path.join(folder, f"{report_name}_profile.trace.json"), "w") as trace_file:
+            json.dump({"traceEvents": events}, trace_file)
+
+    slowest = max(spans, key=lambda span: span["duration"])
+    print(f"Publish took {report['total']:.1f}s, slowest step: {slowest['name']} ({slowest['duration']:.1f}s)")
+
+def report_from_thread(message, warning=False):
+    """Prints a message from the upload thread, Maya only likes being talked to from the main thread."""
+    maya.utils.executeDeferred(cmds.warning if warning else print, message)
+
+def upload_file(source_path, destination_path):
+    """Copies a file in big chunks, then reads the copy back to check it against the source checksum."""
+    total_size = os.path.getsize(source_path)
+    source_hash = hashlib.sha1()
+    copied = 0
+    with open(source_path, "rb") as source, open(destination_path, "wb") as destination:
+        for chunk in iter(lambda: source.read(UploadChunkSize), b""):
+            destination.write(chunk)
+            source_hash.update(chunk)
+            copied += len(chunk)
+            if total_size > UploadChunkSize:
+                report_from_thread(f"Uploading {os.path.basename(source_path)}: {copied * 100 // total_size}%")
+
+    destination_hash = hashlib.sha1()
+    with open(destination_path, "rb") as destination:
+        for chunk in iter(lambda: destination.read(UploadChunkSize), b""):
+            destination_hash.update(chunk)
+
+    if destination_hash.digest() != source_hash.digest():
+        raise IOError(f"Checksum mismatch after uploading {source_path}")
+    return source_hash.hexdigest()
+
+def upload_publish(local_folder, publish_folder):
+    """Uploads a local export folder to a staging folder on the share, then promotes it to the next version."""
+    staging_folder = create_staging_folder(publish_folder)
+    file_hashes = {}
+    try:
+        for root, dirs, files in os.walk(local_folder):
+            target_root = os.path.join(staging_folder, os.path.relpath(root, local_folder))
+            os.makedirs(target_root, exist_ok=True)
+            for name in files:
+                source_path = os.path.join(root, name)
+                file_hash = upload_file(source_path, os.path.join(target_root, name))
+                file_hashes[os.path.relpath(source_path, local_folder)] = (os.path.getsize(source_path), file_hash)
+
+        version_folder = promote_staging_folder(staging_folder, publish_folder)
+    except Exception:
+        # The local files stay for another try (upload_worker), the half uploaded copy doesn't stay on the share
+        shutil.rmtree(staging_folder, ignore_errors=True)
+        raise
+    try:
+        append_to_publish_catalog(version_folder, publish_folder, file_hashes, local_folder)
+    except Exception as e:
+        report_from_thread(f"Couldn't add {version_folder} to the publish catalog: {e}", warning=True)
+    shutil.rmtree(local_folder, ignore_errors=True)
+    report_from_thread(f"Published version: {version_folder}")
+    launch_publish_validator(version_folder)
+    return version_folder
+
+def write_publish_manifest(version_folder, scene_name):
+    """Writes what the exports were meant to contain, for the validator. Adds to the manifest already there (bake worker)."""
+    manifest_path = os.path.join(version_folder, "publish_manifest.json")
+    alembics = []
+    assets = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as manifest_file:
+            manifest = json.load(manifest_file)
+        alembics = manifest["alembics"]
+        assets = manifest.get("assets", {})
+    with open(manifest_path, "w") as manifest_file:
+        json.dump({
+            "scene": scene_name,
+            "user": getpass.getuser(),
+            "fps": om.MTime(1.0, om.MTime.kSeconds).asUnits(om.MTime.uiUnit()),
+            "alembics": alembics + exported_alembics,
+            "assets": {**assets, **exported_assets},
+        }, manifest_file, indent=4)
+
+def get_validator_python():
+    """hython to run the validator with: ValidatorPython, $HFS, or the latest Houdini installed. None if there's none."""
+    candidates = [ValidatorPython]
+    if os.environ.get("HFS"):
+        candidates.append(os.path.join(os.environ["HFS"], "bin", "hython.exe" if os.name == "nt" else "hython"))
+    if os.path.isdir(HoudiniInstallDirectory):
+        for folder in sorted(os.listdir(HoudiniInstallDirectory), reverse=True):
+            candidates.append(os.path.join(HoudiniInstallDirectory, folder, "bin", "hython.exe"))
+    return next((path for path in candidates if path and os.path.exists(path)), None)
+
+def launch_publish_validator(version_folder):
+    """Starts the validator on a published version in its own process, it adds its results to the manifest."""
+    validator_python = get_validator_python()
+    if not os.path.exists(PublishValidatorPath) or validator_python is None:
+        # mayapy has no Alembic bindings, the validation would only read the headers and look like a pass
+        report_from_thread(f"Publish validator or hython not found, {version_folder} wasn't validated", warning=True)
+        return
+    subprocess.Popen([validator_python, PublishValidatorPath, version_folder],
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0)
+    report_from_thread(f"Validating {version_folder} in the background")
+
+def upload_worker():
+    """Runs the queued uploads one after the other."""
+    while True:
+        local_folder, publish_folder = upload_queue.get()
+        try:
+            upload_publish(local_folder, publish_folder)
+        except Exception as e:
+            report_from_thread(f"Upload failed, the exported files are kept in {local_folder}: {e}", warning=True)
+        finally:
+            upload_queue.task_done()
+
+def queue_upload(local_folder, publish_folder):
+    """Hands a finished local export folder over to the background uploader."""
+    global upload_thread
+    if upload_thread is None or not upload_thread.is_alive():
+        upload_thread = threading.Thread(target=upload_worker, daemon=True)
+        upload_thread.start()
+    upload_queue.put((local_folder, publish_folder))
+    print(f"Export written to {local_folder}, uploading to {publish_folder} in the background.")
 
 def get_full_paths(objects):
     """Finds the full object paths in the scene matching the given list (ignoring namespaces)."""
@@ -101,12 +433,84 @@ def rename_cameras():
         print(f"Renamed: {obj} -> {new_name}")
 
 
-def export_abc(obj_list, export_name, version_folder, scene_name, start_frame, end_frame):
-    """Exports selected objects to Alembic."""
+def classify_export_roots(roots, start_frame, end_frame):
+    """Returns {root: "static" | "transform" | "deforming"} from world matrices and hashed mesh points.
+
+    A few frames are sampled first, then the roots that look static get confirmed together in one pass over every frame.
+    "transform" isn't confirmed frame by frame, it gets exported like a deforming root anyway.
+    """
+    time_unit = om.MTime.uiUnit()
+    sample_frames = np.unique(np.linspace(start_frame, end_frame, StaticSampleCount).round())
+    classes = {}
+    root_plugs = {}
+    for root in roots:
+        transforms = cmds.ls(root, dag=True, type="transform", long=True) or []
+        shapes = cmds.ls(root, dag=True, shapes=True, noIntermediate=True, long=True) or []
+        meshes = cmds.ls(shapes, type="mesh", long=True) or []
+        if len(meshes) != len(shapes):
+            classes[root] = "deforming"  # Only mesh points get hashed, anything else is exported as it was
+            continue
+
+        selection = om.MSelectionList()
+        for transform in transforms:
+            selection.add(f"{transform}.worldMatrix[0]")
+        for mesh in meshes:
+            selection.add(f"{mesh}.outMesh")
+        plugs = [selection.getPlug(index) for index in range(selection.length())]
+        root_plugs[root] = (plugs[:len(transforms)], plugs[len(transforms):])
+
+    def sample(root, context):
+        matrix_plugs, mesh_plugs = root_plugs[root]
+        matrices = np.array([list(om.MFnMatrixData(plug.asMObject(context)).matrix()) for plug in matrix_plugs])
+        points_hash = hashlib.sha1()
+        for plug in mesh_plugs:
+            points_hash.update(np.array(om.MFnMesh(plug.asMObject(context)).getPoints(), dtype=np.float64).tobytes())
+        return matrices, points_hash.digest()
+
+    def frame_context(frame):
+        return om.MDGContext(om.MTime(float(frame), time_unit))
+
+    def changes(frames, candidates, stop_when_moved):
+        """{root: (moved, deformed)} over the frames, every candidate is read on the same evaluation of each frame."""
+        found = {root: (False, False) for root in candidates}
+        for frame in frames:
+            pending = [root for root in candidates if not found[root][1] and not (stop_when_moved and found[root][0])]
+            if not pending:
+                break
+            context = frame_context(frame)
+            for root in pending:
+                matrices, points_hash = sample(root, context)
+                found[root] = (found[root][0] or not np.allclose(matrices, references[root][0], atol=1e-6),
+                               points_hash != references[root][1])
+        return found
+
+    start_context = frame_context(start_frame)
+    references = {root: sample(root, start_context) for root in root_plugs}
+    found = changes(sample_frames[1:], list(root_plugs), stop_when_moved=False)
+    candidates = [root for root, (moved, deformed) in found.items() if not moved and not deformed]
+    found.update(changes(range(int(start_frame) + 1, int(end_frame) + 1), candidates, stop_when_moved=True))
+    for root, (moved, deformed) in found.items():
+        classes[root] = "deforming" if deformed else "transform" if moved else "static"
+    return {root: classes[root] for root in roots}
+
+def export_abc(obj_list, export_name, version_folder, scene_name, start_frame, end_frame, split_static=True):
+    """Exports selected objects to Alembic, the static ones to their own single frame file when SplitStaticObjects is on."""
     if not obj_list:
         cmds.warning(f"No objects found for {export_name} export!")
         return
 
+    if split_static and SplitStaticObjects:
+        update_export_progress(f"Looking for static objects in {export_name}...")
+        with timed_span(f"classify {export_name}", roots=len(obj_list)) as span:
+            classes = classify_export_roots(obj_list, start_frame, end_frame)
+            span["static"] = list(classes.values()).count("static")
+        static_objects = [obj for obj in obj_list if classes[obj] == "static"]
+        if static_objects:
+            export_abc(static_objects, f"{export_name}_STATIC", version_folder, scene_name, start_frame, start_frame, split_static=False)
+            obj_list = [obj for obj in obj_list if classes[obj] != "static"]
+            if not obj_list:
+                return
+
     export_filename = "{}_{}.abc".format(scene_name.rsplit(".", 1)[0], export_name)
     full_export_path = os.path.join(version_folder, export_filename).replace("\\", "/")
 
@@ -115,10 +519,29 @@ def export_abc(obj_list, export_name, version_folder, scene_name, start_frame, e
     # Correctly format -root flags
     root_flags = " ".join(["-root " + obj for obj in obj_list])
 
-    cmds.AbcExport(
-        j=f"-frameRange {start_frame} {end_frame} -uvWrite -worldSpace -writeVisibility -writeUVSets -dataFormat ogawa {root_flags} -file {full_export_path}"
-    )
-
+    update_export_progress(f"Exporting {export_name}...", end_frame - start_frame + 1)
+    # AbcExport runs it in __main__, so it goes through this module whatever name it was imported as (no spaces allowed)
+    progress_callback = f"__import__('{__name__}').abc_frame_progress(#FRAME#,{start_frame})"
+
+    with timed_span(f"export_abc {export_name}", frames=end_frame - start_frame + 1, roots=len(obj_list),
+                    nodes=len(cmds.ls(obj_list, dag=True))) as span:
+        cmds.AbcExport(
+            j=f"-frameRange {start_frame} {end_frame} -uvWrite -worldSpace -writeVisibility -writeUVSets -dataFormat ogawa -pythonPerFrameCallback {progress_callback} {root_flags} -file {full_export_path}"
+        )
+        span["file_size"] = os.path.getsize(full_export_path)
+
+    # What the file should hold, for the validator. Bounds only when the current frame is one that got exported
+    current_frame = cmds.currentTime(query=True)
+    exported_assets[export_filename] = export_name
+    exported_alembics.append({
+        "file": export_filename,
+        "frame_range": [start_frame, end_frame],
+        "roots": [obj.rsplit("|", 1)[-1] for obj in obj_list],
+        "object_count": len(set(cmds.ls(obj_list, dag=True, noIntermediate=True, long=True)) -
+                            set(cmds.ls(obj_list, dag=True, type="constraint", long=True))),
+        "bounds": cmds.exactWorldBoundingBox(obj_list) if start_frame <= current_frame <= end_frame else None,
+        "bounds_frame": current_frame if start_frame <= current_frame <= end_frame else None,
+    })
     print(f"Exported: {full_export_path}")
 
 def select_cameras():
@@ -135,7 +558,101 @@ def select_cameras():
 
     return leaf_cams
 
+def export_point_cache(roots, version_folder, cache_name, start_frame, end_frame):
+    """Writes a memory-mappable point cache for FX: one frames x points x 3 float32 .npy per mesh, plus a topology header.
+
+    World space points in cm, sampled in a single pass over the timeline. np.load(path, mmap_mode="r") reads any frame without Alembic.
+    """
+    if not roots:
+        cmds.warning(f"No objects found for {cache_name} point cache!")
+        return None
+
+    frames = np.arange(start_frame, end_frame + 1, dtype=np.float64)
+    cache_folder = os.path.join(version_folder, f"{cache_name}_points")
+    os.makedirs(cache_folder, exist_ok=True)
+    meshes = cmds.ls(roots, dag=True, type="mesh", noIntermediate=True, long=True) or []
+
+    header = {"frames": [float(frames[0]), float(frames[-1])],
+              "fps": om.MTime(1.0, om.MTime.kSeconds).asUnits(om.MTime.uiUnit()),
+              "space": "world", "unit": "cm", "meshes": []}
+    mesh_caches = []
+    for mesh in meshes:
+        selection = om.MSelectionList()
+        selection.add(mesh)
+        mesh_fn = om.MFnMesh(selection.getDagPath(0))
+        name = cmds.listRelatives(mesh, parent=True)[0].split(":")[-1]
+        face_counts, face_connects = mesh_fn.getVertices()
+        np.savez(os.path.join(cache_folder, f"{name}_topology.npz"),
+                 face_vertex_counts=np.array(face_counts, dtype=np.int32),
+                 face_vertex_indices=np.array(face_connects, dtype=np.int32))
+
+        # Preallocated on disk, filled frame by frame
+        points = np.lib.format.open_memmap(os.path.join(cache_folder, f"{name}.npy"), mode="w+",
+                                           dtype=np.float32, shape=(len(frames), mesh_fn.numVertices, 3))
+        world_mesh_plug = om.MFnDependencyNode(selection.getDependNode(0)).findPlug("worldMesh", False).elementByLogicalIndex(0)
+        mesh_caches.append((world_mesh_plug, points))
+        header["meshes"].append({"name": name, "dag_path": mesh, "points": f"{name}.npy", "topology": f"{name}_topology.npz",
+                                 "point_count": mesh_fn.numVertices, "face_count": mesh_fn.numPolygons})
+
+    time_unit = om.MTime.uiUnit()
+    for frame_index, frame in enumerate(frames):
+        context = om.MDGContext(om.MTime(frame, time_unit))
+        for world_mesh_plug, points in mesh_caches:
+            frame_points = om.MFnMesh(world_mesh_plug.asMObject(context)).getPoints()
+            points[frame_index] = np.array(frame_points, dtype=np.float32)[:, :3]
+
+    for world_mesh_plug, points in mesh_caches:
+        points.flush()
+    with open(os.path.join(cache_folder, "header.json"), "w") as header_file:
+        json.dump(header, header_file, indent=4)
+    print(f"Exported point cache to: {cache_folder}")
+    return cache_folder
+
+def export_camera_cache(cameras, version_folder, base_name, start_frame, end_frame):
+    """Writes a light .npz camera cache (world matrices, focal length, film back, clipping) that loads without Maya."""
+    frames = np.arange(start_frame, end_frame + 1, dtype=np.float64)
+    camera_plugs = []
+    for cam in cameras:
+        shape = (cmds.listRelatives(cam, shapes=True, type="camera", fullPath=True) or [None])[0]
+        if not shape:
+            continue
+        selection = om.MSelectionList()
+        selection.add(cam)
+        selection.add(shape)
+        transform_fn = om.MFnDependencyNode(selection.getDependNode(0))
+        shape_fn = om.MFnDependencyNode(selection.getDependNode(1))
+        matrix_plug = transform_fn.findPlug("worldMatrix", False).elementByLogicalIndex(0)
+        shape_plugs = [shape_fn.findPlug(attr, False) for attr in
+                       ("focalLength", "horizontalFilmAperture", "verticalFilmAperture", "nearClipPlane", "farClipPlane")]
+        camera_plugs.append((cam, matrix_plug, shape_plugs))
+
+    # Preallocated arrays, filled in a single pass over the timeline without moving the current time
+    world_matrices = np.zeros((len(camera_plugs), len(frames), 4, 4))
+    shape_values = np.zeros((len(camera_plugs), len(frames), 5))
+    time_unit = om.MTime.uiUnit()
+    for frame_index, frame in enumerate(frames):
+        context = om.MDGContext(om.MTime(frame, time_unit))
+        for cam_index, (cam, matrix_plug, shape_plugs) in enumerate(camera_plugs):
+            matrix = om.MFnMatrixData(matrix_plug.asMObject(context)).matrix()
+            world_matrices[cam_index, frame_index] = np.reshape(list(matrix), (4, 4))
+            shape_values[cam_index, frame_index] = [plug.asDouble(context) for plug in shape_plugs]
+
+    cache_path = os.path.join(version_folder, f"{base_name}_cameras.npz")
+    np.savez(
+        cache_path,
+        cameras=np.array([cam.rsplit("|", 1)[-1] for cam, _, _ in camera_plugs]),
+        frames=frames,
+        fps=np.float64(om.MTime(1.0, om.MTime.kSeconds).asUnits(time_unit)),
+        world_matrix=world_matrices,  # Maya convention: row vectors, translation on the last row, in cm
+        focal_length=shape_values[:, :, 0],  # mm
+        film_back=shape_values[:, :, 1:3],  # horizontal/vertical aperture in inches
+        clipping=shape_values[:, :, 3:5],  # near/far in cm
+    )
+    print(f"Exported camera cache to: {cache_path}")
+    return cache_path
+
 def export_alembic():
+    global active_export_folder
     # Get the scene file name
     scene_name = cmds.file(q=True, sn=True, shn=True)
     
@@ -152,8 +669,15 @@ def export_alembic():
     anim_folder = os.path.join(shot_folder, scene_name.rsplit(".", 1)[0])
     publish_folder = os.path.join(anim_folder, "_published")
 
-    # Get the next available version folder
-    version_folder = get_next_version_folder(publish_folder)
+    # Everything is written to the local disk first, the uploader then stages and promotes it on the share
+    os.makedirs(LocalScratchDirectory, exist_ok=True)
+    version_folder = tempfile.mkdtemp(prefix=f"{base_name}_", dir=LocalScratchDirectory)
+    active_export_folder = version_folder
+
+    # Fresh timing report and manifest for this publish
+    profile_spans.clear()
+    exported_alembics.clear()
+    exported_assets.clear()
 
     # Get the last frame of the current scene
     start_frame = StartFrame
@@ -176,6 +700,12 @@ def export_alembic():
         # Export Iouri's assets
         if ExportIouri == True :
             export_abc(get_full_paths(fx_objects), "IOURI_FX", version_folder, scene_name, start_frame, end_frame)
+            if ExportFxPointCache == True:
+                update_export_progress("Exporting IOURI_FX point cache...")
+                with timed_span("export_point_cache IOURI_FX", frames=end_frame - start_frame + 1):
+                    cache_folder = export_point_cache(get_full_paths(fx_objects), version_folder, f"{scene_name.rsplit('.', 1)[0]}_IOURI_FX", start_frame, end_frame)
+                    if cache_folder:
+                        exported_assets[os.path.basename(cache_folder)] = "IOURI_FX"
             export_abc(get_full_paths(shd_objects), "IOURI_SHD", version_folder, scene_name, start_frame, end_frame)
             export_abc(get_full_paths(eyes_objects), "IOURI_EYES", version_folder, scene_name, start_frame, end_frame)
         else : 
@@ -231,13 +761,36 @@ def export_alembic():
         
         # Export cameras as .mb file
         if ExportCameras == True:
+            update_export_progress("Exporting cameras .mb...")
             cmds.select(selected_cameras)
-            cmds.file(camera_file_path, exportSelected=True, type="mayaBinary")
-            export_abc(selected_cameras, "CAMERAS", version_folder, scene_name, start_frame, end_frame)
+            with timed_span("export_cameras_mb", nodes=len(selected_cameras)) as span:
+                cmds.file(camera_file_path, exportSelected=True, type="mayaBinary")
+                span["file_size"] = os.path.getsize(camera_file_path)
+            exported_assets[camera_filename] = "CAMERAS"
+            export_abc(selected_cameras, "CAMERAS", version_folder, scene_name, start_frame, end_frame, split_static=False)
+            update_export_progress("Exporting camera cache...")
+            with timed_span("export_camera_cache", frames=end_frame - start_frame + 1, nodes=len(selected_cameras)) as span:
+                camera_cache_path = export_camera_cache(selected_cameras, version_folder, base_name, start_frame, end_frame)
+                span["file_size"] = os.path.getsize(camera_cache_path)
+            exported_assets[os.path.basename(camera_cache_path)] = "CAMERAS"
             print(f"Exported cameras to: {camera_file_path}")
         else: 
             print("Export camera is set to False, not exporting cameras")
     else:
         print("No cameras found to export.")
 
+    # Last chance to cancel before the files are handed to the uploader
+    update_export_progress("Uploading in the background...")
 
+    # Upload and promote the exported files to the next version, or drop the folder if nothing was exported
+    if os.listdir(version_folder):
+        write_profile_report(version_folder, scene_name.rsplit(".", 1)[0])
+        write_publish_manifest(version_folder, scene_name)
+        queue_upload(version_folder, publish_folder)
+    else:
+        shutil.rmtree(version_folder, ignore_errors=True)
+        print("Nothing was exported, no version published.")
+
+
+# Call the function to display the popup, now that everything it uses is defined
+export_options_popup()
@@ -3,8 +3,9 @@ from pickle import FALSE
 import shutil
 from datetime import datetime
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, simpledialog
 import threading
+import json
 
 # This script was written by Hubert Chauvaux on the 21st of may 2025 cause he was tired of copying files manually :)
 
@@ -22,6 +23,9 @@ import threading
 
 ProjectShotsDirectory = fr"S:\SIC3D\SIC5\Projects\KAMARADE\05-SHOTS"
 
+# Publish catalog written by the exporters
+PublishCatalogPath = fr"{ProjectShotsDirectory}\_publish_catalog.jsonl"
+
 # Playblasts
 EditPlayblastsDirectory = fr"Z:\sources images\KAMARADE\PlayBlasts"
 
@@ -247,6 +251,108 @@ def run_rendu_update():
 
 
 
+##################################################################################
+##################################################################################
+########################## PUBLISH CATALOG #######################################
+# The exporters append one JSON line per published version to the catalog,
+# so the latest publishes are found without walking the shot folders.
+##################################################################################
+##################################################################################
+
+
+def read_publish_catalog():
+    records = []
+    if not os.path.exists(PublishCatalogPath):
+        return records
+    with open(PublishCatalogPath, "r", encoding="utf-8") as catalog:
+        for line in catalog:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # Line that didn't finish writing
+    return records
+
+def get_shot_code(shot):
+    # "Kamarade_S_SQ2-SH100", "SQ2_SH100" and "sq2-sh100" all give "SQ2-SH100"
+    if shot.upper().startswith(ProjectName.upper()):
+        shot = shot[len(ProjectName):]
+    return shot.strip().upper().replace("_", "-")
+
+def get_latest_publish(shot, asset):
+    # Ex: get_latest_publish("SQ2-SH100", "IOURI_FX") -> (version folder, file entry), or None
+    shot_code = get_shot_code(shot)
+    for record in reversed(read_publish_catalog()):
+        if get_shot_code(record["shot"]) != shot_code:
+            continue
+        for file_entry in record["files"]:
+            if file_entry["asset"] == asset:
+                return os.path.join(record["publish_folder"], record["version"]), file_entry
+    return None
+
+def get_last_edit_export_time():
+    # Edit exports are the timestamped folders made by the two updaters above
+    export_times = []
+    for folder, time_format in ((EditPlayblastsDirectory, "%d_%m_%y_%Hh%M"), (EditRenduDirectory, "EXPORT_%d_%m_%y_%Hh%M")):
+        if not os.path.exists(folder):
+            continue
+        for name in os.listdir(folder):
+            try:
+                export_times.append(datetime.strptime(name, time_format).timestamp())
+            except ValueError:
+                continue
+    return max(export_times, default=None)
+
+def get_shots_published_since(timestamp):
+    # Latest publish of every shot published after the timestamp
+    latest = {}
+    for record in read_publish_catalog():
+        if timestamp is None or record["timestamp"] > timestamp:
+            latest[record["shot"]] = record
+    return latest
+
+# Run function
+def run_published_since_last_export():
+    try:
+        last_export = get_last_edit_export_time()
+        published = get_shots_published_since(last_export)
+        since = datetime.fromtimestamp(last_export).strftime("%d/%m/%y %Hh%M") if last_export else "ever"
+        if not published:
+            messagebox.showinfo("Published shots", f"No shot was published since the last edit export ({since}).")
+            return
+        lines = [f"{shot}: {record['version']} by {record['user']} ({record['date']})" for shot, record in sorted(published.items())]
+        print("\n".join(lines))
+        messagebox.showinfo("Published shots", f"Shots published since the last edit export ({since}):\n\n" + "\n".join(lines))
+    except Exception as e:
+        messagebox.showerror("Error", f"An error occurred:\n{e}")
+
+# Run function
+def run_latest_publish_lookup():
+    try:
+        query = simpledialog.askstring("Latest publish", "Shot and asset (Ex: SQ2-SH100 IOURI_FX):", parent=root)
+        if not query:
+            return
+        parts = query.split()
+        if len(parts) != 2:
+            messagebox.showerror("Error", "Give a shot and an asset, like: SQ2-SH100 IOURI_FX")
+            return
+        shot, asset = parts
+        latest = get_latest_publish(shot, asset.upper())
+        if latest is None:
+            messagebox.showinfo("Latest publish", f"No {asset.upper()} published for {get_shot_code(shot)}.")
+            return
+        version_folder, file_entry = latest
+        print(os.path.join(version_folder, file_entry["file"]))
+        messagebox.showinfo("Latest publish", f"{get_shot_code(shot)} {asset.upper()}:\n\n{os.path.join(version_folder, file_entry['file'])}")
+    except Exception as e:
+        messagebox.showerror("Error", f"An error occurred:\n{e}")
+
+
+
+
+
+
+
+
 #######################################################################
 #######################################################################
 ########################## GUI Setup ##################################
@@ -255,7 +361,7 @@ def run_rendu_update():
 
 root = tk.Tk()
 root.title("Kamarade Shot Updater")
-root.geometry("300x150")
+root.geometry("300x270")
 
 def on_playblast_click():
     threading.Thread(target=run_playblast_update).start()
@@ -263,7 +369,16 @@ def on_playblast_click():
 def on_rendu_click():
     threading.Thread(target=run_rendu_update).start()
 
+def on_published_click():
+    threading.Thread(target=run_published_since_last_export).start()
+
+def on_latest_click():
+    # Asks for the shot first, so it stays on the Tk thread
+    run_latest_publish_lookup()
+
 tk.Button(root, text="Run Playblast Update", command=on_playblast_click, height=2, width=25).pack(pady=10)
 tk.Button(root, text="Run Rendered Shots Update", command=on_rendu_click, height=2, width=25).pack(pady=10)
+tk.Button(root, text="Shots Published Since Last Export", command=on_published_click, height=2, width=25).pack(pady=10)
+tk.Button(root, text="Latest Publish of a Shot", command=on_latest_click, height=2, width=25).pack(pady=10)
 
 root.mainloop()
@@ -0,0 +1,281 @@
+import os
+import sys
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+# Checks a published version folder (V01, V02...) without Maya, started by the exporters once a version is promoted.
+# Can also be run by hand: python Publish_Validator.py "S:\...\_published\V03"
+
+##################
+##SETTINGS
+##################
+
+# Written by the exporter in every version folder, the validation results get added to it
+MANIFEST_NAME = "publish_manifest.json"
+
+# Alembic Python bindings (PyAlembic, ships with Houdini's hython), only the Ogawa header is checked without them
+try:
+    from alembic import Abc, AbcGeom
+except ImportError:
+    Abc = AbcGeom = None
+
+BoundsTolerance = 0.01  # Relative to the size of the bounds, plus 0.01 cm
+ValidatorWorkers = 4
+
+
+##################
+##OGAWA HEADER
+##################
+
+def check_ogawa_header(path):
+    """Reads the 16 byte Ogawa header: magic, frozen flag, version and the position of the root group.
+
+    Alembic writes the frozen flag (0xff) when the archive gets closed, a file still at 0x00 was never finished.
+    """
+    errors = []
+    size = os.path.getsize(path)
+    if size < 16:
+        return [f"File is only {size} bytes"]
+
+    with open(path, "rb") as abc_file:
+        header = abc_file.read(16)
+    if header[:5] != b"Ogawa":
+        errors.append("Not an Ogawa archive (HDF5 or broken file)")
+    elif header[5] != 0xFF:
+        errors.append("Archive was never closed (frozen flag not set), the export got interrupted")
+    else:
+        root_position = int.from_bytes(header[8:16], "little")
+        if root_position >= size:
+            errors.append(f"Root group at byte {root_position} is past the end of the file ({size} bytes), the file is truncated")
+    return errors
+
+
+##################
+##ALEMBIC CONTENT
+##################
+
+def walk_objects(obj):
+    """Every object under obj, depth first."""
+    for index in range(obj.getNumChildren()):
+        child = obj.getChild(index)
+        yield child
+        yield from walk_objects(child)
+
+
+def get_schema(obj):
+    """Schema of the object when it's one the exporter writes, None otherwise."""
+    for schema_type in (AbcGeom.IXform, AbcGeom.IPolyMesh, AbcGeom.ICurves, AbcGeom.ICamera, AbcGeom.ISubD, AbcGeom.INuPatch):
+        if schema_type.matches(obj.getHeader()):
+            return schema_type(obj, Abc.WrapExistingFlag.kWrapExisting).getSchema()
+    return None
+
+
+def multiply_matrices(a, b):
+    """a * b for 4x4 matrices, row vectors like Imath."""
+    return [[sum(a[row][k] * b[k][column] for k in range(4)) for column in range(4)] for row in range(4)]
+
+
+def get_world_matrix(obj, time):
+    """Matrix taking obj's own space to world space at time, from the transforms above it."""
+    matrix = [[float(row == column) for column in range(4)] for row in range(4)]
+    parent = obj.getParent()
+    while parent.getFullName() != "/":
+        if AbcGeom.IXform.matches(parent.getHeader()):
+            sample = AbcGeom.IXform(parent, Abc.WrapExistingFlag.kWrapExisting).getSchema().getValue(Abc.ISampleSelector(float(time)))
+            local = sample.getMatrix()
+            matrix = multiply_matrices(matrix, [[local[row][column] for column in range(4)] for row in range(4)])
+            if not sample.getInheritsXforms():
+                break
+        parent = parent.getParent()
+    return matrix
+
+
+def get_world_bounds(obj, schema, time):
+    """World bounds of a shape at time: its selfBounds with the 8 corners moved by the transforms above it."""
+    self_bounds = schema.getSelfBoundsProperty()
+    if not self_bounds.valid() or self_bounds.getNumSamples() == 0:
+        return None
+    box = self_bounds.getValue(Abc.ISampleSelector(float(time)))
+    box_min, box_max = box.min(), box.max()
+    if box_min[0] > box_max[0]:
+        return None  # Empty box
+    matrix = get_world_matrix(obj, time)
+    corners = [[sum((x, y, z, 1.0)[k] * matrix[k][axis] for k in range(4)) for axis in range(3)]
+               for x in (box_min[0], box_max[0]) for y in (box_min[1], box_max[1]) for z in (box_min[2], box_max[2])]
+    return [min(corner[axis] for corner in corners) for axis in range(3)] + [max(corner[axis] for corner in corners) for axis in range(3)]
+
+
+def read_alembic(path, fps, bounds_frame=None):
+    """Frame range, object count, sample counts per object and the world bounds of the shapes.
+
+    The bounds are taken at bounds_frame (the frame the exporter measured them on), or over all the shapes' samples.
+    Transform childBounds aren't used: they're in local space and AbcExport often doesn't write them.
+    """
+    archive = Abc.IArchive(path)
+    first_time, last_time = None, None
+    # Time sampling 0 is Alembic's default one, the exported frames are on the others
+    for index in range(1 if archive.getNumTimeSamplings() > 1 else 0, archive.getNumTimeSamplings()):
+        sample_count = archive.getMaxNumSamplesForTimeSamplingIndex(index)
+        if sample_count and sample_count > 0:
+            time_sampling = archive.getTimeSampling(index)
+            start, end = time_sampling.getSampleTime(0), time_sampling.getSampleTime(sample_count - 1)
+            first_time = start if first_time is None else min(first_time, start)
+            last_time = end if last_time is None else max(last_time, end)
+
+    objects = list(walk_objects(archive.getTop()))
+    sample_counts = {}
+    bounds_min, bounds_max = [float("inf")] * 3, [float("-inf")] * 3
+    for obj in objects:
+        schema = get_schema(obj)
+        if schema is None:
+            continue
+        sample_counts[obj.getFullName()] = schema.getNumSamples()
+
+        if AbcGeom.IXform.matches(obj.getHeader()) or not hasattr(schema, "getSelfBoundsProperty"):
+            continue
+        if bounds_frame is not None:
+            times = [bounds_frame / fps]
+        else:
+            time_sampling = schema.getSelfBoundsProperty().getTimeSampling()
+            times = [time_sampling.getSampleTime(index) for index in range(schema.getSelfBoundsProperty().getNumSamples())]
+        for time in times:
+            world_bounds = get_world_bounds(obj, schema, time)
+            if world_bounds:
+                bounds_min = [min(a, b) for a, b in zip(bounds_min, world_bounds[:3])]
+                bounds_max = [max(a, b) for a, b in zip(bounds_max, world_bounds[3:])]
+
+    return {
+        "frame_range": None if first_time is None else [round(first_time * fps, 3), round(last_time * fps, 3)],
+        "object_count": len(objects),
+        "sample_counts": sample_counts,
+        "bounds": None if bounds_min[0] == float("inf") else [*bounds_min, *bounds_max],
+    }
+
+
+def compare_with_intent(content, expected):
+    """Errors and warnings from the archive content against what the exporter meant to write."""
+    errors, warnings = [], []
+    start_frame, end_frame = expected["frame_range"]
+    frame_count = int(end_frame - start_frame) + 1
+
+    if content["object_count"] == 0:
+        errors.append("Archive has no objects")
+    elif content["object_count"] < len(expected["roots"]):
+        errors.append(f"Archive has {content['object_count']} objects, less than the {len(expected['roots'])} exported roots")
+    elif content["object_count"] != expected["object_count"]:
+        warnings.append(f"Archive has {content['object_count']} objects, the scene had {expected['object_count']}")
+
+    if content["frame_range"] is None:
+        errors.append("Archive has no time samples")
+    elif frame_count > 1 and content["frame_range"] != [float(start_frame), float(end_frame)]:
+        errors.append(f"Frame range is {content['frame_range']}, expected {[start_frame, end_frame]}")
+
+    # Constant objects have a single sample, animated ones one per frame
+    bad_samples = {name: count for name, count in content["sample_counts"].items() if count not in (1, frame_count)}
+    if bad_samples:
+        errors.append(f"{len(bad_samples)} objects with a wrong number of samples (expected 1 or {frame_count}): "
+                      f"{', '.join(f'{name} ({count})' for name, count in list(bad_samples.items())[:10])}")
+
+    expected_bounds = expected.get("bounds")
+    if expected_bounds and content["bounds"] is None:
+        errors.append("Archive has no bounds, the geometry is missing")
+    elif expected_bounds:
+        # Measured on the same frame they have to match, otherwise the exporter's frame has to fit in the whole range
+        same_frame = expected.get("bounds_frame") is not None
+        for axis in range(3):
+            tolerance = BoundsTolerance * (expected_bounds[axis + 3] - expected_bounds[axis]) + 0.01
+            low, high = content["bounds"][axis] - expected_bounds[axis], expected_bounds[axis + 3] - content["bounds"][axis + 3]
+            if low > tolerance or high > tolerance or (same_frame and (-low > tolerance or -high > tolerance)):
+                errors.append(f"Bounds {content['bounds']} don't match the exported bounds {expected_bounds}")
+                break
+    return errors, warnings
+
+
+def validate_alembic(path, expected, fps):
+    """Validates one .abc, runs in a worker process. expected is the exporter's manifest entry, None for unknown files."""
+    result = {"file": os.path.basename(path), "size": os.path.getsize(path) if os.path.exists(path) else 0,
+              "errors": [], "warnings": []}
+    if not os.path.exists(path):
+        result["errors"].append("File is missing")
+        return result
+
+    result["errors"] += check_ogawa_header(path)
+    if result["errors"]:
+        return result
+    if Abc is None:
+        result["warnings"].append("Alembic Python bindings not available, only the Ogawa header was checked")
+        return result
+
+    try:
+        content = read_alembic(path, fps, expected.get("bounds_frame") if expected else None)
+    except Exception as e:
+        result["errors"].append(f"Alembic couldn't read the archive: {e}")
+        return result
+    result["content"] = {key: value for key, value in content.items() if key != "sample_counts"}
+    if expected is None:
+        result["warnings"].append("Not in the publish manifest, only checked that it opens")
+    else:
+        errors, warnings = compare_with_intent(content, expected)
+        result["errors"] += errors
+        result["warnings"] += warnings
+    return result
+
+
+##################
+##VALIDATION
+##################
+
+def validate_version_folder(version_folder):
+    """Validates every .abc of a version folder in parallel, records the results in its manifest and returns the status."""
+    manifest_path = os.path.join(version_folder, MANIFEST_NAME)
+    manifest = {"alembics": []}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as manifest_file:
+            manifest = json.load(manifest_file)
+    fps = manifest.get("fps", 24.0)
+
+    # The manifest entries plus any alembic the exporter didn't list
+    expected = {entry["file"]: entry for entry in manifest.get("alembics", [])}
+    files = sorted(set(expected) | {name for name in os.listdir(version_folder) if name.lower().endswith(".abc")})
+
+    with ProcessPoolExecutor(max_workers=ValidatorWorkers) as pool:
+        results = list(pool.map(validate_alembic, [os.path.join(version_folder, name) for name in files],
+                                [expected.get(name) for name in files], [fps] * len(files)))
+
+    failed = [result["file"] for result in results if result["errors"]]
+    # Without the bindings only the headers were read, that isn't a pass
+    if failed:
+        status = "failed"
+    elif Abc is None:
+        status = "unverified"
+    else:
+        status = "passed"
+    manifest["validation"] = {
+        "status": status,
+        "alembic_bindings": Abc is not None,
+        "results": results,
+    }
+    # Written next to the manifest then renamed, so nobody reads half a file
+    temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=4)
+    os.replace(temp_path, manifest_path)
+
+    for result in results:
+        file_status = "FAILED" if result["errors"] else "OK"
+        print(f"[{file_status}] {result['file']}")
+        for message in result["errors"] + result["warnings"]:
+            print(f"    {message}")
+    print(f"Validation {status.upper()} for {version_folder}")
+    if status == "unverified":
+        print("Alembic Python bindings not found, run this with an interpreter that has them (hython) to check the content.")
+    return status
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python Publish_Validator.py <version folder> [<version folder>...]")
+        sys.exit(2)
+    statuses = [validate_version_folder(folder) for folder in sys.argv[1:]]
+    # 1 when something failed, 3 when only the headers could be checked
+    sys.exit(1 if "failed" in statuses else 3 if "unverified" in statuses else 0)
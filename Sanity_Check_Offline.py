@@ -0,0 +1,494 @@
+import os
+import re
+import sys
+import colorsys
+from concurrent.futures import ProcessPoolExecutor
+
+# Runs the Sanity_Check_V02 rules on Maya ASCII files without opening Maya, so a whole sequence can be checked before rendering.
+# The .ma is read statement by statement into a small node table (createNode, setAttr, select, connectAttr), nothing else is evaluated.
+# Only what is stored in the file is checked: nodes coming from references keep the values of their own file.
+# python Sanity_Check_Offline.py "S:\...\05-SHOTS\Kamarade_S_SQ1-SH040" "S:\...\Kamarade_S_SQ1-SH050_Light.ma" ...
+
+##################
+##SETTINGS
+##################
+
+SanityWorkers = 8
+
+LIGHT_TYPES = ['aiAreaLight', 'aiPointLight', 'aiSpotLight', 'directionalLight']
+EXPECTED_IMAGER = "aiImagerDenoiserOidn1"
+
+# Attributes the checks read: long name -> (names setAttr can use in a .ma, value when the file doesn't set it).
+# Maya writes the short names, the long name is accepted too
+ATTRIBUTES = {
+    "width": (("w",), 640),
+    "height": (("h",), 480),
+    "animation": (("an",), False),
+    "putFrameBeforeExt": (("pff",), False),
+    "periodInExt": (("peie",), 1),
+    "cmEnabled": (("cme",), True),
+    "configFilePath": (("cfp",), ""),
+    "aovName": (("aovn",), None),
+    "lightGroups": (("lg", "lgps"), False),
+    "layerSelection": (("layer_selection",), ""),
+    "outputSuffix": (("output_suffix",), "_denoise"),
+    "fileTextureName": (("ftn",), ""),
+    "colorSpace": (("cs",), "sRGB"),
+    "displaySmoothMesh": (("dsm",), 0),
+    "color": (("cl",), (1.0, 1.0, 1.0)),
+    "aiAov": (("ai_aov",), "default"),
+    "visibility": (("v",), True),
+}
+ATTRIBUTE_NAMES = {name: long_name for long_name, (names, default) in ATTRIBUTES.items() for name in (long_name, *names)}
+
+# Same layout as the snapshot of Sanity_Check_V02
+SNAPSHOT_ATTRIBUTES = {
+    "file": ["fileTextureName", "colorSpace"],
+    "mesh": ["displaySmoothMesh"],
+    "light": ["color", "aiAov"],
+    "light_group": ["visibility"],
+}
+
+GLOBAL_PLUGS = [
+    ("defaultResolution", "width"),
+    ("defaultResolution", "height"),
+    ("defaultRenderGlobals", "animation"),
+    ("defaultRenderGlobals", "putFrameBeforeExt"),
+    ("defaultRenderGlobals", "periodInExt"),
+    ("aiAOV_RGBA", "lightGroups"),
+    (EXPECTED_IMAGER, "layerSelection"),
+    (EXPECTED_IMAGER, "outputSuffix"),
+]
+
+# Quoted strings (with escapes), statement ends, and everything else split on spaces
+TOKEN_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"|;|[^\s;"]+')
+READ_COMMANDS = {"createNode", "select", "setAttr", "connectAttr"}
+
+
+##################
+##MAYA ASCII
+##################
+
+def read_statements(path):
+    """Yields the statements of a .ma file the node table needs, as lists of tokens (strings keep their quotes).
+
+    setAttr on attributes nobody reads (geometry, UVs...) are dropped as soon as the attribute is known,
+    their data lines are then only scanned for the end of the statement.
+    """
+    tokens = []
+    skipping = False
+    with open(path, "r", encoding="utf-8", errors="replace") as ma_file:
+        for line in ma_file:
+            if skipping and '"' not in line:
+                if line.rstrip().endswith(";"):
+                    tokens, skipping = [], False
+                continue
+
+            for token in TOKEN_PATTERN.findall(line):
+                if token == ";":
+                    if tokens and not skipping:
+                        yield tokens
+                    tokens, skipping = [], False
+                elif skipping:
+                    continue
+                elif not tokens and token not in READ_COMMANDS:
+                    skipping = True
+                else:
+                    tokens.append(token)
+                    # The first quoted token of a setAttr is the attribute
+                    if tokens[0] == "setAttr" and token.startswith('"') and sum(t.startswith('"') for t in tokens) == 1:
+                        if token.strip('"').rsplit(".", 1)[-1] not in ATTRIBUTE_NAMES:
+                            skipping = True
+
+
+def parse_value(tokens):
+    """Value of a setAttr from the tokens after the attribute: strings, booleans, numbers, or a tuple for several of them."""
+    values = []
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        if token.startswith("-"):
+            # -type "string", -type "float3", -k on... only the data is kept
+            index += 2 if token in ("-type", "-k", "-l", "-cb", "-s", "-ca") else 1
+            continue
+        if token.startswith('"'):
+            values.append(token[1:-1].replace('\\"', '"').replace("\\\\", "\\"))
+        elif token in ("yes", "on", "true"):
+            values.append(True)
+        elif token in ("no", "off", "false"):
+            values.append(False)
+        else:
+            try:
+                values.append(int(token))
+            except ValueError:
+                try:
+                    values.append(float(token))
+                except ValueError:
+                    values.append(token)
+        index += 1
+
+    if not values:
+        return None
+    return values[0] if len(values) == 1 else tuple(values)
+
+
+def read_maya_ascii(path):
+    """Node table of a .ma file: {node: {"type", "values", "connections"}}, dag nodes by full path, the others by name."""
+    nodes = {}
+    by_name = {}
+    current = None
+
+    def get_node(name):
+        name = name.strip('"').lstrip(":")
+        key = name if name in nodes else by_name.get(name.rsplit("|", 1)[-1])
+        if key is None:
+            # Nodes Maya creates by itself (defaultResolution, defaultRenderGlobals...) only show up in a select
+            key = name
+            nodes[key] = {"type": None, "values": {}, "connections": []}
+            by_name[name] = key
+        return key
+
+    for tokens in read_statements(path):
+        command = tokens[0]
+        if command == "createNode":
+            node_type = tokens[1]
+            name = parent = None
+            for index, token in enumerate(tokens):
+                if token == "-n":
+                    name = tokens[index + 1].strip('"')
+                elif token == "-p":
+                    parent = tokens[index + 1].strip('"')
+            if parent is not None:
+                key = f"{get_node(parent)}|{name}"
+            elif node_type == "transform":
+                key = f"|{name}"
+            else:
+                key = name
+            nodes[key] = {"type": node_type, "values": {}, "connections": []}
+            by_name[name] = key
+            current = key
+
+        elif command == "select" and "-ne" in tokens:
+            current = get_node(tokens[-1])
+
+        elif command == "setAttr":
+            attr_index = next(index for index, token in enumerate(tokens) if token.startswith('"'))
+            plug = tokens[attr_index].strip('"')
+            node_name, attr = plug.rsplit(".", 1)
+            if not node_name:
+                node = current
+            elif plug.startswith("."):
+                continue  # Child of a compound attribute, none of those are read
+            else:
+                node = get_node(node_name)
+            value = parse_value(tokens[1:attr_index] + tokens[attr_index + 1:])
+            # setAttr -k off ".v" only changes a flag, not the value
+            if node is not None and value is not None:
+                nodes[node]["values"][ATTRIBUTE_NAMES[attr]] = value
+
+        elif command == "connectAttr":
+            source, destination = [token.strip('"') for token in tokens[1:] if token.startswith('"')][:2]
+            source_node, _ = source.rsplit(".", 1)
+            destination_node, destination_attr = destination.rsplit(".", 1)
+            nodes[get_node(destination_node)]["connections"].append((destination_attr, get_node(source_node)))
+
+    return nodes
+
+
+def build_scene_snapshot(path):
+    """Same snapshot as Sanity_Check_V02 builds in Maya, from the node table of a .ma file."""
+    nodes = read_maya_ascii(path)
+
+    def of_type(*node_types):
+        return [key for key, node in nodes.items() if node["type"] in node_types]
+
+    def get_value(node, attr):
+        return nodes[node]["values"].get(attr, ATTRIBUTES[attr][1])
+
+    snapshot_nodes = {
+        "file": of_type("file"),
+        "mesh": of_type("mesh"),
+        "light": of_type(*LIGHT_TYPES),
+    }
+    # Light groups: paths starting with "|LGT" (only once) that have children
+    parents = {key.rsplit("|", 1)[0] for key in nodes if key.startswith("|")}
+    snapshot_nodes["light_group"] = [key for key in nodes if key.startswith("|LGT") and key.count("|LGT") == 1 and key in parents]
+
+    values = {}
+    for node_type, attrs in SNAPSHOT_ATTRIBUTES.items():
+        for node in snapshot_nodes[node_type]:
+            for attr in attrs:
+                values[(node, attr)] = get_value(node, attr)
+    for node, attr in GLOBAL_PLUGS:
+        if node in nodes:
+            values[(node, attr)] = get_value(node, attr)
+    # The render globals always exist in Maya, with their default values when the file doesn't change them
+    for node in ("defaultResolution", "defaultRenderGlobals"):
+        for plug_node, attr in GLOBAL_PLUGS:
+            if plug_node == node:
+                values.setdefault((node, attr), ATTRIBUTES[attr][1])
+
+    options = nodes.get("defaultArnoldRenderOptions", {"connections": []})["connections"]
+    color_management = nodes.get("defaultColorMgtGlobals", {"values": {}})["values"]
+    return {
+        "nodes": snapshot_nodes,
+        "values": values,
+        "imagers": [source for attr, source in options if attr.startswith("imagers")],
+        # AOVs connected to the render options (short name "aovs" in the file), named by their aovName or like mtoa names them (aiAOV_<name>)
+        "aovs": list(dict.fromkeys(get_value(source, "aovName") or source.replace("aiAOV_", "", 1)
+                                   for attr, source in options if attr.startswith(("aovs", "aovList")))),
+        "color_management": (color_management.get("cmEnabled", ATTRIBUTES["cmEnabled"][1]),
+                             color_management.get("configFilePath", ATTRIBUTES["configFilePath"][1])),
+    }
+
+
+##################
+##CHECKS
+##################
+
+def check_render_resolution(snapshot):
+    """Check if the render resolution is set to 1920x804."""
+    width = snapshot["values"][("defaultResolution", "width")]
+    height = snapshot["values"][("defaultResolution", "height")]
+
+    # Set This for a different resolution if needed
+    target_width = 1920
+    target_height = 804
+
+    if width == target_width and height == target_height:
+        return True, None
+    else:
+        return False, f"Render resolution is incorrect! Current: {width}x{height}, Expected: {target_width}x{target_height}."
+
+
+def check_frame_animation_ext(snapshot):
+    """Check if Frame/Animation ext is set to 'name_♯.ext'."""
+    animation_enabled = snapshot["values"][("defaultRenderGlobals", "animation")]
+    put_frame_before_ext = snapshot["values"][("defaultRenderGlobals", "putFrameBeforeExt")]
+    period_in_ext = snapshot["values"][("defaultRenderGlobals", "periodInExt")]
+
+    if animation_enabled and put_frame_before_ext == 1 and period_in_ext == 2:
+        return True, None
+    else:
+        return False, (
+            f"Frame/Animation ext is incorrect! Current settings: "
+            f"animation={animation_enabled}, putFrameBeforeExt={put_frame_before_ext}, "
+            f"periodInExt={period_in_ext}. Expected: 'name_#.ext'."
+        )
+
+
+def check_color_management_settings(snapshot):
+    """Check if color management is enabled and OCIO Config Path is set correctly."""
+
+    # You can set your own path here if you want
+    expected_path = "S:/SIC3D/SIC5/Projects/KAMARADE/aces_1.2/config.ocio"
+
+    color_management_enabled, ocio_path = snapshot["color_management"]
+
+    if not color_management_enabled:
+        return False, "Color Management is not enabled!"
+
+    if ocio_path != expected_path:
+        return False, (
+            f"OCIO Config Path is incorrect! Current: '{ocio_path}', Expected: '{expected_path}'."
+        )
+
+    return True, None
+
+
+def check_render_aovs(snapshot):
+    """Check if all required AOVs are correctly configured in the render settings."""
+    required_aovs = ["ID", "N", "P", "RGBA", "Z", "albedo", "crypto_asset", "crypto_material", "crypto_object",
+                     "diffuse", "emission", "motionvector", "specular_direct", "specular_indirect", "transmission"]
+
+    failed_aovs = []
+
+    # Check if each required AOV is configured
+    for aov in required_aovs:
+        if aov not in snapshot["aovs"]:
+            failed_aovs.append(f"AOV '{aov}' is missing!")
+
+    # Check if RGBA AOV has the correct lightGroups attribute
+    if ("aiAOV_RGBA", "lightGroups") in snapshot["values"]:
+        light_groups_value = snapshot["values"][("aiAOV_RGBA", "lightGroups")]
+        if light_groups_value != 1:
+            failed_aovs.append(f"RGBA AOV 'lightGroups' is incorrect! Found: {light_groups_value}, expected: True.")
+    else:
+        failed_aovs.append("RGBA AOV node does not exist!")
+
+    if failed_aovs:
+        return False, "\n".join(failed_aovs)
+    else:
+        return True, None
+
+
+def check_arnold_imagers(snapshot):
+    """Ensure the only imager is aiImagerDenoiserOidn1 with a valid layer selection and correct output suffix."""
+    expected_imager = EXPECTED_IMAGER
+    required_suffix = "_denoise"
+
+    imagers = snapshot["imagers"]
+
+    if not imagers:
+        return False, "No imagers are connected to the Arnold render options!"
+
+    if len(imagers) > 1:
+        return False, f"Too many imagers connected! Found: {', '.join(imagers)}. Expected only: {expected_imager}."
+
+    if imagers[0] != expected_imager:
+        return False, f"Incorrect imager connected! Found: {imagers[0]}. Expected: {expected_imager}."
+
+    layer_selection = snapshot["values"][(expected_imager, "layerSelection")].strip()
+    if not layer_selection:
+        return False, f"Layer selection is empty for {expected_imager}! It must contain some value."
+
+    output_suffix = snapshot["values"][(expected_imager, "outputSuffix")].strip()
+    if not output_suffix.endswith(required_suffix):
+        return False, (
+            f"Output suffix is incorrect for {expected_imager}! "
+            f"Found: '{output_suffix}', expected to end with '{required_suffix}'."
+        )
+
+    return True, None
+
+
+def check_color_space_for_textures(snapshot):
+    """Check if textures are set to the correct color space based on texture names."""
+    failed_checks = []
+
+    file_nodes = snapshot["nodes"]["file"]
+
+    if not file_nodes:
+        # Textures usually come from references, which aren't read: only a warning here
+        return True, "No file textures found in the scene."
+
+    for file_node in file_nodes:
+        file_name = snapshot["values"][(file_node, "fileTextureName")]
+        color_space = snapshot["values"][(file_node, "colorSpace")]
+
+        if "ACES" in file_name and color_space != "ACES - ACEScg":
+            failed_checks.append(f"Texture '{file_node}' should be set to 'ACES - ACEScg'. Current: {color_space}.")
+
+        if "Raw" in file_name and color_space != "Utility - Raw":
+            failed_checks.append(f"Texture '{file_node}' should be set to 'Utility - Raw'. Current: {color_space}.")
+
+    if failed_checks:
+        return False, "\n".join(failed_checks)
+    else:
+        return True, None
+
+
+def check_lights(snapshot):
+    """Check if each group starting with 'LGT' has visibility turned on, and check light shapes HSV values and aiAov attribute."""
+    failed_lights = []
+    for light_group in snapshot["nodes"]["light_group"]:
+        if not snapshot["values"][(light_group, "visibility")]:
+            failed_lights.append(f"Light group '{light_group}' has visibility turned off.")
+
+    for shape in snapshot["nodes"]["light"]:
+        rgb_values = snapshot["values"][(shape, "color")]
+        hsv_values = colorsys.rgb_to_hsv(rgb_values[0], rgb_values[1], rgb_values[2])
+        if hsv_values[2] > 1.0:
+            failed_lights.append(f"Light '{shape}' has HSV value 'V' above 1.0. V = {hsv_values[2]}")
+
+        if snapshot["values"][(shape, "aiAov")] == "default":
+            failed_lights.append(f"Light '{shape}' has aiAov set to 'default'.")
+
+    if failed_lights:
+        return False, "\n".join(failed_lights)
+    else:
+        return True, None
+
+
+def check_display_smooth_mesh(snapshot):
+    """Check if any mesh shape has 'displaySmoothMesh' enabled (should be off)."""
+    smooth_mesh_enabled = []
+
+    for mesh in snapshot["nodes"]["mesh"]:
+        value = snapshot["values"][(mesh, "displaySmoothMesh")]
+        if value != 0:
+            smooth_mesh_enabled.append(f"{mesh} (displaySmoothMesh={value})")
+
+    if smooth_mesh_enabled:
+        return False, "The following mesh shapes have 'displaySmoothMesh' enabled:\n" + "\n".join(smooth_mesh_enabled)
+
+    return True, None
+
+
+CHECKS = [
+    check_render_resolution,
+    check_frame_animation_ext,
+    check_color_management_settings,
+    check_render_aovs,
+    check_arnold_imagers,
+    check_color_space_for_textures,
+    check_lights,
+    check_display_smooth_mesh,
+]
+
+
+##################
+##SEQUENCE
+##################
+
+def check_scene_file(path):
+    """Runs every check on one .ma, in a worker process: (path, error messages, warnings).
+
+    A check that passes with a message is a warning, it doesn't fail the scene.
+    """
+    try:
+        snapshot = build_scene_snapshot(path)
+    except Exception as e:
+        return path, [f"Couldn't read the scene: {e}"], []
+
+    errors, warnings = [], []
+    for check in CHECKS:
+        passed, message = check(snapshot)
+        if not passed:
+            errors.append(message)
+        elif message:
+            warnings.append(message)
+    return path, errors, warnings
+
+
+def find_scene_files(paths):
+    """The .ma files given, plus every .ma under the folders given."""
+    scene_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for folder, _, file_names in os.walk(path):
+                scene_files += [os.path.join(folder, name) for name in sorted(file_names) if name.lower().endswith(".ma")]
+        else:
+            scene_files.append(path)
+    return scene_files
+
+
+def check_sequence(paths):
+    """Checks all the scenes in parallel and prints the results like Sanity_Check_V02, returns True when all passed."""
+    scene_files = find_scene_files(paths)
+    if not scene_files:
+        print("No .ma files found.")
+        return False
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=SanityWorkers) as pool:
+        for path, errors, warnings in pool.map(check_scene_file, scene_files):
+            print(f"\n{'⚠️' if errors else '✅'} {path}")
+            for error_message in errors:
+                print(f"❌ {error_message}")
+            for warning_message in warnings:
+                print(f"⚠️ {warning_message}")
+            failed += bool(errors)
+
+    if failed:
+        print(f"\n⚠️ {failed} of {len(scene_files)} scenes failed. See messages above for details.")
+    else:
+        print(f"\n🎉 All checks passed on {len(scene_files)} scenes!")
+    return not failed
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python Sanity_Check_Offline.py <scene.ma or folder> [<scene.ma or folder>...]")
+        sys.exit(2)
+    sys.exit(0 if check_sequence(sys.argv[1:]) else 1)
@@ -22,7 +22,7 @@ Checks performed:
 
 5. Arnold Imagers: Verify the presence and settings of Arnold imagers.
 
-6. Render Layers: Validate render layer settings, including renderable cameras and output configurations.
+6. Render Layers: Validate render layer settings, including renderable cameras and output configurations (read from Render Setup, no layer switching).
 
 7. Texture Color Space: Ensure texture nodes use the appropriate color spaces based on naming conventions.
 
@@ -36,15 +36,192 @@ The script provides a summary of all checks, indicating which have passed and wh
 
 import maya.cmds as cmds
 
+import maya.api.OpenMaya as om
+
 import mtoa.aovs as aovs
 
+import maya.app.renderSetup.model.renderSetup as renderSetup
+
 import colorsys
 
 
-def check_render_resolution():
+# The scene is read once per run into a snapshot that every check reads from:
+# nodes listed per type, and their attributes read in bulk through the API
+LIGHT_TYPES = ['aiAreaLight', 'aiPointLight', 'aiSpotLight', 'directionalLight']
+EXPECTED_IMAGER = "aiImagerDenoiserOidn1"
+
+SNAPSHOT_ATTRIBUTES = {
+    "camera": ["renderable"],
+    "file": ["fileTextureName", "colorSpace"],
+    "mesh": ["displaySmoothMesh"],
+    "light": ["color", "aiAov"],
+    "light_group": ["visibility"],
+    "renderLayer": ["renderable"],
+}
+
+DRIVER_ATTRIBUTES = ["halfPrecision", "autocrop", "mergeAOVs", "tiled"]
+
+GLOBAL_PLUGS = [
+    ("defaultResolution", "width"),
+    ("defaultResolution", "height"),
+    ("defaultRenderGlobals", "animation"),
+    ("defaultRenderGlobals", "putFrameBeforeExt"),
+    ("defaultRenderGlobals", "periodInExt"),
+    ("defaultArnoldRenderOptions", "lowLightThreshold"),
+    *[("defaultArnoldDriver", attr) for attr in DRIVER_ATTRIBUTES],
+    ("aiAOV_RGBA", "lightGroups"),
+    (EXPECTED_IMAGER, "layerSelection"),
+    (EXPECTED_IMAGER, "outputSuffix"),
+]
+
+# Incremental mode: scene callbacks mark the checks reading what changed as dirty, the other checks reuse their last result
+IncrementalChecks = False  # Opt-in, the callbacks stay registered until the scene changes or stop_incremental_checks()
+
+RENDER_SETUP_TYPES = ["renderSetupLayer", "collection", "renderSettingsCollection", "aovCollection", "aovChildCollection",
+                      "lightsCollection", "lightsChildCollection", "absOverride", "relOverride", "absUniqueOverride",
+                      "relUniqueOverride", "simpleSelector"]
+
+# What each check reads: node type or node name -> attributes, None for any attribute
+CHECK_INPUTS = {
+    "check_render_resolution": {"defaultResolution": ["width", "height"]},
+    "check_frame_animation_ext": {"defaultRenderGlobals": ["animation", "putFrameBeforeExt", "periodInExt"]},
+    "check_color_management_settings": {"defaultColorMgtGlobals": None},
+    "check_render_settings": {"camera": ["renderable"], "defaultArnoldRenderOptions": ["lowLightThreshold"]},
+    "check_render_aovs": {"aiAOV": None, "defaultArnoldRenderOptions": ["aovList"]},
+    "check_arnold_imagers": {"aiImagerDenoiserOidn": None, "defaultArnoldRenderOptions": ["imagers"]},
+    "check_color_space_for_textures": {"file": ["fileTextureName", "colorSpace"]},
+    "check_lights": {**{light_type: ["color", "aiAov"] for light_type in LIGHT_TYPES}, "transform": ["visibility"]},
+    "check_display_smooth_mesh": {"mesh": ["displaySmoothMesh"]},
+    "check_render_layers": {"camera": ["renderable"], "defaultArnoldDriver": DRIVER_ATTRIBUTES, "renderLayer": None,
+                            **{setup_type: None for setup_type in RENDER_SETUP_TYPES}},
+}
+
+# Kept when the script is run again from the Script Editor, the callbacks already registered point at it
+incremental_state = globals().get("incremental_state") or {
+    "callbacks": [],       # Scene wide callbacks
+    "node_callbacks": {},  # MObjectHandle hash -> (handle, attribute changed callback)
+    "results": {},         # Check name -> (passed, error message) of the last run
+    "dirty": set(),        # Checks whose inputs changed since the last run
+}
+
+INTEGER_TYPES = [om.MFnNumericData.kByte, om.MFnNumericData.kChar, om.MFnNumericData.kShort, om.MFnNumericData.kInt]
+
+
+def read_plug_value(plug):
+    """Reads a plug through the API with the type getAttr would give (compounds as tuples)."""
+    if plug.isCompound:
+        return tuple(read_plug_value(plug.child(index)) for index in range(plug.numChildren()))
+    attribute = plug.attribute()
+    if attribute.hasFn(om.MFn.kTypedAttribute):
+        return plug.asString()
+    if attribute.hasFn(om.MFn.kEnumAttribute):
+        return plug.asShort()
+    if attribute.hasFn(om.MFn.kNumericAttribute):
+        numeric_type = om.MFnNumericAttribute(attribute).numericType()
+        if numeric_type == om.MFnNumericData.kBoolean:
+            return plug.asBool()
+        if numeric_type in INTEGER_TYPES:
+            return plug.asInt()
+    return plug.asDouble()
+
+
+def read_plugs(node_attributes):
+    """Reads every (node, attribute) through the API: {(node, attribute): value}, the ones that don't exist are left out."""
+    values = {}
+    for node, attr in node_attributes:
+        selection = om.MSelectionList()
+        try:
+            selection.add(f"{node}.{attr}")
+        except RuntimeError:
+            continue
+        values[(node, attr)] = read_plug_value(selection.getPlug(0))
+    return values
+
+
+def get_layer_overrides(collection, camera_shapes, overrides=None):
+    """Values a Render Setup collection and its sub collections set on camera renderable and the Arnold driver: {(node, attribute): value}.
+
+    Children apply in order so a later override wins, like Render Setup does. Only absolute overrides are read,
+    they're the only ones that make sense on booleans.
+    """
+    overrides = {} if overrides is None else overrides
+    if not collection.isEnabled():
+        return overrides
+
+    members = None
+    for child in collection.getChildren():
+        if hasattr(child, "getSelector"):
+            get_layer_overrides(child, camera_shapes, overrides)
+            continue
+        if not (hasattr(child, "getAttrValue") and child.isEnabled()):
+            continue
+
+        attr = child.attributeName()
+        if hasattr(child, "targetNodeName"):
+            # Render settings overrides target a single node
+            nodes = [child.targetNodeName()]
+        else:
+            if members is None:
+                # Collection members by short name, camera transforms stand for their shape
+                members = {name.rsplit("|", 1)[-1] for name in collection.getSelector().names()}
+            nodes = [shape for name, shape in camera_shapes.items() if name in members]
+            if "defaultArnoldDriver" in members:
+                nodes.append("defaultArnoldDriver")
+
+        for node in nodes:
+            if (attr == "renderable" and node != "defaultArnoldDriver") or (node == "defaultArnoldDriver" and attr in DRIVER_ATTRIBUTES):
+                overrides[(node, attr)] = child.getAttrValue()
+    return overrides
+
+
+def get_master_value(node, attr, value):
+    """Master layer value of a plug the visible layer overrides, without switching layers.
+
+    Render Setup puts a chain of apply override nodes in front of an overridden plug, the first one keeps the
+    value the plug had before in its original attribute. value is returned when nothing overrides the plug.
+    """
+    plug = f"{node}.{attr}"
+    apply_node = None
+    while True:
+        sources = cmds.listConnections(plug, source=True, destination=False, plugs=True) or []
+        source_node = sources[0].split(".", 1)[0] if sources else None
+        if not source_node or not cmds.attributeQuery("original", node=source_node, exists=True):
+            break
+        apply_node = source_node
+        plug = f"{apply_node}.original"
+    return cmds.getAttr(plug) if apply_node else value
+
+
+def build_scene_snapshot():
+    """Lists the nodes the checks need once per type and reads all their attributes, plus the render globals."""
+    nodes = {
+        "camera": cmds.ls(type="camera", long=True) or [],
+        "file": cmds.ls(type="file") or [],
+        "mesh": cmds.ls(type="mesh", long=True) or [],
+        "light": cmds.ls(type=LIGHT_TYPES, long=True) or [],
+        "renderLayer": cmds.ls(type="renderLayer") or [],
+    }
+
+    # Light groups: paths starting with "|LGT" (only once) that have children, children found from the paths themselves
+    lgt_paths = cmds.ls("|LGT*", dag=True, long=True) or []
+    parents = {path.rsplit("|", 1)[0] for path in lgt_paths}
+    nodes["light_group"] = [path for path in lgt_paths if path.count("|LGT") == 1 and path in parents]
+
+    node_attributes = [(node, attr) for node_type, attrs in SNAPSHOT_ATTRIBUTES.items() for node in nodes[node_type] for attr in attrs]
+    return {
+        "nodes": nodes,
+        "values": read_plugs(node_attributes + GLOBAL_PLUGS),
+        "imagers": cmds.listConnections("defaultArnoldRenderOptions.imagers", source=True, destination=False) or [],
+        "aovs": [aov[0] for aov in aovs.AOVInterface().getAOVNodes(names=True)],
+        "color_management": (cmds.colorManagementPrefs(query=True, cmEnabled=True),
+                             cmds.colorManagementPrefs(query=True, configFilePath=True)),
+    }
+
+
+def check_render_resolution(snapshot):
     """Check if the render resolution is set to 1920x804."""
-    width = cmds.getAttr("defaultResolution.width")
-    height = cmds.getAttr("defaultResolution.height")
+    width = snapshot["values"][("defaultResolution", "width")]
+    height = snapshot["values"][("defaultResolution", "height")]
     
     # Set This for a different resolution if needed     
     target_width = 1920
@@ -55,11 +232,11 @@ def check_render_resolution():
     else:
         return False, f"Render resolution is incorrect! Current: {width}x{height}, Expected: {target_width}x{target_height}."
         
-def check_frame_animation_ext():
+def check_frame_animation_ext(snapshot):
     """Check if Frame/Animation ext is set to 'name_♯.ext'."""
-    animation_enabled = cmds.getAttr("defaultRenderGlobals.animation")
-    put_frame_before_ext = cmds.getAttr("defaultRenderGlobals.putFrameBeforeExt")
-    period_in_ext = cmds.getAttr("defaultRenderGlobals.periodInExt")
+    animation_enabled = snapshot["values"][("defaultRenderGlobals", "animation")]
+    put_frame_before_ext = snapshot["values"][("defaultRenderGlobals", "putFrameBeforeExt")]
+    period_in_ext = snapshot["values"][("defaultRenderGlobals", "periodInExt")]
     
     if animation_enabled and put_frame_before_ext == 1 and period_in_ext == 2:
         return True, None
@@ -70,20 +247,19 @@ def check_frame_animation_ext():
             f"periodInExt={period_in_ext}. Expected: 'name_#.ext'."
         )
 
-def check_color_management_settings():
+def check_color_management_settings(snapshot):
     """Check if color management is enabled and OCIO Config Path is set correctly."""
     
     # You can set your own path here if you want
     expected_path = "S:/SIC3D/SIC5/Projects/KAMARADE/aces_1.2/config.ocio"
     
     # Check if color management is enabled
-    color_management_enabled = cmds.colorManagementPrefs(query=True, cmEnabled=True)
+    color_management_enabled, ocio_path = snapshot["color_management"]
     
     if not color_management_enabled:
         return False, "Color Management is not enabled!"
 
     # Check the OCIO Config Path
-    ocio_path = cmds.colorManagementPrefs(query=True, configFilePath=True)
 
     if ocio_path != expected_path:
         return False, (
@@ -93,7 +269,7 @@ def check_color_management_settings():
     return True, None
         
         
-def check_render_aovs():
+def check_render_aovs(snapshot):
     """Check if all required AOVs are correctly configured in the render settings."""
     required_aovs = [
         {"name": "ID", "data": "uint", "driver": "<exr>", "filter": "closest"},
@@ -113,11 +289,8 @@ def check_render_aovs():
         {"name": "transmission", "data": "rgb", "driver": "<exr>", "filter": "gaussian"},
     ]
 
-    # Get the list of existing AOVs
-    aovs_list = aovs.AOVInterface().getAOVNodes(names=True)
-
-    # Extract the AOV names from the list (the first element in the tuple)
-    existing_aov_names = [aov[0] for aov in aovs_list]
+    # Existing AOV names, listed once in the snapshot
+    existing_aov_names = snapshot["aovs"]
 
     failed_aovs = []
 
@@ -128,13 +301,12 @@ def check_render_aovs():
             
     # Check if RGBA AOV has the correct lightGroups attribute
     rgba_aov_node = f"aiAOV_{'RGBA'}"
-    if cmds.objExists(rgba_aov_node):
-        if cmds.attributeQuery("lightGroups", node=rgba_aov_node, exists=True):
-            light_groups_value = cmds.getAttr(f"{rgba_aov_node}.lightGroups")
-            if light_groups_value != 1:
-                failed_aovs.append(f"RGBA AOV 'lightGroups' is incorrect! Found: {light_groups_value}, expected: True.")
-        else:
-            failed_aovs.append("RGBA AOV is missing the 'lightGroups' attribute!")
+    if ("aiAOV_RGBA", "lightGroups") in snapshot["values"]:
+        light_groups_value = snapshot["values"][("aiAOV_RGBA", "lightGroups")]
+        if light_groups_value != 1:
+            failed_aovs.append(f"RGBA AOV 'lightGroups' is incorrect! Found: {light_groups_value}, expected: True.")
+    elif cmds.objExists(rgba_aov_node):
+        failed_aovs.append("RGBA AOV is missing the 'lightGroups' attribute!")
     else:
         failed_aovs.append("RGBA AOV node does not exist!")
 
@@ -143,15 +315,13 @@ def check_render_aovs():
     else:
         return True, None
 
-def check_arnold_imagers():
+def check_arnold_imagers(snapshot):
     """Ensure the only imager is aiImagerDenoiserOidn1 with a valid layer selection and correct output suffix."""
-    import maya.cmds as cmds
-
-    expected_imager = "aiImagerDenoiserOidn1"
+    expected_imager = EXPECTED_IMAGER
     required_suffix = "_denoise"
 
     # Get all imagers connected to the Arnold render options
-    imagers = cmds.listConnections("defaultArnoldRenderOptions.imagers", source=True, destination=False) or []
+    imagers = snapshot["imagers"]
 
     if not imagers:
         return False, "No imagers are connected to the Arnold render options!"
@@ -164,12 +334,12 @@ def check_arnold_imagers():
         return False, f"Incorrect imager connected! Found: {imagers[0]}. Expected: {expected_imager}."
 
     # Check that something is written in the layer selection
-    layer_selection = cmds.getAttr(f"{expected_imager}.layerSelection").strip()
+    layer_selection = snapshot["values"][(expected_imager, "layerSelection")].strip()
     if not layer_selection:
         return False, f"Layer selection is empty for {expected_imager}! It must contain some value."
 
     # Check that outputSuffix ends with the required suffix
-    output_suffix = cmds.getAttr(f"{expected_imager}.outputSuffix").strip()
+    output_suffix = snapshot["values"][(expected_imager, "outputSuffix")].strip()
     if not output_suffix.endswith(required_suffix):
         return False, (
             f"Output suffix is incorrect for {expected_imager}! "
@@ -179,58 +349,79 @@ def check_arnold_imagers():
     return True, None
 
 
-def check_render_settings():
+def check_render_settings(snapshot):
     """Ensure that key render settings in Arnold are correctly configured."""
     settings = {
-        "defaultArnoldRenderOptions.lowLightThreshold": 0.015,
+        ("defaultArnoldRenderOptions", "lowLightThreshold"): 0.015,
     }
 
     # Check for renderable cameras
-    renderable_cameras = [cam for cam in cmds.ls(type="camera") if cmds.getAttr(cam + ".renderable")]
+    renderable_cameras = [cam for cam in snapshot["nodes"]["camera"] if snapshot["values"].get((cam, "renderable"))]
 
     if not renderable_cameras:
         return False, "No renderable cameras found in the scene!"
 
     # Check the Arnold render settings
-    for attr, expected_value in settings.items():
-        if not cmds.objExists(attr):
-            return False, f"Attribute {attr} does not exist!"
+    for (node, attr), expected_value in settings.items():
+        if (node, attr) not in snapshot["values"]:
+            return False, f"Attribute {node}.{attr} does not exist!"
 
-        current_value = cmds.getAttr(attr)
+        current_value = snapshot["values"][(node, attr)]
 
         # Round both values to 2 decimal places for a more forgiving check
         if round(current_value, 2) != round(expected_value, 2):
-            return False, f"{attr} is incorrect! Found: {current_value}, expected: {expected_value}."
+            return False, f"{node}.{attr} is incorrect! Found: {current_value}, expected: {expected_value}."
 
     return True, None
 
-def check_render_layers():
+def check_render_layers(snapshot):
     """Check for valid renderable cameras, render output settings, active layers, and master layer status per render layer."""
-    layers = cmds.ls(type="renderLayer")
+    layers = snapshot["nodes"]["renderLayer"]
 
     if not layers:
         return False, "❌ No render layers found!"
 
-    # Store the current render layer
+    # Render Setup layers by the name of their legacy renderLayer node
+    setup_layers = {f"rs_{setup_layer.name()}": setup_layer for setup_layer in renderSetup.instance().getRenderLayers()}
+
+    # Camera shapes by their short name and the short name of their transform, that's what collections select
+    camera_shapes = {}
+    for cam in snapshot["nodes"]["camera"]:
+        camera_shapes[cam.rsplit("|", 1)[-1]] = cam
+        camera_shapes[cam.rsplit("|", 2)[-2]] = cam
+
+    # What each layer overrides, read from the Render Setup model instead of switching to the layer
+    layer_overrides = {"defaultRenderLayer": {}}
+    for name, setup_layer in setup_layers.items():
+        layer_overrides[name] = {}
+        for collection in setup_layer.getCollections():
+            get_layer_overrides(collection, camera_shapes, layer_overrides[name])
+
+    plugs = [(cam, "renderable") for cam in snapshot["nodes"]["camera"]] + [("defaultArnoldDriver", attr) for attr in DRIVER_ATTRIBUTES]
+    base_values = {plug: snapshot["values"].get(plug) for plug in plugs}
+
+    # The visible layer's overrides are applied on the scene, the master values of those plugs sit behind the overrides
     current_layer = cmds.editRenderLayerGlobals(query=True, currentRenderLayer=True)
+    for plug in layer_overrides.get(current_layer, {}):
+        if plug in base_values:
+            base_values[plug] = get_master_value(*plug, base_values[plug])
 
     all_passed = True
     errors = []
 
     for layer in layers:
-        try:
-            cmds.editRenderLayerGlobals(currentRenderLayer=layer)
-        except RuntimeError:
-            errors.append(f"⚠️ Skipping layer '{layer}' because it cannot be activated.")
+        if layer not in layer_overrides:
+            errors.append(f"⚠️ Skipping layer '{layer}' because it isn't a Render Setup layer.")
             continue
+        layer_values = {**base_values, **layer_overrides[layer]}
 
         # ✅ Skip the defaultRenderLayer from the general active layer check
-        if layer != "defaultRenderLayer" and not cmds.getAttr(f"{layer}.renderable"):
+        if layer != "defaultRenderLayer" and not snapshot["values"].get((layer, "renderable")):
             errors.append(f"Layer '{layer}' is not active.")
             all_passed = False
 
         # ✅ Check Renderable Cameras
-        renderable_cameras = [cam for cam in cmds.ls(type="camera") if cmds.getAttr(cam + ".renderable")]
+        renderable_cameras = [cam.rsplit("|", 1)[-1] for cam in snapshot["nodes"]["camera"] if layer_values.get((cam, "renderable"))]
 
         if len(renderable_cameras) > 2:
             errors.append(f"More than 2 renderable cameras in layer '{layer}': {renderable_cameras}.")
@@ -242,10 +433,10 @@ def check_render_layers():
             
 
         # ✅ Check Render Output Settings
-        half_precision = cmds.getAttr("defaultArnoldDriver.halfPrecision")
-        autocrop = cmds.getAttr("defaultArnoldDriver.autocrop")
-        merge_aovs = cmds.getAttr("defaultArnoldDriver.mergeAOVs")
-        tiled = cmds.getAttr("defaultArnoldDriver.tiled")
+        half_precision = layer_values[("defaultArnoldDriver", "halfPrecision")]
+        autocrop = layer_values[("defaultArnoldDriver", "autocrop")]
+        merge_aovs = layer_values[("defaultArnoldDriver", "mergeAOVs")]
+        tiled = layer_values[("defaultArnoldDriver", "tiled")]
 
         if layer.startswith("rs_GLOBAL_"):
             # Special case: Layers starting with GLOBAL_ allow halfPrecision=False
@@ -280,30 +471,27 @@ def check_render_layers():
                 all_passed = False
 
         # ✅ Check if the master layer is deactivated (only for defaultRenderLayer)
-        if layer == "defaultRenderLayer" and cmds.getAttr(f"{layer}.renderable"):
+        if layer == "defaultRenderLayer" and snapshot["values"].get((layer, "renderable")):
             errors.append(f"Master layer '{layer}' is still active. It should be deactivated.")
             all_passed = False
 
-    # Restore the original render layer
-    cmds.editRenderLayerGlobals(currentRenderLayer=current_layer)
-
     return all_passed, "\n".join(errors) if errors else None
 
     
-def check_color_space_for_textures():
+def check_color_space_for_textures(snapshot):
     """Check if textures are set to the correct color space based on texture names."""
     failed_checks = []
 
     # Get all file textures in the scene
-    file_nodes = cmds.ls(type='file')
+    file_nodes = snapshot["nodes"]["file"]
 
     if not file_nodes:
         return False, "No file textures found in the scene."
 
     for file_node in file_nodes:
-        if cmds.objExists(file_node):  # Ensure the file node exists
-            file_name = cmds.getAttr(file_node + ".fileTextureName")
-            color_space = cmds.getAttr(file_node + ".colorSpace")
+        if (file_node, "fileTextureName") in snapshot["values"]:  # Ensure the file node was read
+            file_name = snapshot["values"][(file_node, "fileTextureName")]
+            color_space = snapshot["values"][(file_node, "colorSpace")]
 
             # Check for textures with "ACES" in the name
             if "ACES" in file_name:
@@ -322,65 +510,50 @@ def check_color_space_for_textures():
         return True, None
 
 
-def check_lights():
+def check_lights(snapshot):
     """Check if each group starting with 'LGT' has visibility turned on, and check light shapes HSV values and aiAov attribute."""
-    # List all objects in the scene
-    all_objects = cmds.ls(dag=True, long=True)
-    
-    # Filter the objects to get only those starting with "|LGT" and have exactly one "|LGT" in their name, and have children
-    light_groups = [
-        obj for obj in all_objects
-        if obj.startswith('|LGT') and obj.count('|LGT') == 1 and cmds.listRelatives(obj, children=True)
-    ]
+    # Groups starting with "|LGT" that have exactly one "|LGT" in their name, and have children
+    light_groups = snapshot["nodes"]["light_group"]
     
     # Check visibility for each light group
     failed_lights = []
     for light_group in light_groups:
-        visibility = cmds.getAttr(f"{light_group}.visibility")
+        visibility = snapshot["values"][(light_group, "visibility")]
         if not visibility:
             failed_lights.append(f"Light group '{light_group}' has visibility turned off.")
     
     # Check light shapes HSV values and aiAov attribute
     failed_light_shapes = []
-    all_transform_nodes = cmds.ls(type='transform', long=True)  # Use long names (full paths)
     
-    for transform in all_transform_nodes:
-        # Get the shape of the transform node
-        shapes = cmds.listRelatives(transform, shapes=True, fullPath=True)
-        
-        if shapes:
-            shape = shapes[0]
-            shape_type = cmds.nodeType(shape)
+    # Light shapes (Arnold and standard lights), listed by type in the snapshot
+    for shape in snapshot["nodes"]["light"]:
+        try:
+            # Get the color value (RGB) of the light shape
+            rgb_values = snapshot["values"][(shape, "color")]  # RGB values as a tuple
             
-            # Check if the shape is a light type (Arnold and standard lights)
-            if shape_type in ['aiAreaLight', 'aiPointLight', 'aiSpotLight', 'directionalLight']:
-                try:
-                    # Get the color value (RGB) of the light shape
-                    rgb_values = cmds.getAttr(shape + ".color")[0]  # RGB values as a tuple
-                    
-                    # Convert RGB to HSV
-                    hsv_values = colorsys.rgb_to_hsv(rgb_values[0], rgb_values[1], rgb_values[2])
-                    
-                    # Check if the V value of HSV is above 1.0
-                    if hsv_values[2] > 1.0:
-                        failed_light_shapes.append(f"Light '{shape}' has HSV value 'V' above 1.0. V = {hsv_values[2]}")
-
-                    # Check aiAov attribute for 'default' value
-                    ai_aov = cmds.getAttr(f"{shape}.aiAov")
-                    if ai_aov == "default":
-                        failed_light_shapes.append(f"Light '{shape}' has aiAov set to 'default'.")
-
-                except Exception as e:
-                    failed_light_shapes.append(f"Error with light shape '{shape}': {e}")
-    
+            # Convert RGB to HSV
+            hsv_values = colorsys.rgb_to_hsv(rgb_values[0], rgb_values[1], rgb_values[2])
+            
+            # Check if the V value of HSV is above 1.0
+            if hsv_values[2] > 1.0:
+                failed_light_shapes.append(f"Light '{shape}' has HSV value 'V' above 1.0. V = {hsv_values[2]}")
+
+            # Check aiAov attribute for 'default' value
+            ai_aov = snapshot["values"][(shape, "aiAov")]
+            if ai_aov == "default":
+                failed_light_shapes.append(f"Light '{shape}' has aiAov set to 'default'.")
+
+        except Exception as e:
+            failed_light_shapes.append(f"Error with light shape '{shape}': {e}")
+
     if failed_lights or failed_light_shapes:
         return False, "\n".join(failed_lights + failed_light_shapes)
     else:
         return True, None
         
-def check_display_smooth_mesh():
+def check_display_smooth_mesh(snapshot):
     """Check if any mesh shape has 'displaySmoothMesh' enabled (should be off)."""
-    meshes = cmds.ls(type="mesh", long=True)  # Get all mesh shapes (long names)
+    meshes = snapshot["nodes"]["mesh"]  # All mesh shapes (long names)
 
     if not meshes:
         return True, None
@@ -388,8 +561,8 @@ def check_display_smooth_mesh():
     smooth_mesh_enabled = []
 
     for mesh in meshes:
-        if cmds.attributeQuery("displaySmoothMesh", node=mesh, exists=True):
-            value = cmds.getAttr(f"{mesh}.displaySmoothMesh")
+        if (mesh, "displaySmoothMesh") in snapshot["values"]:
+            value = snapshot["values"][(mesh, "displaySmoothMesh")]
             if value != 0:
                 smooth_mesh_enabled.append(f"{mesh} (displaySmoothMesh={value})")
 
@@ -399,8 +572,103 @@ def check_display_smooth_mesh():
     return True, None
 
 
-def run_sanity_checks():
-    """Run all sanity checks and summarize results."""
+def get_changed_checks(node, attrs=None):
+    """Names of the checks reading this node, or only the given attributes of it."""
+    node_fn = om.MFnDependencyNode(node)
+    changed = set()
+    for check_name, inputs in CHECK_INPUTS.items():
+        for key in (node_fn.name(), node_fn.typeName):
+            if key in inputs and (attrs is None or inputs[key] is None or attrs & set(inputs[key])):
+                changed.add(check_name)
+    return changed
+
+
+def on_node_added_or_removed(node, client_data):
+    incremental_state["dirty"] |= get_changed_checks(node)
+
+
+def on_node_renamed(node, previous_name, client_data):
+    incremental_state["dirty"] |= get_changed_checks(node)
+
+
+def on_dag_changed(message, child, parent, client_data):
+    # Reparenting can move things in or out of the LGT groups
+    incremental_state["dirty"].add("check_lights")
+
+
+def on_attribute_changed(message, plug, other_plug, client_data):
+    if not message & (om.MNodeMessage.kAttributeSet | om.MNodeMessage.kConnectionMade | om.MNodeMessage.kConnectionBroken):
+        return
+    # Children of compounds (colorR...) count as their parent
+    attrs = {om.MFnAttribute(plug.attribute()).name}
+    if plug.isChild:
+        attrs.add(om.MFnAttribute(plug.parent().attribute()).name)
+    incremental_state["dirty"] |= get_changed_checks(plug.node(), attrs)
+
+
+def on_scene_changed(client_data):
+    # New scene, opened file, loaded reference or Maya closing: the callbacks would fire for every node,
+    # everything is removed and the next incremental run starts over
+    stop_incremental_checks()
+
+
+def watch_scene(snapshot):
+    """Adds an attribute changed callback on every node a check reads that doesn't have one yet."""
+    node_types = set(cmds.allNodeTypes())
+    inputs = {key for check_inputs in CHECK_INPUTS.values() for key in check_inputs if key != "transform"}
+    watched_types = [key for key in inputs if key in node_types]
+    nodes = (cmds.ls(type=watched_types) if watched_types else []) + cmds.ls(list(inputs - node_types))
+    # Transforms are only watched for the LGT groups, new groups come with a node added callback
+    nodes += snapshot["nodes"]["light_group"]
+
+    for node in nodes:
+        selection = om.MSelectionList()
+        try:
+            selection.add(node)
+        except RuntimeError:
+            continue
+        node_object = selection.getDependNode(0)
+        handle = om.MObjectHandle(node_object)
+        watched = incremental_state["node_callbacks"].get(handle.hashCode())
+        if watched is None or not watched[0].isAlive():
+            callback = om.MNodeMessage.addAttributeChangedCallback(node_object, on_attribute_changed)
+            incremental_state["node_callbacks"][handle.hashCode()] = (handle, callback)
+
+
+def start_incremental_checks():
+    """Registers the scene callbacks, the next run checks everything once."""
+    incremental_state["results"].clear()
+    incremental_state["callbacks"] = [
+        om.MDGMessage.addNodeAddedCallback(on_node_added_or_removed, "dependNode"),
+        om.MDGMessage.addNodeRemovedCallback(on_node_added_or_removed, "dependNode"),
+        om.MNodeMessage.addNameChangedCallback(om.MObject.kNullObj, on_node_renamed),
+        om.MDagMessage.addAllDagChangesCallback(on_dag_changed),
+        *[om.MSceneMessage.addCallback(message, on_scene_changed)
+          for message in (om.MSceneMessage.kBeforeNew, om.MSceneMessage.kBeforeOpen, om.MSceneMessage.kBeforeCreateReference,
+                          om.MSceneMessage.kBeforeLoadReference, om.MSceneMessage.kMayaExiting)],
+    ]
+
+
+def stop_incremental_checks():
+    """Removes every callback of the incremental mode and forgets the last results."""
+    callbacks = incremental_state["callbacks"] + [callback for handle, callback in incremental_state["node_callbacks"].values()]
+    for callback in callbacks:
+        try:
+            om.MMessage.removeCallback(callback)
+        except RuntimeError:
+            pass  # Already removed with its node
+    incremental_state["callbacks"] = []
+    incremental_state["node_callbacks"].clear()
+    incremental_state["results"].clear()
+    incremental_state["dirty"].clear()
+
+
+def run_sanity_checks(incremental=None):
+    """Run all sanity checks and summarize results.
+
+    In incremental mode only the checks whose inputs changed since the last run are evaluated, the others reuse their result.
+    """
+    incremental = IncrementalChecks if incremental is None else incremental
     checks = [
         check_render_resolution,
         check_frame_animation_ext,
@@ -411,15 +679,35 @@ def run_sanity_checks():
         check_color_space_for_textures,
         check_lights,
         check_display_smooth_mesh,
-        
-        # PERFORMANCE HEAVY -- Turn off if you wanna check anything else than render layers
         check_render_layers,
         
     ]
     
+    if incremental and not incremental_state["callbacks"]:
+        start_incremental_checks()
+    elif not incremental and incremental_state["callbacks"]:
+        # Left over from an incremental run
+        stop_incremental_checks()
+
+    results = incremental_state["results"] if incremental else {}
+    to_run = [check for check in checks if check.__name__ in incremental_state["dirty"] or check.__name__ not in results]
+
+    if to_run:
+        # Read the scene once, every check works from the snapshot
+        snapshot = build_scene_snapshot()
+        if incremental:
+            watch_scene(snapshot)
+        for check in to_run:
+            results[check.__name__] = check(snapshot)
+    if incremental:
+        # Changes made by the checks themselves (render layer switch) don't count
+        incremental_state["dirty"].clear()
+        if len(to_run) < len(checks):
+            print(f"♻️ {len(checks) - len(to_run)} checks unchanged since the last run, results reused.")
+
     all_passed = True
     for check in checks:
-        passed, error_message = check()
+        passed, error_message = results[check.__name__]
         if not passed:
             print(f"❌ {error_message}")
             all_passed = False
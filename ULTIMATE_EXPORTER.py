@@ -1,77 +1,219 @@
+import sys
+
+# Headless bake worker started by the exporter (see bake_iouri_in_worker): Maya has to be up before anything uses it
+if "--bake-worker" in sys.argv:
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
 import maya.cmds as cmds
 import maya.mel as mel
 import json
 import os
+import time
+import contextlib
+import re
+import ctypes
+import getpass
+import shutil
+import subprocess
+import tempfile
+import hashlib
+import queue
+import threading
+import maya.utils
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+import numpy as np
 
 # Combination of the Iouri Baker And exporter into one neat button
 
+##################
+##PROFILING
+##################
+
+# Profiling, every publish writes a timing report in its version folder
+WriteChromeTrace = False  # Also write a trace that can be opened in chrome://tracing
+profile_spans = []
+
+@contextlib.contextmanager
+def timed_span(name, **info):
+    """Times a phase of the publish. Extra info (frames, nodes, file sizes...) can be added to the yielded dict."""
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        profile_spans.append({"name": name, "start": start, "duration": time.perf_counter() - start, **info})
+
+def write_profile_report(folder, report_name):
+    """Writes the recorded spans as a JSON report, and as a Chrome trace (chrome://tracing) if asked."""
+    if not profile_spans:
+        return
+    origin = min(span["start"] for span in profile_spans)
+    spans = [dict(span, start=span["start"] - origin) for span in profile_spans]
+    report = {
+        "scene": cmds.file(q=True, sn=True),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "total": max(span["start"] + span["duration"] for span in spans),
+        "spans": spans,
+    }
+    with open(os.path.join(folder, f"{report_name}_profile.json"), "w") as report_file:
+        json.dump(report, report_file, indent=4)
+
+    if WriteChromeTrace:
+        events = [
+            {"name": span["name"], "ph": "X", "pid": 1, "tid": 1,
+             "ts": span["start"] * 1e6, "dur": span["duration"] * 1e6,
+             "args": {key: value for key, value in span.items() if key not in ("name", "start", "duration")}}
+            for span in spans
+        ]
+        with open(os.path.join(folder, f"{report_name}_profile.trace.json"), "w") as trace_file:
+            json.dump({"traceEvents": events}, trace_file)
+
+    slowest = max(spans, key=lambda span: span["duration"])
+    print(f"Publish took {report['total']:.1f}s, slowest step: {slowest['name']} ({slowest['duration']:.1f}s)")
+
 ##################
 ##THE BAKER IS HERE
 ##################
 
 # Script used to setup iouri anim before export to marvelous and houdini
 
-#def to get objects with namespace
-def find_object_with_namespace(base_name):
-    objects = cmds.ls(f"*:{base_name}") or cmds.ls(base_name)
-    if not objects:
-        raise ValueError(f"Object '{base_name}' isn't found")
-    return objects[0]
+# Iouri's hierarchy, indexed once per run so every step of the baker resolves names with a dict lookup
+iouri_index = {}
+
+def build_iouri_index():
+    """Indexes every Iouri in the scene as {namespace: {short name: full path}}, with one listRelatives per rig."""
+    iouri_index.clear()
+    for root in cmds.ls("Iouri_Iouri", recursive=True, long=True) or []:
+        namespace = root.rsplit("|", 1)[-1].rpartition(":")[0]
+        nodes = {}
+        for path in cmds.listRelatives(root, allDescendents=True, fullPath=True) or []:
+            nodes.setdefault(path.rsplit("|", 1)[-1].rpartition(":")[2], path)
+        iouri_index[namespace] = nodes
+    return iouri_index
+
+def get_iouri_index():
+    """Returns the Iouri index, building it if this run didn't yet."""
+    return iouri_index or build_iouri_index()
+
+def find_iouri_node(base_name, namespace):
+    """Returns the full path of a node from the given Iouri's hierarchy (namespace ignored in base_name)."""
+    node = get_iouri_index().get(namespace, {}).get(base_name)
+    if not node:
+        raise ValueError(f"Object '{base_name}' isn't found in Iouri '{namespace}'")
+    return node
+
+# Bake engine used by bake_selected_animation: "bakeResults" (steps the scene, safe with simulations)
+# or "openmaya" (samples the plugs with the API and writes the curves directly, much faster)
+BakeEngine = "bakeResults"
+BakeTolerance = 1e-4
+
+# Cloth pose loaded 100 frames before the first key
+ClothPoseFile = "S:\\SIC3D\\SIC5\\Projects\\KAMARADE\\02-PROD\\SCRIPTS\\Hubert\\ClothPose.json"  # Adjust path to the pose file
+
+# Baked keys are reduced after the bake, a key is dropped when the curve stays within this error without it (UI units)
+KeyReduction = True
+KeyReductionTolerance = {
+    "animCurveTA": 0.05,   # degrees
+    "animCurveTL": 0.01,   # scene distance unit
+    "animCurveTU": 0.001,
+}
+
+# Bake QC, spikes are measured in robust z-scores (median/MAD of the channel over the shot)
+QcOutlierThreshold = 8.0
+QcScaleFloor = 0.01  # Smallest spread a channel is given, so nearly static channels don't flag every wobble
+QcRangeScaleFloor = 0.05  # Same, relative to the channel's range over the shot, for channels that hold still most of the time
+QcFlipThreshold = 90.0  # Degrees in one frame
+QcPrerollSpeedRatio = 1.0  # The pre-roll shouldn't move faster than the shot does
+
+# Space attributes that have to be put back after loading the cloth pose, per side
+SPACE_ATTRIBUTES = [
+    ("arm_{side}_ctl", "OrientSpace"),
+    ("arm_{side}_PV_ctl", "ParentSpace"),
+    ("hand_{side}_IK_ctl", "ParentSpace"),
+    ("leg_{side}_PV_ctl", "ParentSpace"),
+    ("ankle_{side}_IK_ctl", "ParentSpace"),
+]
+
+# Rig manifests (controllers, keyable attributes and defaults) are discovered once per rig file version
+RigManifestDirectory = "S:\\SIC3D\\SIC5\\Projects\\KAMARADE\\02-PROD\\SCRIPTS\\Hubert\\RigManifests"
+CONTROLLER_SET = "Iouri_Controllers"  # Used first if the rig has it
+CONTROLLER_SUFFIXES = ("_ctl", "_ctrl")
+EXTRA_CONTROLLERS = ["FLY", "TRAJ", "WORLD"]  # Top controllers that don't follow the naming
+rig_manifests = {}
+rig_file_hashes = {}
+
+def get_rig_file_hash(rig_file):
+    """Hashes the rig file content, once per file version and Maya session."""
+    stat = os.stat(rig_file)
+    key = (rig_file, stat.st_mtime, stat.st_size)
+    if key not in rig_file_hashes:
+        file_hash = hashlib.sha1()
+        with open(rig_file, "rb") as rig:
+            for chunk in iter(lambda: rig.read(16 * 1024 * 1024), b""):
+                file_hash.update(chunk)
+        rig_file_hashes[key] = file_hash.hexdigest()
+    return rig_file_hashes[key]
+
+def discover_rig_controllers(namespace):
+    """Finds the controllers of an Iouri (set, controller tags, then naming) with their keyable attributes and defaults."""
+    nodes = get_iouri_index()[namespace]
+    prefix = f"{namespace}:" if namespace else ""
+
+    controllers = []
+    if cmds.objExists(prefix + CONTROLLER_SET):
+        controllers = cmds.sets(prefix + CONTROLLER_SET, q=True) or []
+    if not controllers:
+        tags = cmds.ls(prefix + "*", type="controller") or []
+        controllers = cmds.listConnections([f"{tag}.controllerObject" for tag in tags], source=True, destination=False) or []
+    if not controllers:
+        controllers = [path for name, path in nodes.items() if name.endswith(CONTROLLER_SUFFIXES) or name in EXTRA_CONTROLLERS]
+
+    manifest = {}
+    for ctrl in cmds.ls(controllers, type="transform", long=True) or []:
+        short_name = ctrl.rsplit("|", 1)[-1].rpartition(":")[2]
+        if nodes.get(short_name) != ctrl:
+            continue  # Not part of this Iouri
+        attrs = cmds.listAttr(ctrl, keyable=True, unlocked=True) or []
+        manifest[short_name] = {attr: (cmds.attributeQuery(attr, node=ctrl, listDefault=True) or [0.0])[0] for attr in attrs}
+    return dict(sorted(manifest.items()))
+
+def get_rig_manifest(namespace):
+    """Returns {controller: {attr: default}} for an Iouri, from the on-disk cache when the rig file didn't change."""
+    if namespace in rig_manifests:
+        return rig_manifests[namespace]
+
+    root = cmds.ls(f"{namespace}:Iouri_Iouri" if namespace else "Iouri_Iouri", long=True)[0]
+    manifest_path = None
+    if cmds.referenceQuery(root, isNodeReferenced=True):
+        rig_file = cmds.referenceQuery(root, filename=True, withoutCopyNumber=True)
+        manifest_path = os.path.join(RigManifestDirectory, f"{get_rig_file_hash(rig_file)}.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r") as manifest_file:
+                rig_manifests[namespace] = json.load(manifest_file)["controllers"]
+            return rig_manifests[namespace]
+
+    controllers = discover_rig_controllers(namespace)
+    if manifest_path:
+        # Written next to the final name then renamed, so other artists never read half a file
+        os.makedirs(RigManifestDirectory, exist_ok=True)
+        temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as manifest_file:
+            json.dump({"rig_file": rig_file, "controllers": controllers}, manifest_file, indent=4)
+        os.replace(temp_path, manifest_path)
+        print(f"Rig manifest written for {rig_file}: {len(controllers)} controllers")
+    else:
+        print(f"Iouri '{namespace}' isn't referenced, controllers discovered without caching")
+    rig_manifests[namespace] = controllers
+    return controllers
 
 def select_iouri_controllers():
-    """Selects Iouri's controllers."""
-    controllers = [
-        "COG_ctl", "FLY", "TRAJ", "WORLD", "ankle_L_IK_ctl", "ankle_R_IK_ctl", "armMid_L_ctl", "armMid_R_ctl", "arm_L_IK_ctl", 
-        "arm_L_PV_ctl", "arm_L_ctl", "arm_L_options_ctl", "arm_L_pin_ctrl", "arm_L_tweaker01_ctl", "arm_L_tweaker02_ctl", 
-        "arm_L_tweaker03_ctl", "arm_L_tweaker04_ctl", "arm_R_IK_ctl", "arm_R_PV_ctl", "arm_R_ctl", "arm_R_options_ctl", 
-        "arm_R_pin_ctrl", "arm_R_tweaker01_ctl", "arm_R_tweaker02_ctl", "arm_R_tweaker03_ctl", "arm_R_tweaker04_ctl", 
-        "bottomSpine_IK_ctl", "breath_ctl", "button_L0_ctl", "button_L1_ctl", "button_R0_ctl", "button_R1_ctl", "cheek_L0_ctl", 
-        "cheek_L1_ctl", "cheek_L2_ctl", "cheek_L3_ctl", "cheek_L_main_ctl", "cheek_R0_ctl", "cheek_R1_ctl", "cheek_R2_ctl", 
-        "cheek_R3_ctl", "cheek_R_main_ctl", "clav_L_ctl", "clav_R_ctl", "collar_C0_ctl", "collar_C1_ctl", "collar_L0_ctl", 
-        "collar_L1_ctl", "collar_L2_ctl", "collar_R0_ctl", "collar_R1_ctl", "collar_R2_ctl", "collar_orient_L_ctl", 
-        "collar_orient_R_ctl", "collar_orient_back_ctl", "collar_orient_front_ctl", "ear_L_ctl", "ear_R_ctl", "elbow_L_ctl", 
-        "elbow_R_ctl", "eye_L00_ctl", "eye_L_L_ctl", "eye_R00_ctl", "eye_R_L_ctl", "eyebrow_L_ctl", "eyebrow_R_ctl", 
-        "eyebrow_xtra_L0_ctl", "eyebrow_xtra_L1_ctl", "eyebrow_xtra_L2_ctl", "eyebrow_xtra_L3_ctl", "eyebrow_xtra_R0_ctl", 
-        "eyebrow_xtra_R1_ctl", "eyebrow_xtra_R2_ctl", "eyebrow_xtra_R3_ctl", "foot_L_ctl", "foot_R_ctl", "forearmMid_L_ctl", 
-        "forearmMid_R_ctl", "forearm_L_ctl", "forearm_L_tweaker01_ctl", "forearm_L_tweaker02_ctl", "forearm_L_tweaker03_ctl", 
-        "forearm_L_tweaker04_ctl", "forearm_R_ctl", "forearm_R_tweaker01_ctl", "forearm_R_tweaker02_ctl", "forearm_R_tweaker03_ctl", 
-        "forearm_R_tweaker04_ctl", "frown_ctl", "hand_L_IK_ctl", "hand_R_IK_ctl", "head_ctl", "head_option_ctl", "hip_L_IK_ctl", 
-        "hip_R_IK_ctl", "hips_IK_ctl", "hips_L_ctl", "hips_R_ctl", "jaw_C0_ctl", "jaw_rotate_ctl", "kneeMid_L_ctl", "kneeMid_R_ctl", 
-        "knee_L_ctl", "knee_L_tweaker01_ctl", "knee_L_tweaker02_ctl", "knee_L_tweaker03_ctl", "knee_L_tweaker04_ctl", "knee_R_ctl", 
-        "knee_R_tweaker01_ctl", "knee_R_tweaker02_ctl", "knee_R_tweaker03_ctl", "knee_R_tweaker04_ctl", "knee_ribbon_L_ctl", 
-        "knee_ribbon_R_ctl", "legMid_L_ctl", "legMid_R_ctl", "leg_L_PV_ctl", "leg_L_options_ctl", "leg_L_pin_ctrl", 
-        "leg_L_tweaker01_ctl", "leg_L_tweaker02_ctl", "leg_L_tweaker03_ctl", "leg_L_tweaker04_ctl", "leg_R_PV_ctl", 
-        "leg_R_options_ctl", "leg_R_pin_ctrl", "leg_R_tweaker01_ctl", "leg_R_tweaker02_ctl", "leg_R_tweaker03_ctl", 
-        "leg_R_tweaker04_ctl", "lids_down_L0_ctl", "lids_down_L1_ctl", "lids_down_L2_ctl", "lids_down_R0_ctl", 
-        "lids_down_R1_ctl", "lids_down_R2_ctl", "lids_down_main_L0_ctl", "lids_down_main_R0_ctl", "lids_side_L0_ctl", 
-        "lids_side_L1_ctl", "lids_side_R0_ctl", "lids_side_R_ctl", "lids_up_L0_ctl", "lids_up_L1_ctl", "lids_up_L2_ctl", "lids_up_R0_ctl", 
-        "lids_up_R1_ctl", "lids_up_R2_ctl", "lids_up_main_L0_ctl", "lids_up_main_R0_ctl", "lip_down_C0_ctl", "lip_down_L0_ctl", 
-        "lip_down_R0_ctl", "lip_side_L0_ctl", "lip_side_R0_ctl", "lip_up_C0_ctl", "lip_up_L0_ctl", "lip_up_R0_ctl", "lookAt_L_ctl", 
-        "lookAt_R_ctl", "lookAt_ctl", "lower_lip_ctrl", "lowerteeth_ctl", "meta_L_ctl", "meta_R_ctl", "metamiddle_L_ctl", 
-        "metamiddle_R_ctl", "metapinky_L_ctl", "metapinky_R_ctl", "metapointer_L_ctl", "metapointer_R_ctl", "metaring_L_ctl", 
-        "metaring_R_ctl", "midSpine_IK_ctl", "midSpine_ctl", "middle_01_L_ctl", "middle_01_R_ctl", "middle_02_L_ctl", 
-        "middle_02_R_ctl", "middle_03_L_ctl", "middle_03_R_ctl", "middle_L_IK_ctl", "middle_L_IK_pivot_ctl", "middle_L_pv_ctl", 
-        "middle_R_IK_ctl", "middle_R_IK_pivot_ctl", "middle_R_pv_ctl", "middle_base_L_ctl", "middle_base_R_ctl", "mouth_L_ctl", 
-        "mouth_R_ctl", "mouth_ctrl", "neck_01_ctl", "neck_02_ctl", "neck_03_ctl", "nose_ctl", "nostril_L_ctl", "nostril_R_ctl", 
-        "pinky_01_L_ctl", "pinky_01_R_ctl", "pinky_02_L_ctl", "pinky_02_R_ctl", "pinky_03_L_ctl", "pinky_03_R_ctl", "pinky_L_IK_ctl", 
-        "pinky_L_IK_pivot_ctrl", "pinky_L_pv_ctl", "pinky_R_IK_ctl", "pinky_R_IK_pivot_ctrl", "pinky_R_pv_ctl", "pinky_base_L_ctl", 
-        "pinky_base_R_ctl", "pointer_01_L_ctl", "pointer_01_R_ctl", "pointer_02_L_ctl", "pointer_02_R_ctl", "pointer_03_L_ctl", 
-        "pointer_03_R_ctl", "pointer_L_IK_ctl", "pointer_L_IK_pivot_ctl", "pointer_L_pv_ctl", "pointer_R_IK_ctl", 
-        "pointer_R_IK_pivot_ctl", "pointer_R_pv_ctl", "pointer_base_L_ctl", "pointer_base_R_ctl", "ring_01_L_ctl", 
-        "ring_01_R_ctl", "ring_02_L_ctl", "ring_02_R_ctl", "ring_03_L_ctl", "ring_03_R_ctl", "ring_L_IK_ctl", "ring_L_IK_pivot_ctrl", "ring_L_pv_ctl", 
-        "ring_R_IK_ctl", "ring_R_IK_pivot_ctrl", "ring_R_pv_ctl", "ring_base_L_ctl", "ring_base_R_ctl", "spine_L_options_ctl", "spine_tweak_01_ctl", 
-        "spine_tweak_02_ctl", "spine_tweak_03_ctl", "spine_tweak_04_ctl", "spine_tweak_05_ctl", "throat_ctl", "thumb_01_L_ctl", "thumb_01_R_ctl", 
-        "thumb_02_L_ctl", "thumb_02_R_ctl", "thumb_03_L_ctl", "thumb_03_R_ctl", "thumb_L_IK_ctl", "thumb_L_IK_pivot_ctl", "thumb_L_pv_ctl", "thumb_R_IK_ctl", 
-        "thumb_R_IK_pivot_ctl", "thumb_R_pv_ctl", "thumb_base_L_ctl", "thumb_base_R_ctl", "toes_L_ctl", "toes_R_ctl", "tongue_01_ctl", "tongue_02_ctl", 
-        "tongue_03_ctl", "tongue_04_ctl", "tongue_05_ctl", "topSpine_IK_ctl", "topSpine_ctl", "upper_lip_ctrl", "upperteeth_ctl", "wrist_L_ctl", "wrist_R_ctl"
-
-    ]
-    
-    selected_controls=[]
-   
-    for ctrl in controllers:
-        if cmds.objExists(find_object_with_namespace(ctrl)):
-            selected_controls.append(find_object_with_namespace(ctrl))
+    """Selects Iouri's controllers, as listed in each rig's manifest."""
+    selected_controls = []
+    # Fresh index for this run, every Iouri in the scene gets its controllers selected
+    rig_manifests.clear()
+    for namespace, nodes in build_iouri_index().items():
+        selected_controls.extend(nodes[ctrl] for ctrl in get_rig_manifest(namespace) if ctrl in nodes)
     
     if selected_controls:
         cmds.select(selected_controls, replace=True)
@@ -80,54 +222,579 @@ def select_iouri_controllers():
         cmds.warning("No Iouri controllers found in the scene.")
 
 
-def switch_to_ik(side):
+# IK controller matched on each FK node, in order: the FK arm, the elbow for the pole vector, the wrist locator for the hand
+IK_MATCH_TARGETS = [
+    ("arm_{side}_IK_ctl", "arm_{side}_ctl"),
+    ("arm_{side}_PV_ctl", "elbow_{side}_ctl"),
+    ("hand_{side}_IK_ctl", "wrist_{side}_ik_loc"),
+]
+TRANSFORM_CHANNELS = ["translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ", "scaleX", "scaleY", "scaleZ"]
+
+
+def get_matrix(node, attr, context=om.MDGContext.kNormal):
+    """Reads a matrix attribute of a node, optionally at another time."""
+    plug = om.MSelectionList().add(f"{node}.{attr}").getPlug(0)
+    return om.MFnMatrixData(plug.asMObject(context)).matrix()
+
+
+def compute_ik_match(namespace, side, context=om.MDGContext.kNormal):
+    """Returns {IK controller: 9 channel values (internal units)} putting the IK arm on the FK arm, matrices only.
+
+    Reads every matrix before anything moves: when a controller is under another one of the list,
+    its parent matrix is carried by the new world matrix of that controller.
+    """
+    new_worlds = {}
+    channels = {}
+    for target_name, source_name in IK_MATCH_TARGETS:
+        target = find_iouri_node(target_name.format(side=side), namespace)
+        source = find_iouri_node(source_name.format(side=side), namespace)
+        world = get_matrix(source, "worldMatrix[0]", context)
+        parent_world = get_matrix(target, "offsetParentMatrix", context) * get_matrix(target, "parentMatrix[0]", context)
+
+        ancestors = [node for node in new_worlds if target.startswith(node + "|")]
+        if ancestors:
+            old_ancestor_world, new_ancestor_world = new_worlds[max(ancestors, key=len)]
+            parent_world = parent_world * old_ancestor_world.inverse() * new_ancestor_world
+        new_worlds[target] = (get_matrix(target, "worldMatrix[0]", context), world)
+
+        local = om.MTransformationMatrix(world * parent_world.inverse())
+        rotate_order = om.MSelectionList().add(f"{target}.rotateOrder").getPlug(0).asInt()
+        rotation = local.rotation().reorder(rotate_order)
+        channels[target] = [*local.translation(om.MSpace.kTransform), rotation.x, rotation.y, rotation.z,
+                            *local.scale(om.MSpace.kTransform)]
+    return channels
+
+
+def get_free_plugs(node):
+    """Transform channel plugs of a node that can take a value: not locked, and not driven by anything else than a curve."""
+    plugs = {}
+    for attr in TRANSFORM_CHANNELS:
+        plug = om.MSelectionList().add(f"{node}.{attr}").getPlug(0)
+        if plug.isLocked or (plug.isDestination and not plug.source().node().hasFn(om.MFn.kAnimCurve)):
+            continue
+        plugs[attr] = plug
+    return plugs
+
+
+def get_curve_type(plug):
+    """Animation curve type for a plug, and the factor from its UI units to internal units."""
+    if plug.attribute().hasFn(om.MFn.kUnitAttribute):
+        unit_type = om.MFnUnitAttribute(plug.attribute()).unitType()
+        if unit_type == om.MFnUnitAttribute.kAngle:
+            return "animCurveTA", om.MAngle(1.0, om.MAngle.uiUnit()).asRadians()
+        if unit_type == om.MFnUnitAttribute.kDistance:
+            return "animCurveTL", om.MDistance(1.0, om.MDistance.uiUnit()).asCentimeters()
+    return "animCurveTU", 1.0
+
+
+def create_curve(plug, plug_name, times, values):
+    """Connects a new animation curve holding the keys to the plug, values in internal units. Made with commands so it undoes."""
+    curve_type, scale = get_curve_type(plug)
+    # Same names as bakeResults gives its curves
+    curve = cmds.createNode(curve_type, name=plug.partialName(includeNodeName=True, useLongNames=True).replace(".", "_").replace(":", "_"), skipSelect=True)
+    # Same as a .ma file, every time/value pair of the curve in one setAttr
+    cmds.setAttr(f"{curve}.ktv[0:{len(times) - 1}]", *np.column_stack([times, np.asarray(values) / scale]).ravel().tolist())
+    cmds.connectAttr(f"{curve}.output", plug_name, force=True)
+    return curve
+
+
+def switch_arms_to_ik(arms):
+    """Matches the IK arms on the FK arms and turns SwitchIK on, for every (namespace, side).
+
+    Every match is computed before anything moves, then set with setAttr so it undoes with the rest of the bake.
+    """
     try:
-        # Get Objects with right side and namespaces
-        arm_options_ctl = find_object_with_namespace(f"arm_{side}_options_ctl")
-        arm_ctl = find_object_with_namespace(f"arm_{side}_ctl")
-        arm_ik = find_object_with_namespace(f"arm_{side}_ik")
-        elbow_ctl = find_object_with_namespace(f"elbow_{side}_ctl")
-        elbow_ik = find_object_with_namespace(f"elbow_{side}_ik")
-        wrist_ctl = find_object_with_namespace(f"wrist_{side}_ctl")
-        wrist_ik = find_object_with_namespace(f"wrist_{side}_ik")
-        arm_ik_ctl = find_object_with_namespace(f"arm_{side}_IK_ctl")
-        arm_pv_ctl = find_object_with_namespace(f"arm_{side}_PV_ctl")
-        hand_ik_ctl = find_object_with_namespace(f"hand_{side}_IK_ctl")
-        wrist_ik_loc = find_object_with_namespace(f"wrist_{side}_ik_loc")
+        matches = [compute_ik_match(namespace, side) for namespace, side in arms]
+        switches = [find_iouri_node(f"arm_{side}_options_ctl", namespace) for namespace, side in arms]
     except ValueError as e:
         cmds.error(str(e))
 
-
-    # Switch from FK to IK
-    cmds.matchTransform(arm_ik_ctl, arm_ctl)
-    cmds.matchTransform(arm_pv_ctl, elbow_ctl)
-    cmds.matchTransform(hand_ik_ctl, wrist_ik_loc)
-
-    # Do the Switch IK
-    cmds.setAttr(f"{arm_options_ctl}.SwitchIK", 1)
+    for channels in matches:
+        for node, values in channels.items():
+            for attr, plug in get_free_plugs(node).items():
+                cmds.setAttr(f"{node}.{attr}", values[TRANSFORM_CHANNELS.index(attr)] / get_curve_type(plug)[1])
+    for arm_options_ctl in switches:
+        cmds.setAttr(f"{arm_options_ctl}.SwitchIK", 1)
+
+
+def match_ik_over_range(arms, start_frame, end_frame):
+    """Keys the IK arms on the FK arms on every frame of the range, for every (namespace, side). SwitchIK is left to the caller.
+
+    Each channel gets a new linear curve made with commands, the keys its old curve had outside the range are kept.
+    """
+    time_unit = om.MTime.uiUnit()
+    frames = np.arange(start_frame, end_frame + 1)
+    values = {}
+    for frame in frames:
+        context = om.MDGContext(om.MTime(float(frame), time_unit))
+        for namespace, side in arms:
+            for node, channels in compute_ik_match(namespace, side, context).items():
+                values.setdefault(node, []).append(channels)
+
+    new_curves = []
+    for node, node_values in values.items():
+        node_values = np.array(node_values)
+        for attr, plug in get_free_plugs(node).items():
+            times, keys = frames, node_values[:, TRANSFORM_CHANNELS.index(attr)]
+            if plug.isDestination:
+                old_curve = om.MFnDependencyNode(plug.source().node()).name()
+                old_times, old_values = read_curves([old_curve])[old_curve]
+                outside = (old_times < start_frame) | (old_times > end_frame)
+                times = np.concatenate([old_times[outside], frames])
+                keys = np.concatenate([old_values[outside] * get_curve_type(plug)[1], keys])
+                order = np.argsort(times, kind="stable")
+                times, keys = times[order], keys[order]
+                if not cmds.ls(old_curve, readOnly=True):
+                    cmds.delete(old_curve)
+            new_curves.append(create_curve(plug, f"{node}.{attr}", times, keys))
+
+    if new_curves:
+        cmds.keyTangent(new_curves, inTangentType="linear", outTangentType="linear")
+
+
+# Poses are compiled once to NumPy arrays here, and recompiled when the JSON changes
+PoseCacheDirectory = os.path.join(tempfile.gettempdir(), "IouriPoseCache")
+
+
+def compile_pose(file_path):
+    """Returns the pose as arrays (controllers, controller_index, attributes, values), from the local cache when it's up to date."""
+    mtime = os.path.getmtime(file_path)
+    path_hash = hashlib.sha1(os.path.abspath(file_path).lower().encode("utf-8")).hexdigest()[:12]
+    cache_path = os.path.join(PoseCacheDirectory, f"{os.path.splitext(os.path.basename(file_path))[0]}_{path_hash}.npz")
+
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cache:
+            if float(cache["mtime"]) == mtime:
+                return {key: cache[key] for key in ("controllers", "controller_index", "attributes", "values")}
+
+    with open(file_path, "r") as jsonFile:
+        pose_data = json.load(jsonFile)
+    entries = [(ctrl_index, attr, value) for ctrl_index, attrs in enumerate(pose_data.values()) for attr, value in attrs.items()]
+    pose = {
+        "controllers": np.array(list(pose_data), dtype=str),
+        "controller_index": np.array([entry[0] for entry in entries], dtype=np.int32),
+        "attributes": np.array([entry[1] for entry in entries], dtype=str),
+        "values": np.array([entry[2] for entry in entries], dtype=np.float64),
+    }
+
+    # Written next to the cache then swapped in, so another Maya never reads half a file
+    os.makedirs(PoseCacheDirectory, exist_ok=True)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+    np.savez(temp_path, mtime=mtime, **pose)
+    os.replace(temp_path, cache_path)
+    return pose
 
 
 def load_pose(file_path):
-    """Loads a pose from a JSON file and applies it to the corresponding controls."""
+    """Loads a pose from a JSON file and applies it to the corresponding controls of every Iouri, as one undo step.
+
+    Every setAttr of the pose runs in one MEL script, each one caught on its own so a locked or connected plug only skips itself.
+    """
     try:
-        with open(file_path, "r") as jsonFile:
-            pose_data = json.load(jsonFile)
-        
-        for ctrl, attrs in pose_data.items():
-            ctrl_nonamespace = find_object_with_namespace(f"{ctrl}")
-            if cmds.objExists(ctrl_nonamespace):  # Ensure the control exists in the scene
-                for attr, value in attrs.items():
-                    try:
-                        cmds.setAttr(f"{ctrl_nonamespace}.{attr}", value)
-                    except Exception as e:
-                        print(f"Could not set {ctrl_nonamespace}.{attr}: {e}")
-        
-        print(f"Pose loaded successfully from {file_path}")
+        pose = compile_pose(file_path)
+        controllers = pose["controllers"]
+        commands = []
+
+        for namespace, nodes in get_iouri_index().items():
+            targets = [nodes.get(ctrl) for ctrl in controllers]
+            for ctrl, target_ctrl in zip(controllers, targets):
+                if not target_ctrl:
+                    print(f"Control {ctrl} not found in Iouri '{namespace}' hierarchy")
+
+            for ctrl_index, attr, value in zip(pose["controller_index"], pose["attributes"], pose["values"]):
+                target_ctrl = targets[ctrl_index]
+                if target_ctrl:
+                    plug = f"{target_ctrl}.{attr}"
+                    commands.append(f'if (catch(`setAttr "{plug}" {float(value)!r}`)) warning "Could not set {plug}";')
+
+        # setAttr takes UI units, like the pose file, and converts the value for int, enum and bool attributes
+        cmds.undoInfo(openChunk=True, chunkName="load_pose")
+        try:
+            if commands:
+                mel.eval("\n".join(commands))
+        finally:
+            cmds.undoInfo(closeChunk=True)
+        print(f"Pose loaded successfully from {file_path} ({len(commands)} plugs)")
     except Exception as e:
         print(f"Failed to load pose: {e}")
 
 
-def bake_selected_animation():
+def bake_selected_animation(engine=None):
+    """Bakes the selected controllers and sets up the cloth pre-roll, as a single undo step.
+
+    engine is "bakeResults" or "openmaya", BakeEngine is used when it isn't given.
+    """
+    cmds.undoInfo(openChunk=True, chunkName="bake_selected_animation")
+    try:
+        with timed_span("bake_selected_animation total"):
+            bake_selected_animation_steps(engine or BakeEngine)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+
+def get_first_key_frames(anim_curves):
+    """Returns {first key frame: [curves]} for the given animation curves, read through the API (no command per curve)."""
+    selection = om.MSelectionList()
+    for curve in anim_curves:
+        selection.add(curve)
+    time_unit = om.MTime.uiUnit()
+    curves_by_first_key = {}
+    for index, curve in enumerate(anim_curves):
+        curve_fn = oma.MFnAnimCurve(selection.getDependNode(index))
+        if curve_fn.numKeys:
+            curves_by_first_key.setdefault(curve_fn.input(0).asUnits(time_unit), []).append(curve)
+    return curves_by_first_key
+
+
+def bake_with_openmaya(objects, start_frame, end_frame):
+    """Bakes every keyable plug of the objects: samples them with MDGContext, then writes each curve with one setAttr.
+
+    Doesn't step the scene like bakeResults(simulation=True), so anything simulated (nCloth, hair, dynamics)
+    still needs the bakeResults engine. A few frames are checked against the scene stepped like bakeResults does,
+    nothing is written and False is returned when they don't match. The curves are made with commands so the bake undoes.
+    """
+    selection = om.MSelectionList()
+    plug_names = []
+    for obj in objects:
+        for attr in cmds.listAttr(obj, keyable=True, unlocked=True) or []:
+            try:
+                selection.add(f"{obj}.{attr}")
+            except RuntimeError:
+                continue  # Compound/multi attributes listAttr gives but that can't be keyed as is
+            plug_names.append(f"{obj}.{attr}")
+    plugs = [selection.getPlug(index) for index in range(selection.length())]
+
+    # Sample every plug at every frame into one preallocated frames x plugs array (internal units)
+    time_unit = om.MTime.uiUnit()
+    frames = np.arange(start_frame, end_frame + 1)
+    values = np.empty((len(frames), len(plugs)))
+    for frame_index, frame in enumerate(frames):
+        context = om.MDGContext(om.MTime(float(frame), time_unit))
+        values[frame_index] = [plug.asDouble(context) for plug in plugs]
+
+    # Reference: the scene stepped to a few frames like bakeResults does, the samples have to give back the same values
+    current_time = cmds.currentTime(query=True)
+    check_frames = np.linspace(0, len(frames) - 1, min(len(frames), 5)).astype(int)
+    try:
+        for frame_index in check_frames:
+            cmds.currentTime(float(frames[frame_index]), update=True)
+            reference = np.array([plug.asDouble() for plug in plugs])
+            worst = np.abs(reference - values[frame_index]).max(initial=0.0)
+            if worst > BakeTolerance:
+                cmds.warning(f"OpenMaya bake differs from the scene by {worst} at frame {frames[frame_index]}, baking with bakeResults instead")
+                return False
+    finally:
+        cmds.currentTime(current_time, update=True)
+
+    # Replace whatever drove each plug (curve, constraint...) by a fresh curve holding all the samples
+    old_curves = cmds.listConnections(plug_names, type="animCurve", source=True, destination=False) or []
+    deletable = sorted(set(old_curves) - set(cmds.ls(old_curves, readOnly=True)))
+    if deletable:
+        cmds.delete(deletable)
+
+    # Curve type and UI units from each attribute, the samples are in internal units
+    new_curves = [create_curve(plug, plug_name, frames, values[:, plug_index])
+                  for plug_index, (plug, plug_name) in enumerate(zip(plugs, plug_names))]
+
+    if new_curves:
+        cmds.keyTangent(new_curves, inTangentType="linear", outTangentType="linear")
+    return True
+
+
+# Middle axis of each Maya rotate order (xyz, yzx, zxy, xzy, yxz, zyx), the one that flips in the gimbal alternative
+ROTATE_ORDER_MIDDLE_AXIS = [1, 2, 0, 2, 0, 1]
+TIME_CURVE_TYPES = ["animCurveTL", "animCurveTA", "animCurveTU", "animCurveTT"]
+
+
+def get_curve_connections(objects):
+    """Returns {(object, attribute): curve} for the time based curves driving the objects, in one query."""
+    connections = cmds.listConnections(objects, type="animCurve", source=True, destination=False, connections=True) or []
+    curves = {}
+    for plug, curve in zip(connections[0::2], connections[1::2]):
+        if cmds.nodeType(curve) in TIME_CURVE_TYPES:
+            obj, attr = plug.rsplit(".", 1)
+            curves[(obj, attr)] = curve
+    return curves
+
+
+def read_curves(anim_curves):
+    """Reads every key of the curves into NumPy arrays: {curve: (times, values)}, in UI units."""
+    curves = {}
+    for curve in anim_curves:
+        keys = cmds.keyframe(curve, query=True, timeChange=True, valueChange=True) or []
+        curves[curve] = (np.array(keys[0::2]), np.array(keys[1::2]))
+    return curves
+
+
+def write_curves(curves):
+    """Writes back curves read with read_curves: {curve: (times, values)} in UI units, linear keys.
+
+    The times are the curve's key times or some of them: the other keys are cut, then every value goes in one setAttr,
+    all through commands so it undoes with the rest of the bake.
+    """
+    for curve, (times, values) in curves.items():
+        kept = set(np.asarray(times).tolist())
+        dropped = [(frame, frame) for frame in cmds.keyframe(curve, query=True, timeChange=True) or [] if frame not in kept]
+        if dropped:
+            cmds.cutKey(curve, time=dropped, clear=True)
+        if len(times):
+            cmds.setAttr(f"{curve}.ktv[0:{len(times) - 1}]", *np.column_stack([times, values]).ravel().tolist())
+    if curves:
+        cmds.keyTangent(list(curves), inTangentType="linear", outTangentType="linear")
+
+
+def unwrap_euler(rotations, middle_axes):
+    """Euler filter for N rotations over K keys at once, (N, K, 3) in degrees.
+
+    Every key takes the closest equivalent of either its own angles or the gimbal alternative
+    (first + 180, 180 - middle, last + 180) to the previous filtered key.
+    """
+    filtered = rotations.copy()
+    alternative_scale = np.ones((len(rotations), 3))
+    alternative_scale[np.arange(len(rotations)), middle_axes] = -1.0
+
+    def closest(angles, reference):
+        return angles + 360.0 * np.round((reference - angles) / 360.0)
+
+    for key in range(1, rotations.shape[1]):
+        previous = filtered[:, key - 1]
+        same = closest(rotations[:, key], previous)
+        alternative = closest(rotations[:, key] * alternative_scale + 180.0, previous)
+        use_alternative = np.abs(alternative - previous).sum(axis=1) < np.abs(same - previous).sum(axis=1) - 1e-6
+        filtered[:, key] = np.where(use_alternative[:, None], alternative, same)
+    return filtered
+
+
+def euler_filter_curves(objects):
+    """Euler filters every rotate curve of the objects together in NumPy, and writes back only the curves that changed."""
+    curve_connections = get_curve_connections(objects)
+    rotate_curves = {key: curve for key, curve in curve_connections.items() if key[1] in ("rotateX", "rotateY", "rotateZ")}
+    curve_data = read_curves(rotate_curves.values())
+
+    # Objects with their three rotate curves keyed on the same frames are filtered together, as full rotations
+    groups = {}
+    single_curves = set(rotate_curves.values())
+    for obj in {obj for obj, attr in rotate_curves}:
+        curves = [rotate_curves.get((obj, attr)) for attr in ("rotateX", "rotateY", "rotateZ")]
+        if None in curves:
+            continue
+        times = curve_data[curves[0]][0]
+        if all(np.array_equal(curve_data[curve][0], times) for curve in curves[1:]):
+            groups.setdefault(times.tobytes(), []).append((obj, curves))
+            single_curves.difference_update(curves)
+
+    changed = {}
+    for members in groups.values():
+        times = curve_data[members[0][1][0]][0]
+        rotations = np.stack([np.stack([curve_data[curve][1] for curve in curves], axis=-1) for obj, curves in members])
+        middle_axes = [ROTATE_ORDER_MIDDLE_AXIS[cmds.getAttr(f"{obj}.rotateOrder")] for obj, curves in members]
+        filtered = unwrap_euler(rotations, middle_axes)
+        for member_index, (obj, curves) in enumerate(members):
+            for axis, curve in enumerate(curves):
+                if np.abs(filtered[member_index, :, axis] - rotations[member_index, :, axis]).max(initial=0.0) > 1e-6:
+                    changed[curve] = (times, filtered[member_index, :, axis])
+
+    # Lone rotate curves can only be unwrapped to the closest angle
+    for curve in single_curves:
+        times, values = curve_data[curve]
+        unwrapped = np.unwrap(values, period=360.0)
+        if np.abs(unwrapped - values).max(initial=0.0) > 1e-6:
+            changed[curve] = (times, unwrapped)
+
+    write_curves(changed)
+    print(f"Euler filter: {len(changed)} of {len(rotate_curves)} rotate curves fixed.")
+    return changed
+
+
+def get_pose_channels(objects, frame):
+    """Splits the curve driven channels of the objects into the ones to key at the pose frame and the static ones.
+
+    A channel is keyed when its curve moves, or when the pose or the IK switch moved it away from its curve.
+    """
+    curve_connections = get_curve_connections(objects)
+    curve_data = read_curves(curve_connections.values())
+    plugs = om.MSelectionList()
+    curves = om.MSelectionList()
+    for (obj, attr), curve in curve_connections.items():
+        plugs.add(f"{obj}.{attr}")
+        curves.add(curve)
+
+    time = om.MTime(float(frame), om.MTime.uiUnit())
+    animated, static = [], []
+    for index, ((obj, attr), curve) in enumerate(curve_connections.items()):
+        # Both values in internal units, the plug holds the posed value until the time changes
+        curve_value = oma.MFnAnimCurve(curves.getDependNode(index)).evaluate(time)
+        moved = abs(plugs.getPlug(index).asDouble() - curve_value) > BakeTolerance
+        if moved or np.ptp(curve_data[curve][1]) > BakeTolerance:
+            animated.append(f"{obj}.{attr}")
+        else:
+            static.append(f"{obj}.{attr}")
+    return animated, static
+
+
+def simplify_keys(times, values, tolerances, protected):
+    """Ramer-Douglas-Peucker over N curves sharing the same K key times, (N, K) values.
+
+    Every pass splits each segment at its worst key, for all the curves at once, until the linear
+    interpolation of the kept keys is within tolerance. Returns the (N, K) kept mask and the max error per curve.
+    """
+    curve_count, key_count = values.shape
+    keep = np.zeros((curve_count, key_count), dtype=bool)
+    keep[:, [0, -1]] = True
+    keep[:, protected] = True
+    key_index = np.arange(key_count)
+    while True:
+        # Previous and next kept key of every key
+        previous = np.maximum.accumulate(np.where(keep, key_index, 0), axis=1)
+        following = np.minimum.accumulate(np.where(keep, key_index, key_count - 1)[:, ::-1], axis=1)[:, ::-1]
+        start_values = np.take_along_axis(values, previous, axis=1)
+        end_values = np.take_along_axis(values, following, axis=1)
+        span = times[following] - times[previous]
+        weight = np.divide(times - times[previous], span, out=np.zeros_like(span), where=span > 0)
+        error = np.abs(values - (start_values + (end_values - start_values) * weight))
+        error[keep] = 0.0
+
+        rows, columns = np.nonzero(error > tolerances[:, None])
+        if not len(rows):
+            return keep, error.max(axis=1)
+        # Keep the worst key of every segment that is out of tolerance
+        segments = previous[rows, columns]
+        order = np.lexsort((-error[rows, columns], segments, rows))
+        rows, columns, segments = rows[order], columns[order], segments[order]
+        worst = np.ones(len(rows), dtype=bool)
+        worst[1:] = (rows[1:] != rows[:-1]) | (segments[1:] != segments[:-1])
+        keep[rows[worst], columns[worst]] = True
+
+
+def reduce_baked_keys(anim_curves, protect_until):
+    """Removes the baked keys that linear interpolation already gives within KeyReductionTolerance.
+
+    Keys up to protect_until (pose, pre-roll and first key) and the last key of every curve are always kept.
+    """
+    curve_types = {curve: curve_type for curve_type in KeyReductionTolerance
+                   for curve in cmds.ls(anim_curves, type=curve_type)}
+    curve_data = read_curves(curve_types)
+
+    # Curves keyed on the same frames are reduced together
+    groups = {}
+    for curve, (times, values) in curve_data.items():
+        groups.setdefault(times.tobytes(), []).append(curve)
+
+    reduced = {}
+    keys_before = keys_after = 0
+    max_error = 0.0
+    for curves in groups.values():
+        times = curve_data[curves[0]][0]
+        values = np.stack([curve_data[curve][1] for curve in curves])
+        tolerances = np.array([KeyReductionTolerance[curve_types[curve]] for curve in curves])
+        keep, errors = simplify_keys(times, values, tolerances, times <= protect_until)
+        keys_before += values.size
+        keys_after += int(keep.sum())
+        max_error = max(max_error, float(errors.max(initial=0.0)))
+        for curve_index, curve in enumerate(curves):
+            if not keep[curve_index].all():
+                reduced[curve] = (times[keep[curve_index]], values[curve_index, keep[curve_index]])
+
+    write_curves(reduced)
+    print(f"Key reduction: {keys_before} -> {keys_after} keys on {len(curve_data)} curves, max error {max_error:.5f}.")
+    return reduced
+
+
+def get_channel_matrix(objects, frames):
+    """Samples every curve driven channel of the objects on the frames: channel names and a frames x channels matrix (UI units)."""
+    curve_connections = get_curve_connections(objects)
+    curve_data = read_curves(curve_connections.values())
+    channels = [key for key, curve in curve_connections.items() if len(curve_data[curve][0])]
+    matrix = np.empty((len(frames), len(channels)))
+    for channel_index, channel in enumerate(channels):
+        times, values = curve_data[curve_connections[channel]]
+        matrix[:, channel_index] = np.interp(frames, times, values)  # Baked curves are linear, and constant outside their keys
+    return channels, matrix
+
+
+def run_bake_qc(objects):
+    """Checks the baked animation for what breaks cloth sims: velocity and acceleration spikes, flips, and a rough pre-roll.
+
+    Spikes are measured against each channel's own median/MAD over the shot, floored by a fraction of the channel's range.
+    Returns the report per controller, or None when there was nothing to check (no keys, shot too short).
+    """
+    start_frame = cmds.playbackOptions(q=True, min=True)
+    end_frame = cmds.playbackOptions(q=True, max=True)
+    first_frame = min(cmds.keyframe(objects, query=True, timeChange=True) or [start_frame])
+    frames = np.arange(np.floor(first_frame), end_frame + 1)
+    channels, matrix = get_channel_matrix(objects, frames)
+    # Needs at least one acceleration inside the shot, the medians of nothing would be NaN
+    if not channels or len(frames) < 3 or (frames[1:-1] <= start_frame).all():
+        return None
+
+    # velocity[i] goes from frames[i] to frames[i + 1], acceleration[i] is on frames[i + 1]
+    velocity = np.diff(matrix, axis=0)
+    acceleration = np.diff(velocity, axis=0)
+    in_shot_velocity = frames[1:] > start_frame
+    in_shot_acceleration = frames[1:-1] > start_frame
+    # Constant channels can't have spikes, they're left out rather than measured against a spread of 0
+    moving = np.ptp(matrix, axis=0) > 0
+    range_floor = np.maximum(QcRangeScaleFloor * np.ptp(matrix[frames >= start_frame], axis=0), QcScaleFloor)
+
+    def outliers(values, in_shot):
+        median = np.median(values[in_shot], axis=0)
+        scale = np.maximum(1.4826 * np.median(np.abs(values[in_shot] - median), axis=0), range_floor)
+        return (np.abs(values - median) > QcOutlierThreshold * scale) & in_shot[:, None] & moving, scale
+
+    velocity_outliers, velocity_scale = outliers(velocity, in_shot_velocity)
+    acceleration_outliers, acceleration_scale = outliers(acceleration, in_shot_acceleration)
+    is_rotation = np.array([attr.startswith("rotate") for obj, attr in channels])
+    flips = (np.abs(velocity) > QcFlipThreshold) & is_rotation & moving
+
+    # Pre-roll: not faster than the shot itself, and no jump where it hands over to the animation
+    preroll_speed = np.abs(velocity[~in_shot_velocity]).max(axis=0, initial=0.0)
+    shot_speed = np.abs(velocity[in_shot_velocity]).max(axis=0, initial=0.0)
+    preroll_too_fast = preroll_speed > np.maximum(shot_speed * QcPrerollSpeedRatio, QcScaleFloor)
+    join = np.abs(acceleration[frames[1:-1] == start_frame]).max(axis=0, initial=0.0)
+    shot_acceleration = np.abs(acceleration[in_shot_acceleration]).max(axis=0, initial=0.0)
+    preroll_jump = (join > np.maximum(QcOutlierThreshold * acceleration_scale, shot_acceleration)) & moving
+
+    report = {}
+    problems = {"velocity_outliers": velocity_outliers, "acceleration_outliers": acceleration_outliers, "flips": flips}
+    for problem, mask in problems.items():
+        offset = 2 if problem == "acceleration_outliers" else 1
+        for row, column in zip(*np.nonzero(mask)):
+            obj, attr = channels[column]
+            report.setdefault(obj, {}).setdefault(attr, {}).setdefault(problem, []).append(float(frames[row + offset]))
+    for column in np.nonzero(preroll_too_fast | preroll_jump)[0]:
+        obj, attr = channels[column]
+        report.setdefault(obj, {}).setdefault(attr, {}).update({
+            "preroll_max_speed": float(preroll_speed[column]),
+            "shot_max_speed": float(shot_speed[column]),
+            "preroll_join_acceleration": float(join[column]),
+        })
+
+    print(f"Bake QC: {len(report)} of {len({obj for obj, attr in channels})} controllers flagged "
+          f"({int(velocity_outliers.any(axis=0).sum())} channels with velocity spikes, "
+          f"{int(acceleration_outliers.any(axis=0).sum())} with acceleration spikes, {int(flips.any(axis=0).sum())} with flips, "
+          f"{int((preroll_too_fast | preroll_jump).sum())} with a rough pre-roll).")
+    return report
+
+
+def write_bake_qc_report(objects, report_path):
+    """Runs the bake QC on the objects and writes the per controller report as JSON."""
+    report = run_bake_qc(objects)
+    if report is None:
+        cmds.warning("Bake QC: no baked keys or shot too short, nothing was checked.")
+    with open(report_path, "w") as report_file:
+        json.dump({
+            # Nothing checked isn't a pass
+            "status": "not_checked" if report is None else "flagged" if report else "pass",
+            "frame_range": [cmds.playbackOptions(q=True, min=True), cmds.playbackOptions(q=True, max=True)],
+            "thresholds": {"outlier": QcOutlierThreshold, "range_floor": QcRangeScaleFloor, "flip": QcFlipThreshold,
+                           "preroll_speed_ratio": QcPrerollSpeedRatio},
+            "controllers": report or {},
+        }, report_file, indent=4)
+    print(f"Bake QC report written: {report_path}")
+    return report
+
+
+def bake_selected_animation_steps(engine):
     # Get the currently selected objects
     selected_objects = cmds.ls(selection=True)
 
@@ -135,12 +802,15 @@ def bake_selected_animation():
         cmds.warning("No objects selected. Please select objects to bake.")
         return
 
-    # Set bakeResults options (you can adjust these to your needs)
-    cmds.bakeResults(selected_objects,
-                     time=(cmds.playbackOptions(q=True, min=True), cmds.playbackOptions(q=True, max=True)),
-                     sampleBy=1,  # Adjust sample rate, 1 means every frame
-                     preserveOutsideKeys=True,
-                     simulation=True)  # Use the simulation flag
+    with timed_span(f"bake ({engine})", nodes=len(selected_objects)):
+        # The OpenMaya engine falls back to bakeResults when its samples don't match the scene
+        if not (engine == "openmaya" and bake_with_openmaya(selected_objects, cmds.playbackOptions(q=True, min=True), cmds.playbackOptions(q=True, max=True))):
+            # Set bakeResults options (you can adjust these to your needs)
+            cmds.bakeResults(selected_objects,
+                             time=(cmds.playbackOptions(q=True, min=True), cmds.playbackOptions(q=True, max=True)),
+                             sampleBy=1,  # Adjust sample rate, 1 means every frame
+                             preserveOutsideKeys=True,
+                             simulation=True)  # Use the simulation flag
     
     print("Baking complete for selected objects.")
     
@@ -148,72 +818,60 @@ def bake_selected_animation():
     anim_layers = cmds.ls(type='animLayer')
     
     if anim_layers and len(anim_layers) > 1:
-        for obj in selected_objects:
-            # Find animation layers connected to the object's animation curves
-            anim_curves = cmds.listConnections(obj, type="animCurve") or []
-            affected_layers = set()
-    
-            for curve in anim_curves:
-                layers = cmds.listConnections(curve, type="animLayer") or []
-                affected_layers.update(layers)
-    
-            # Skip if no animation layers are found
-            if not affected_layers:
-                continue
-    
-            # Remove animation layers except 'BaseAnimation'
-            for layer in affected_layers:
-                if layer != "BaseAnimation":
-                    try:
-                        cmds.setAttr(f"{layer}.lock", False)
-                        mel.eval(f'delete {layer}')
-                    except Exception as e:
-                        cmds.warning(f"Failed to delete layer {layer}: {str(e)}")
+        # Find animation layers connected to the objects' animation curves, in one query for every object
+        anim_curves = cmds.listConnections(selected_objects, type="animCurve") or []
+        affected_layers = set(cmds.listConnections(anim_curves, type="animLayer") or []) if anim_curves else set()
+
+        # Remove animation layers except 'BaseAnimation'
+        for layer in affected_layers:
+            if layer != "BaseAnimation":
+                try:
+                    cmds.setAttr(f"{layer}.lock", False)
+                    mel.eval(f'delete {layer}')
+                except Exception as e:
+                    cmds.warning(f"Failed to delete layer {layer}: {str(e)}")
                     
-    # Delete Every Frame out of range! 
+    # Delete Every Frame out of range! One cut before and one after the range, over every curve at once
     start_frame = cmds.playbackOptions(q=True, min=True)
     end_frame = cmds.playbackOptions(q=True, max=True)
-    
-    selected_objects = cmds.ls(selection=True)
-    if not selected_objects:
-        cmds.warning("No objects selected. Please select objects with animation.")
+
+    # Time based curves only, driven keys don't have frames to trim
+    anim_curves = cmds.ls(cmds.keyframe(selected_objects, query=True, name=True) or [],
+                          type=["animCurveTL", "animCurveTA", "animCurveTU", "animCurveTT"])
+    if not anim_curves:
+        cmds.warning("No animation found on the selected objects.")
         return
-    
-    for obj in selected_objects:
-        anim_curves = cmds.listConnections(obj, type='animCurve') or []
-        for curve in anim_curves:
-            key_times = cmds.keyframe(curve, query=True, timeChange=True) or []
-            for key_time in key_times:
-                if key_time < start_frame or key_time > end_frame:
-                    cmds.cutKey(curve, time=(key_time, key_time))
+
+    with timed_span("trim_keys", curves=len(anim_curves)):
+        key_times = cmds.keyframe(anim_curves, query=True, timeChange=True) or []
+        if min(key_times) < start_frame:
+            cmds.cutKey(anim_curves, time=(min(key_times), start_frame - 0.001), clear=True)
+        if max(key_times) > end_frame:
+            cmds.cutKey(anim_curves, time=(end_frame + 0.001, max(key_times)), clear=True)
 
     # Initialize flag to track completion of the operation
     operation_completed = False
     
-    # Key the first frame and copy to a frame 25 frames before
-    for obj in selected_objects:
-        # Get all keyed frames for the object
-        keyed_frames = cmds.keyframe(obj, q=True, timeChange=True)
-        
-        if not keyed_frames:
-            cmds.warning(f"No keyframes found for {obj}.")
-            continue
-        
-        # Get the first keyed frame (smallest time value)
-        first_key_frame = min(keyed_frames)
-        
-        
-        # Now copy and paste to 25 frames earlier
-        new_frame = first_key_frame - 25
-        if new_frame < 1:  # Avoid negative or zero frames
-            new_frame = 1
-        
-        # Copy keyframes to the new frame (fixing the 'time' argument)
-        cmds.copyKey(obj, time=(first_key_frame, first_key_frame))
-        cmds.pasteKey(obj, time=(new_frame, new_frame))
-        
-        # Indicate that the operation was completed for this object
-        operation_completed = True
+    # Copy the first key of every curve 25 frames before, one copy/paste per distinct first frame
+    with timed_span("preroll_copy", curves=len(anim_curves)):
+        curves_by_first_key = get_first_key_frames(anim_curves)
+        for first_frame, curves in curves_by_first_key.items():
+            new_frame = first_frame - 25
+            if new_frame < 1:  # Avoid negative or zero frames
+                new_frame = 1
+
+            cmds.copyKey(curves, time=(first_frame, first_frame))
+            cmds.pasteKey(curves, time=(new_frame, new_frame))
+
+            # Indicate that the operation was completed for these curves
+            operation_completed = True
+
+    if not curves_by_first_key:
+        cmds.warning("No keyframes found on the selected objects.")
+        return
+
+    # Get the first keyed frame (smallest time value)
+    first_key_frame = min(curves_by_first_key)
     
     # Calculate the pose application frame (100 frames before the first keyframe)
     pose_apply_frame = first_key_frame - 100
@@ -223,42 +881,17 @@ def bake_selected_animation():
     # Set the current frame to the first frame
     cmds.currentTime(first_key_frame)
  
-    #Store every value needed to fix the cloth bind pose to fit first keyframe pose IK and parent spaces   
-    arm_L_options_ctl = find_object_with_namespace("arm_L_options_ctl")
-    arm_R_options_ctl = find_object_with_namespace("arm_R_options_ctl")
-    
-    switch_ik_value_L = cmds.getAttr(f"{arm_L_options_ctl}.SwitchIK")
-    switch_ik_value_R = cmds.getAttr(f"{arm_R_options_ctl}.SwitchIK")
-    
-    arm_L_ctl = find_object_with_namespace("arm_L_ctl")
-    arm_R_ctl = find_object_with_namespace("arm_R_ctl")
-
-    arm_L_orient_space = cmds.getAttr(f"{arm_L_ctl}.OrientSpace")
-    arm_R_orient_space = cmds.getAttr(f"{arm_R_ctl}.OrientSpace")
-
-    arm_L_PV_ctl = find_object_with_namespace("arm_L_PV_ctl")
-    arm_R_PV_ctl = find_object_with_namespace("arm_R_PV_ctl")
-
-    arm_L_PV_parent_space = cmds.getAttr(f"{arm_L_PV_ctl}.ParentSpace")
-    arm_R_PV_parent_space = cmds.getAttr(f"{arm_R_PV_ctl}.ParentSpace")
-
-    hand_L_IK_ctl = find_object_with_namespace("hand_L_IK_ctl")
-    hand_R_IK_ctl = find_object_with_namespace("hand_R_IK_ctl")
-
-    hand_L_IK_parent_space = cmds.getAttr(f"{hand_L_IK_ctl}.ParentSpace")
-    hand_R_IK_parent_space = cmds.getAttr(f"{hand_R_IK_ctl}.ParentSpace")
-
-    leg_L_PV_ctl = find_object_with_namespace("leg_L_PV_ctl")
-    leg_R_PV_ctl = find_object_with_namespace("leg_R_PV_ctl")
-
-    leg_L_PV_parent_space = cmds.getAttr(f"{leg_L_PV_ctl}.ParentSpace")
-    leg_R_PV_parent_space = cmds.getAttr(f"{leg_R_PV_ctl}.ParentSpace")
-
-    ankle_L_IK_ctl = find_object_with_namespace("ankle_L_IK_ctl")
-    ankle_R_IK_ctl = find_object_with_namespace("ankle_R_IK_ctl")
-
-    ankle_L_IK_parent_space = cmds.getAttr(f"{ankle_L_IK_ctl}.ParentSpace")
-    ankle_R_IK_parent_space = cmds.getAttr(f"{ankle_R_IK_ctl}.ParentSpace")
+    #Store every value needed to fix the cloth bind pose to fit first keyframe pose IK and parent spaces, for every Iouri
+    stored_states = {}
+    for namespace in get_iouri_index():
+        switch_ik_values = {}
+        spaces = {}
+        for side in "LR":
+            switch_ik_values[side] = cmds.getAttr(find_iouri_node(f"arm_{side}_options_ctl", namespace) + ".SwitchIK")
+            for ctrl, attr in SPACE_ATTRIBUTES:
+                plug = f"{find_iouri_node(ctrl.format(side=side), namespace)}.{attr}"
+                spaces[plug] = cmds.getAttr(plug)
+        stored_states[namespace] = (switch_ik_values, spaces)
     
 
     
@@ -266,49 +899,44 @@ def bake_selected_animation():
     cmds.currentTime(pose_apply_frame)
 
     # Load the pose 100 frames before the first keyed frame
-    pose_file_path = "S:\\SIC3D\\SIC5\\Projects\\KAMARADE\\02-PROD\\SCRIPTS\\Hubert\\ClothPose.json"  # Adjust path to the pose file
-    load_pose(pose_file_path)
-
-    # Apply the Switcher Code 
-    if switch_ik_value_L == 1.0:
-        switch_to_ik("L")
-        # Filter if switched
-        cmds.filterCurve(hand_L_IK_ctl, startTime=pose_apply_frame, endTime=first_key_frame, filter='euler')
-
-    if switch_ik_value_R == 1.0:
-        switch_to_ik("R")
-        # Filter if switched
-        cmds.filterCurve(hand_R_IK_ctl, startTime=pose_apply_frame, endTime=first_key_frame, filter='euler')
-    
-    # Change attributes based on the other stored values
-    cmds.setAttr(f"{arm_L_ctl}.OrientSpace", arm_L_orient_space)
-    cmds.setAttr(f"{arm_R_ctl}.OrientSpace", arm_R_orient_space)
-
-    cmds.setAttr(f"{arm_L_PV_ctl}.ParentSpace", arm_L_PV_parent_space)
-    cmds.setAttr(f"{arm_R_PV_ctl}.ParentSpace", arm_R_PV_parent_space)
-
-    cmds.setAttr(f"{hand_L_IK_ctl}.ParentSpace", hand_L_IK_parent_space)
-    cmds.setAttr(f"{hand_R_IK_ctl}.ParentSpace", hand_R_IK_parent_space)
-
-    cmds.setAttr(f"{leg_L_PV_ctl}.ParentSpace", leg_L_PV_parent_space)
-    cmds.setAttr(f"{leg_R_PV_ctl}.ParentSpace", leg_R_PV_parent_space)
-
-    cmds.setAttr(f"{ankle_L_IK_ctl}.ParentSpace", ankle_L_IK_parent_space)
-    cmds.setAttr(f"{ankle_R_IK_ctl}.ParentSpace", ankle_R_IK_parent_space)
+    with timed_span("load_pose"):
+        load_pose(ClothPoseFile)
+
+    # Apply the Switcher Code, every arm that was in IK at once
+    with timed_span("switch_to_ik"):
+        ik_arms = [(namespace, side) for namespace, (switch_ik_values, spaces) in stored_states.items()
+                   for side in "LR" if switch_ik_values[side] == 1.0]
+        if ik_arms:
+            switch_arms_to_ik(ik_arms)
+
+    for namespace, (switch_ik_values, spaces) in stored_states.items():
+        # Change attributes based on the other stored values
+        for plug, value in spaces.items():
+            cmds.setAttr(plug, value)
     
     
-    # Set keyframes for every attribute at the pose application frame
-    for obj in selected_objects:
-        attrs = cmds.listAttr(obj, k=True)  # Get all keyed attributes
-        for attr in attrs:
-            try:
-                cmds.setKeyframe(obj, time=pose_apply_frame, attribute=attr)
-            except Exception as e:
-                cmds.warning(f"Failed to key {obj}.{attr}: {str(e)}")
-
-    # Set all keyframes to linear interpolation
-    for obj in selected_objects:
-        cmds.keyTangent(obj, inTangentType="linear", outTangentType="linear")
+    # Key the pose only on the channels that move or that the pose changed, in one call
+    with timed_span("pose_keys", nodes=len(selected_objects)):
+        pose_channels, static_channels = get_pose_channels(selected_objects, pose_apply_frame)
+        print(f"Pose keys: {len(pose_channels)} channels keyed, {len(static_channels)} static channels left alone.")
+        try:
+            if pose_channels:
+                cmds.setKeyframe(pose_channels, time=pose_apply_frame)
+        except Exception as e:
+            cmds.warning(f"Failed to key the pose: {str(e)}")
+
+    # Euler filter every rotate curve, the IK switch and the pose can flip anything on the rig
+    with timed_span("euler_filter", curves=len(anim_curves)):
+        euler_filter_curves(selected_objects)
+
+    # Set all keyframes to linear interpolation, in one call over every curve
+    with timed_span("linear_tangents"):
+        cmds.keyTangent(selected_objects, inTangentType="linear", outTangentType="linear")
+
+    # Drop the baked keys the curves don't need, everything up to the first key stays for the cloth pre-roll
+    if KeyReduction:
+        with timed_span("key_reduction", curves=len(anim_curves)):
+            reduce_baked_keys(anim_curves, first_key_frame)
     
     if operation_completed:
         print("Keyframe operations (keying, pasting, applying pose, and linear tangents) completed for all selected objects.")
@@ -327,25 +955,55 @@ ExportIouri = True
 ExportKat = True
 ExportProps = True
 ExportCameras = True
+SplitStaticObjects = False  # Objects that never move or deform go to a separate single frame _STATIC.abc, off until the loaders read those
+ExportFxPointCache = False  # Also write IOURI_FX as memory-mappable .npy point caches for Houdini
+StaticSampleCount = 5  # Frames sampled to tell static objects apart, all frames are only checked to confirm one
 StartFrame = 901
-export_done = False  # Flag to control execution
+BakeCacheEnabled = True  # Reload the last bake of the same animation from <scene>_bake.npz instead of baking again
+active_export_folder = None  # Local folder of the export running right now, removed if it gets cancelled
+
+# Iouri is baked and exported by a headless mayapy running this script on a snapshot of the scene
+WorkerScriptPath = "S:\\SIC3D\\SIC5\\Projects\\KAMARADE\\02-PROD\\SCRIPTS\\Hubert\\ULTIMATE_EXPORTER.py"  # Used when the script was pasted in the Script Editor
+
+# Version folders (V01, V02...) and the lock files used to claim them
+VERSION_PATTERN = re.compile(r"^V(\d+)(?:\.lock)?$")
+
+# Every publish appends one JSON line here, latest versions are looked up in it instead of listing folders on the share
+PublishCatalogPath = "S:\\SIC3D\\SIC5\\Projects\\KAMARADE\\05-SHOTS\\_publish_catalog.jsonl"
 
+# Exports are written on the local disk first, then uploaded to the share in the background
+LocalScratchDirectory = os.path.join(tempfile.gettempdir(), "KamaradePublish")
+UploadChunkSize = 64 * 1024 * 1024  # Big sequential writes are way faster over SMB than Ogawa's small blocks
+upload_queue = queue.Queue()
+upload_thread = None
 
+# Published versions get checked by Publish_Validator.py in a background process, from what the exports were meant to be
+PublishValidatorPath = "S:\\SIC3D\\SIC5\\Projects\\KAMARADE\\02-PROD\\SCRIPTS\\Hubert\\Publish_Validator.py"
+# The content checks need the Alembic Python bindings, that's Houdini's hython. Empty to look for the latest installed Houdini
+ValidatorPython = ""
+HoudiniInstallDirectory = "C:\\Program Files\\Side Effects Software"
+exported_alembics = []  # Manifest entries of the alembics of the export running right now
+exported_assets = {}  # Asset of every file or folder the running export wrote in the version folder, for the catalog
 
-# POPUP DEF, It's also here that the other defs are called
+
+
+# POPUP DEF, the Apply button queues the export job directly
 def export_options_popup():
-    global ExportIouri, ExportKat, ExportProps, ExportCameras, export_done
+    global ExportIouri, ExportKat, ExportProps, ExportCameras, SplitStaticObjects, ExportFxPointCache
 
     def apply_settings(*args):
-        """ Updates global variables and closes the UI. """
-        global ExportIouri, ExportKat, ExportProps, ExportCameras, StartFrame, export_done
+        """ Updates global variables, closes the UI and queues the export. """
+        global ExportIouri, ExportKat, ExportProps, ExportCameras, SplitStaticObjects, ExportFxPointCache, StartFrame
         ExportIouri = cmds.checkBox("cb_iouri", query=True, value=True)
         ExportKat = cmds.checkBox("cb_kat", query=True, value=True)
         ExportProps = cmds.checkBox("cb_props", query=True, value=True)
         ExportCameras = cmds.checkBox("cb_cameras", query=True, value=True)
+        SplitStaticObjects = cmds.checkBox("cb_split_static", query=True, value=True)
+        ExportFxPointCache = cmds.checkBox("cb_fx_points", query=True, value=True)
         StartFrame = cmds.intField("start_frame", query=True, value=True)
-        export_done = True  # Mark export as done
         cmds.deleteUI("export_options_win")
+        # Deferred so the window is gone before the export starts
+        cmds.evalDeferred(run_export_job, lowestPriority=True)
     
     # Delete existing UI if necessary
     if cmds.window("export_options_win", exists=True):
@@ -359,44 +1017,305 @@ def export_options_popup():
     cmds.checkBox("cb_kat", label="Export Kat", value=ExportKat)
     cmds.checkBox("cb_props", label="Export Props", value=ExportProps)
     cmds.checkBox("cb_cameras", label="Export Cameras", value=ExportCameras)
+    cmds.checkBox("cb_split_static", label="Static objects in a single frame _STATIC.abc", value=SplitStaticObjects)
+    cmds.checkBox("cb_fx_points", label="IOURI_FX point cache (.npy) for Houdini", value=ExportFxPointCache)
     cmds.text(label="Start Frame:")
     cmds.intField("start_frame", value=StartFrame)
     cmds.button(label="Apply", command=apply_settings)
 
     cmds.showWindow(win)
 
-    # Wait until the user presses "Apply"
-    def check_export_done():
-        if export_done:
-            # Continue with the rest of the script after Apply is pressed
-            print(f"ExportIouri: {ExportIouri}, ExportKat: {ExportKat}, ExportProps: {ExportProps}, ExportCameras: {ExportCameras}, StartFrame: {StartFrame}")
-            # Rename cameras if we export them
-            if ExportCameras == True:
-                rename_cameras()
-            # Call the export function here
-            export_alembic()
-                
-        else:
-            cmds.scriptJob(runOnce=True, idleEvent=check_export_done)
+def run_export_job():
+    """Runs the export behind a progress window, Esc cancels it between two export steps."""
+    global active_export_folder
+    print(f"ExportIouri: {ExportIouri}, ExportKat: {ExportKat}, ExportProps: {ExportProps}, ExportCameras: {ExportCameras}, StartFrame: {StartFrame}")
+    cmds.progressWindow(title="Kamarade Export", status="Starting export...", isInterruptable=True, progress=0, maxValue=100)
+    try:
+        # Rename cameras if we export them
+        if ExportCameras == True:
+            rename_cameras()
+        export_alembic()
+    except ExportCancelled:
+        # Nothing was handed to the uploader yet, so nothing gets published
+        if active_export_folder:
+            shutil.rmtree(active_export_folder, ignore_errors=True)
+        cmds.warning("Export cancelled, nothing was published.")
+    except ExportFailed as e:
+        # Same as a cancel, a version missing some of its files must not be promoted
+        if active_export_folder:
+            shutil.rmtree(active_export_folder, ignore_errors=True)
+        cmds.warning(f"Export failed, nothing was published: {e}")
+    finally:
+        active_export_folder = None
+        cmds.progressWindow(endProgress=True)
+
+def update_export_progress(status, max_value=100):
+    """Starts a new step in the progress window, stops the export if the artist cancelled."""
+    if cmds.about(batch=True):
+        return
+    if cmds.progressWindow(query=True, isCancelled=True):
+        raise ExportCancelled()
+    cmds.progressWindow(edit=True, status=status, progress=0, maxValue=max(max_value, 1))
+
+def abc_frame_progress(frame, start_frame):
+    """Per frame callback of AbcExport (-pythonPerFrameCallback), moves the progress bar."""
+    if not cmds.about(batch=True):
+        cmds.progressWindow(edit=True, progress=int(frame - start_frame))
 
-    cmds.scriptJob(runOnce=True, idleEvent=check_export_done)
 
-# Call the function to display the popup
-export_options_popup()
+# DEFS
 
+class ExportCancelled(Exception):
+    """Raised when the artist cancels the export from the progress window."""
 
+class ExportFailed(Exception):
+    """Raised when a step of the export fails and the version can't be published."""
 
-# DEFS
+def read_publish_catalog():
+    """Every publish recorded in the catalog, oldest first. Lines that didn't finish writing are skipped."""
+    records = []
+    if not os.path.exists(PublishCatalogPath):
+        return records
+    with open(PublishCatalogPath, "r", encoding="utf-8") as catalog:
+        for line in catalog:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+@contextlib.contextmanager
+def catalog_lock(timeout=30):
+    """Exclusive lock file next to the catalog, so two publishes never write the same line at once."""
+    lock_path = PublishCatalogPath + ".lock"
+    deadline = time.time() + timeout
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            # A lock older than the timeout belongs to a Maya that crashed
+            try:
+                if time.time() - os.path.getmtime(lock_path) > timeout:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            if time.time() > deadline:
+                raise TimeoutError(f"Publish catalog is locked: {lock_path}")
+            time.sleep(0.2)
+    try:
+        yield
+    finally:
+        os.remove(lock_path)
+
+def append_to_publish_catalog(version_folder, publish_folder, file_hashes, local_folder):
+    """Appends one line about a published version to the catalog: shot, files (asset, size, hash, frame range), timings."""
+    anim_folder = os.path.dirname(publish_folder)
+    scene_base = os.path.basename(anim_folder)
+
+    # Frame ranges and assets from the publish manifest, timings from the profile reports, all still in the local folder
+    frame_ranges = {}
+    assets = {}
+    manifest_path = os.path.join(local_folder, "publish_manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as manifest_file:
+            manifest = json.load(manifest_file)
+        frame_ranges = {entry["file"]: entry["frame_range"] for entry in manifest["alembics"]}
+        assets = manifest.get("assets", {})
+    timings = {}
+    for name in os.listdir(local_folder):
+        if name.endswith("_profile.json"):
+            with open(os.path.join(local_folder, name), "r") as report_file:
+                timings[name[:-len("_profile.json")]] = json.load(report_file)["total"]
+
+    files = []
+    for relative_path, (size, file_hash) in sorted(file_hashes.items()):
+        top_name = relative_path.replace("\\", "/").split("/")[0]
+        # Exports record their asset, the reports get theirs from the file name
+        asset = assets.get(top_name) or os.path.splitext(top_name)[0]
+        if asset.startswith(scene_base + "_"):
+            asset = asset[len(scene_base) + 1:]
+        files.append({"file": relative_path, "asset": asset, "size": size, "sha1": file_hash,
+                      "frame_range": frame_ranges.get(relative_path)})
+
+    record = {
+        "shot": os.path.basename(os.path.dirname(anim_folder)),
+        "scene": scene_base,
+        "publish_folder": publish_folder,
+        "version": os.path.basename(version_folder),
+        "user": getpass.getuser(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "timestamp": time.time(),
+        "files": files,
+        "timings": timings,
+    }
+    line = (json.dumps(record) + "\n").encode("utf-8")
+    with catalog_lock():
+        with open(PublishCatalogPath, "ab+") as catalog:
+            # A line cut short by a crash gets closed first, so the records after it stay readable
+            catalog.seek(0, os.SEEK_END)
+            if catalog.tell() > 0:
+                catalog.seek(-1, os.SEEK_END)
+                if catalog.read(1) != b"\n":
+                    line = b"\n" + line
+            catalog.write(line)
+
+def create_staging_folder(base_path):
+    """Creates a private staging folder inside the hidden .staging folder of the given base path."""
+    staging_root = os.path.join(base_path, ".staging")
+    os.makedirs(staging_root, exist_ok=True)
+    if os.name == "nt":
+        # Hide it in the explorer so nobody grabs files from a publish that isn't finished
+        ctypes.windll.kernel32.SetFileAttributesW(staging_root, 0x02)
+    return tempfile.mkdtemp(prefix=f"{getpass.getuser()}_", dir=staging_root)
 
 def get_next_version_folder(base_path):
-    """Finds the next available version folder inside the given base path."""
-    version = 1
+    """Claims the next version number with an exclusive lock file and returns its (not yet created) folder path.
+
+    The latest version comes from the publish catalog, the folder only gets listed when the catalog doesn't know it yet.
+    """
+    published = [int(record["version"][1:]) for record in read_publish_catalog()
+                 if os.path.normcase(record["publish_folder"]) == os.path.normcase(base_path)]
     while True:
+        if published:
+            # Versions claimed or published since the last catalog line are skipped
+            version = max(published) + 1
+            while os.path.exists(os.path.join(base_path, f"V{version:02d}")) or os.path.exists(os.path.join(base_path, f"V{version:02d}.lock")):
+                version += 1
+        else:
+            # One listing to find the highest version, claimed numbers (.lock) count as taken too
+            taken = [int(match.group(1)) for match in map(VERSION_PATTERN.match, os.listdir(base_path)) if match]
+            version = max(taken, default=0) + 1
         version_folder = os.path.join(base_path, f"V{version:02d}")
-        if not os.path.exists(version_folder):
-            os.makedirs(version_folder)
-            return version_folder
-        version += 1
+        try:
+            os.close(os.open(version_folder + ".lock", os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            continue  # Someone claimed it between the listing and the lock, look again
+        return version_folder
+
+def promote_staging_folder(staging_folder, base_path):
+    """Renames a finished staging folder to the next version folder, so a version only ever shows up complete."""
+    version_folder = get_next_version_folder(base_path)
+    try:
+        os.rename(staging_folder, version_folder)
+    finally:
+        os.remove(version_folder + ".lock")
+    return version_folder
+
+def report_from_thread(message, warning=False):
+    """Prints a message from the upload thread, Maya only likes being talked to from the main thread."""
+    maya.utils.executeDeferred(cmds.warning if warning else print, message)
+
+def upload_file(source_path, destination_path):
+    """Copies a file in big chunks, then reads the copy back to check it against the source checksum."""
+    total_size = os.path.getsize(source_path)
+    source_hash = hashlib.sha1()
+    copied = 0
+    with open(source_path, "rb") as source, open(destination_path, "wb") as destination:
+        for chunk in iter(lambda: source.read(UploadChunkSize), b""):
+            destination.write(chunk)
+            source_hash.update(chunk)
+            copied += len(chunk)
+            if total_size > UploadChunkSize:
+                report_from_thread(f"Uploading {os.path.basename(source_path)}: {copied * 100 // total_size}%")
+
+    destination_hash = hashlib.sha1()
+    with open(destination_path, "rb") as destination:
+        for chunk in iter(lambda: destination.read(UploadChunkSize), b""):
+            destination_hash.update(chunk)
+
+    if destination_hash.digest() != source_hash.digest():
+        raise IOError(f"Checksum mismatch after uploading {source_path}")
+    return source_hash.hexdigest()
+
+def upload_publish(local_folder, publish_folder):
+    """Uploads a local export folder to a staging folder on the share, then promotes it to the next version."""
+    staging_folder = create_staging_folder(publish_folder)
+    file_hashes = {}
+    try:
+        for root, dirs, files in os.walk(local_folder):
+            target_root = os.path.join(staging_folder, os.path.relpath(root, local_folder))
+            os.makedirs(target_root, exist_ok=True)
+            for name in files:
+                source_path = os.path.join(root, name)
+                file_hash = upload_file(source_path, os.path.join(target_root, name))
+                file_hashes[os.path.relpath(source_path, local_folder)] = (os.path.getsize(source_path), file_hash)
+
+        version_folder = promote_staging_folder(staging_folder, publish_folder)
+    except Exception:
+        # The local files stay for another try (upload_worker), the half uploaded copy doesn't stay on the share
+        shutil.rmtree(staging_folder, ignore_errors=True)
+        raise
+    try:
+        append_to_publish_catalog(version_folder, publish_folder, file_hashes, local_folder)
+    except Exception as e:
+        report_from_thread(f"Couldn't add {version_folder} to the publish catalog: {e}", warning=True)
+    shutil.rmtree(local_folder, ignore_errors=True)
+    report_from_thread(f"Published version: {version_folder}")
+    launch_publish_validator(version_folder)
+    return version_folder
+
+def write_publish_manifest(version_folder, scene_name):
+    """Writes what the exports were meant to contain, for the validator. Adds to the manifest already there (bake worker)."""
+    manifest_path = os.path.join(version_folder, "publish_manifest.json")
+    alembics = []
+    assets = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as manifest_file:
+            manifest = json.load(manifest_file)
+        alembics = manifest["alembics"]
+        assets = manifest.get("assets", {})
+    with open(manifest_path, "w") as manifest_file:
+        json.dump({
+            "scene": scene_name,
+            "user": getpass.getuser(),
+            "fps": om.MTime(1.0, om.MTime.kSeconds).asUnits(om.MTime.uiUnit()),
+            "alembics": alembics + exported_alembics,
+            "assets": {**assets, **exported_assets},
+        }, manifest_file, indent=4)
+
+def get_validator_python():
+    """hython to run the validator with: ValidatorPython, $HFS, or the latest Houdini installed. None if there's none."""
+    candidates = [ValidatorPython]
+    if os.environ.get("HFS"):
+        candidates.append(os.path.join(os.environ["HFS"], "bin", "hython.exe" if os.name == "nt" else "hython"))
+    if os.path.isdir(HoudiniInstallDirectory):
+        for folder in sorted(os.listdir(HoudiniInstallDirectory), reverse=True):
+            candidates.append(os.path.join(HoudiniInstallDirectory, folder, "bin", "hython.exe"))
+    return next((path for path in candidates if path and os.path.exists(path)), None)
+
+def launch_publish_validator(version_folder):
+    """Starts the validator on a published version in its own process, it adds its results to the manifest."""
+    validator_python = get_validator_python()
+    if not os.path.exists(PublishValidatorPath) or validator_python is None:
+        # mayapy has no Alembic bindings, the validation would only read the headers and look like a pass
+        report_from_thread(f"Publish validator or hython not found, {version_folder} wasn't validated", warning=True)
+        return
+    subprocess.Popen([validator_python, PublishValidatorPath, version_folder],
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0)
+    report_from_thread(f"Validating {version_folder} in the background")
+
+def upload_worker():
+    """Runs the queued uploads one after the other."""
+    while True:
+        local_folder, publish_folder = upload_queue.get()
+        try:
+            upload_publish(local_folder, publish_folder)
+        except Exception as e:
+            report_from_thread(f"Upload failed, the exported files are kept in {local_folder}: {e}", warning=True)
+        finally:
+            upload_queue.task_done()
+
+def queue_upload(local_folder, publish_folder):
+    """Hands a finished local export folder over to the background uploader."""
+    global upload_thread
+    if upload_thread is None or not upload_thread.is_alive():
+        upload_thread = threading.Thread(target=upload_worker, daemon=True)
+        upload_thread.start()
+    upload_queue.put((local_folder, publish_folder))
+    print(f"Export written to {local_folder}, uploading to {publish_folder} in the background.")
 
 def get_full_paths(objects):
     """Finds the full object paths in the scene matching the given list (ignoring namespaces)."""
@@ -418,12 +1337,84 @@ def rename_cameras():
         print(f"Renamed: {obj} -> {new_name}")
 
 
-def export_abc(obj_list, export_name, version_folder, scene_name, start_frame, end_frame):
-    """Exports selected objects to Alembic."""
+def classify_export_roots(roots, start_frame, end_frame):
+    """Returns {root: "static" | "transform" | "deforming"} from world matrices and hashed mesh points.
+
+    A few frames are sampled first, then the roots that look static get confirmed together in one pass over every frame.
+    "transform" isn't confirmed frame by frame, it gets exported like a deforming root anyway.
+    """
+    time_unit = om.MTime.uiUnit()
+    sample_frames = np.unique(np.linspace(start_frame, end_frame, StaticSampleCount).round())
+    classes = {}
+    root_plugs = {}
+    for root in roots:
+        transforms = cmds.ls(root, dag=True, type="transform", long=True) or []
+        shapes = cmds.ls(root, dag=True, shapes=True, noIntermediate=True, long=True) or []
+        meshes = cmds.ls(shapes, type="mesh", long=True) or []
+        if len(meshes) != len(shapes):
+            classes[root] = "deforming"  # Only mesh points get hashed, anything else is exported as it was
+            continue
+
+        selection = om.MSelectionList()
+        for transform in transforms:
+            selection.add(f"{transform}.worldMatrix[0]")
+        for mesh in meshes:
+            selection.add(f"{mesh}.outMesh")
+        plugs = [selection.getPlug(index) for index in range(selection.length())]
+        root_plugs[root] = (plugs[:len(transforms)], plugs[len(transforms):])
+
+    def sample(root, context):
+        matrix_plugs, mesh_plugs = root_plugs[root]
+        matrices = np.array([list(om.MFnMatrixData(plug.asMObject(context)).matrix()) for plug in matrix_plugs])
+        points_hash = hashlib.sha1()
+        for plug in mesh_plugs:
+            points_hash.update(np.array(om.MFnMesh(plug.asMObject(context)).getPoints(), dtype=np.float64).tobytes())
+        return matrices, points_hash.digest()
+
+    def frame_context(frame):
+        return om.MDGContext(om.MTime(float(frame), time_unit))
+
+    def changes(frames, candidates, stop_when_moved):
+        """{root: (moved, deformed)} over the frames, every candidate is read on the same evaluation of each frame."""
+        found = {root: (False, False) for root in candidates}
+        for frame in frames:
+            pending = [root for root in candidates if not found[root][1] and not (stop_when_moved and found[root][0])]
+            if not pending:
+                break
+            context = frame_context(frame)
+            for root in pending:
+                matrices, points_hash = sample(root, context)
+                found[root] = (found[root][0] or not np.allclose(matrices, references[root][0], atol=1e-6),
+                               points_hash != references[root][1])
+        return found
+
+    start_context = frame_context(start_frame)
+    references = {root: sample(root, start_context) for root in root_plugs}
+    found = changes(sample_frames[1:], list(root_plugs), stop_when_moved=False)
+    candidates = [root for root, (moved, deformed) in found.items() if not moved and not deformed]
+    found.update(changes(range(int(start_frame) + 1, int(end_frame) + 1), candidates, stop_when_moved=True))
+    for root, (moved, deformed) in found.items():
+        classes[root] = "deforming" if deformed else "transform" if moved else "static"
+    return {root: classes[root] for root in roots}
+
+def export_abc(obj_list, export_name, version_folder, scene_name, start_frame, end_frame, split_static=True):
+    """Exports selected objects to Alembic, the static ones to their own single frame file when SplitStaticObjects is on."""
     if not obj_list:
         cmds.warning(f"No objects found for {export_name} export!")
         return
 
+    if split_static and SplitStaticObjects:
+        update_export_progress(f"Looking for static objects in {export_name}...")
+        with timed_span(f"classify {export_name}", roots=len(obj_list)) as span:
+            classes = classify_export_roots(obj_list, start_frame, end_frame)
+            span["static"] = list(classes.values()).count("static")
+        static_objects = [obj for obj in obj_list if classes[obj] == "static"]
+        if static_objects:
+            export_abc(static_objects, f"{export_name}_STATIC", version_folder, scene_name, start_frame, start_frame, split_static=False)
+            obj_list = [obj for obj in obj_list if classes[obj] != "static"]
+            if not obj_list:
+                return
+
     export_filename = "{}_{}.abc".format(scene_name.rsplit(".", 1)[0], export_name)
     full_export_path = os.path.join(version_folder, export_filename).replace("\\", "/")
 
@@ -432,10 +1423,29 @@ def export_abc(obj_list, export_name, version_folder, scene_name, start_frame, e
     # Correctly format -root flags
     root_flags = " ".join(["-root " + obj for obj in obj_list])
 
-    cmds.AbcExport(
-        j=f"-frameRange {start_frame} {end_frame} -uvWrite -worldSpace -writeVisibility -writeUVSets -dataFormat ogawa {root_flags} -file {full_export_path}"
-    )
-
+    update_export_progress(f"Exporting {export_name}...", end_frame - start_frame + 1)
+    # AbcExport runs it in __main__, so it goes through this module whatever name it was imported as (no spaces allowed)
+    progress_callback = f"__import__('{__name__}').abc_frame_progress(#FRAME#,{start_frame})"
+
+    with timed_span(f"export_abc {export_name}", frames=end_frame - start_frame + 1, roots=len(obj_list),
+                    nodes=len(cmds.ls(obj_list, dag=True))) as span:
+        cmds.AbcExport(
+            j=f"-frameRange {start_frame} {end_frame} -uvWrite -worldSpace -writeVisibility -writeUVSets -dataFormat ogawa -pythonPerFrameCallback {progress_callback} {root_flags} -file {full_export_path}"
+        )
+        span["file_size"] = os.path.getsize(full_export_path)
+
+    # What the file should hold, for the validator. Bounds only when the current frame is one that got exported
+    current_frame = cmds.currentTime(query=True)
+    exported_assets[export_filename] = export_name
+    exported_alembics.append({
+        "file": export_filename,
+        "frame_range": [start_frame, end_frame],
+        "roots": [obj.rsplit("|", 1)[-1] for obj in obj_list],
+        "object_count": len(set(cmds.ls(obj_list, dag=True, noIntermediate=True, long=True)) -
+                            set(cmds.ls(obj_list, dag=True, type="constraint", long=True))),
+        "bounds": cmds.exactWorldBoundingBox(obj_list) if start_frame <= current_frame <= end_frame else None,
+        "bounds_frame": current_frame if start_frame <= current_frame <= end_frame else None,
+    })
     print(f"Exported: {full_export_path}")
 
 def select_cameras():
@@ -452,9 +1462,293 @@ def select_cameras():
 
     return leaf_cams
 
+def export_point_cache(roots, version_folder, cache_name, start_frame, end_frame):
+    """Writes a memory-mappable point cache for FX: one frames x points x 3 float32 .npy per mesh, plus a topology header.
+
+    World space points in cm, sampled in a single pass over the timeline. np.load(path, mmap_mode="r") reads any frame without Alembic.
+    """
+    if not roots:
+        cmds.warning(f"No objects found for {cache_name} point cache!")
+        return None
+
+    frames = np.arange(start_frame, end_frame + 1, dtype=np.float64)
+    cache_folder = os.path.join(version_folder, f"{cache_name}_points")
+    os.makedirs(cache_folder, exist_ok=True)
+    meshes = cmds.ls(roots, dag=True, type="mesh", noIntermediate=True, long=True) or []
+
+    header = {"frames": [float(frames[0]), float(frames[-1])],
+              "fps": om.MTime(1.0, om.MTime.kSeconds).asUnits(om.MTime.uiUnit()),
+              "space": "world", "unit": "cm", "meshes": []}
+    mesh_caches = []
+    for mesh in meshes:
+        selection = om.MSelectionList()
+        selection.add(mesh)
+        mesh_fn = om.MFnMesh(selection.getDagPath(0))
+        name = cmds.listRelatives(mesh, parent=True)[0].split(":")[-1]
+        face_counts, face_connects = mesh_fn.getVertices()
+        np.savez(os.path.join(cache_folder, f"{name}_topology.npz"),
+                 face_vertex_counts=np.array(face_counts, dtype=np.int32),
+                 face_vertex_indices=np.array(face_connects, dtype=np.int32))
+
+        # Preallocated on disk, filled frame by frame
+        points = np.lib.format.open_memmap(os.path.join(cache_folder, f"{name}.npy"), mode="w+",
+                                           dtype=np.float32, shape=(len(frames), mesh_fn.numVertices, 3))
+        world_mesh_plug = om.MFnDependencyNode(selection.getDependNode(0)).findPlug("worldMesh", False).elementByLogicalIndex(0)
+        mesh_caches.append((world_mesh_plug, points))
+        header["meshes"].append({"name": name, "dag_path": mesh, "points": f"{name}.npy", "topology": f"{name}_topology.npz",
+                                 "point_count": mesh_fn.numVertices, "face_count": mesh_fn.numPolygons})
+
+    time_unit = om.MTime.uiUnit()
+    for frame_index, frame in enumerate(frames):
+        context = om.MDGContext(om.MTime(frame, time_unit))
+        for world_mesh_plug, points in mesh_caches:
+            frame_points = om.MFnMesh(world_mesh_plug.asMObject(context)).getPoints()
+            points[frame_index] = np.array(frame_points, dtype=np.float32)[:, :3]
+
+    for world_mesh_plug, points in mesh_caches:
+        points.flush()
+    with open(os.path.join(cache_folder, "header.json"), "w") as header_file:
+        json.dump(header, header_file, indent=4)
+    print(f"Exported point cache to: {cache_folder}")
+    return cache_folder
+
+def export_camera_cache(cameras, version_folder, base_name, start_frame, end_frame):
+    """Writes a light .npz camera cache (world matrices, focal length, film back, clipping) that loads without Maya."""
+    frames = np.arange(start_frame, end_frame + 1, dtype=np.float64)
+    camera_plugs = []
+    for cam in cameras:
+        shape = (cmds.listRelatives(cam, shapes=True, type="camera", fullPath=True) or [None])[0]
+        if not shape:
+            continue
+        selection = om.MSelectionList()
+        selection.add(cam)
+        selection.add(shape)
+        transform_fn = om.MFnDependencyNode(selection.getDependNode(0))
+        shape_fn = om.MFnDependencyNode(selection.getDependNode(1))
+        matrix_plug = transform_fn.findPlug("worldMatrix", False).elementByLogicalIndex(0)
+        shape_plugs = [shape_fn.findPlug(attr, False) for attr in
+                       ("focalLength", "horizontalFilmAperture", "verticalFilmAperture", "nearClipPlane", "farClipPlane")]
+        camera_plugs.append((cam, matrix_plug, shape_plugs))
+
+    # Preallocated arrays, filled in a single pass over the timeline without moving the current time
+    world_matrices = np.zeros((len(camera_plugs), len(frames), 4, 4))
+    shape_values = np.zeros((len(camera_plugs), len(frames), 5))
+    time_unit = om.MTime.uiUnit()
+    for frame_index, frame in enumerate(frames):
+        context = om.MDGContext(om.MTime(frame, time_unit))
+        for cam_index, (cam, matrix_plug, shape_plugs) in enumerate(camera_plugs):
+            matrix = om.MFnMatrixData(matrix_plug.asMObject(context)).matrix()
+            world_matrices[cam_index, frame_index] = np.reshape(list(matrix), (4, 4))
+            shape_values[cam_index, frame_index] = [plug.asDouble(context) for plug in shape_plugs]
+
+    cache_path = os.path.join(version_folder, f"{base_name}_cameras.npz")
+    np.savez(
+        cache_path,
+        cameras=np.array([cam.rsplit("|", 1)[-1] for cam, _, _ in camera_plugs]),
+        frames=frames,
+        fps=np.float64(om.MTime(1.0, om.MTime.kSeconds).asUnits(time_unit)),
+        world_matrix=world_matrices,  # Maya convention: row vectors, translation on the last row, in cm
+        focal_length=shape_values[:, :, 0],  # mm
+        film_back=shape_values[:, :, 1:3],  # horizontal/vertical aperture in inches
+        clipping=shape_values[:, :, 3:5],  # near/far in cm
+    )
+    print(f"Exported camera cache to: {cache_path}")
+    return cache_path
+
+def get_bake_cache_key(objects):
+    """Hashes everything the bake result depends on: the controllers' curves, the rigs, the cloth pose, the range and the bake settings."""
+    key_hash = hashlib.sha1()
+    curve_connections = get_curve_connections(objects)
+    curve_data = read_curves(curve_connections.values())
+    for (obj, attr), curve in sorted(curve_connections.items()):
+        times, values = curve_data[curve]
+        key_hash.update(f"{obj}.{attr}".encode("utf-8"))
+        key_hash.update(times.tobytes())
+        key_hash.update(values.tobytes())
+
+    # Tangents change the evaluated animation too
+    curves = sorted(curve_connections.values())
+    if curves:
+        for flag in ("inAngle", "outAngle", "inWeight", "outWeight", "inTangentType", "outTangentType"):
+            key_hash.update(repr(cmds.keyTangent(curves, query=True, **{flag: True})).encode("utf-8"))
+
+    for namespace in sorted(get_iouri_index()):
+        root = cmds.ls(f"{namespace}:Iouri_Iouri" if namespace else "Iouri_Iouri", long=True)[0]
+        if cmds.referenceQuery(root, isNodeReferenced=True):
+            key_hash.update(get_rig_file_hash(cmds.referenceQuery(root, filename=True, withoutCopyNumber=True)).encode("utf-8"))
+        key_hash.update(namespace.encode("utf-8"))
+
+    with open(ClothPoseFile, "rb") as pose_file:
+        key_hash.update(pose_file.read())
+    settings = (cmds.playbackOptions(q=True, min=True), cmds.playbackOptions(q=True, max=True),
+                BakeEngine, BakeTolerance, KeyReduction, sorted(KeyReductionTolerance.items()))
+    key_hash.update(repr(settings).encode("utf-8"))
+    return key_hash.hexdigest()
+
+def write_bake_cache(cache_path, cache_key, objects):
+    """Saves the baked curves of the objects, times and values in UI units, to a compressed npz."""
+    curve_connections = get_curve_connections(objects)
+    curve_types = {curve: curve_type for curve_type in TIME_CURVE_TYPES for curve in cmds.ls(list(curve_connections.values()), type=curve_type)}
+    curve_data = read_curves(curve_connections.values())
+    plugs = [f"{obj}.{attr}" for obj, attr in curve_connections]
+    curves = list(curve_connections.values())
+
+    temp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(temp_path,
+                        key=cache_key,
+                        plugs=np.array(plugs, dtype=str),
+                        curve_types=np.array([curve_types[curve] for curve in curves], dtype=str),
+                        key_counts=np.array([len(curve_data[curve][0]) for curve in curves], dtype=np.int64),
+                        times=np.concatenate([curve_data[curve][0] for curve in curves] or [np.empty(0)]),
+                        values=np.concatenate([curve_data[curve][1] for curve in curves] or [np.empty(0)]))
+    os.replace(temp_path, cache_path)
+    print(f"Bake cache written: {cache_path}")
+
+def restore_bake_cache(cache, objects):
+    """Replaces the curves of the objects by the cached ones, with commands so it stays a single undo step."""
+    old_curves = list(get_curve_connections(objects).values())
+    deletable = sorted(set(old_curves) - set(cmds.ls(old_curves, readOnly=True)))
+    if deletable:
+        cmds.delete(deletable)
+
+    offsets = np.concatenate([[0], np.cumsum(cache["key_counts"])])
+    new_curves = []
+    for index, (plug, curve_type) in enumerate(zip(cache["plugs"], cache["curve_types"])):
+        times = cache["times"][offsets[index]:offsets[index + 1]]
+        values = cache["values"][offsets[index]:offsets[index + 1]]
+        curve = cmds.createNode(str(curve_type), name=str(plug).replace(".", "_").replace(":", "_"), skipSelect=True)
+        if len(times):
+            # Same as a .ma file, every time/value pair of the curve in one setAttr
+            cmds.setAttr(f"{curve}.ktv[0:{len(times) - 1}]", *np.column_stack([times, values]).ravel().tolist())
+        cmds.connectAttr(f"{curve}.output", str(plug), force=True)
+        new_curves.append(curve)
+
+    if new_curves:
+        cmds.keyTangent(new_curves, inTangentType="linear", outTangentType="linear")
+    print(f"Bake reloaded from the cache: {len(new_curves)} curves.")
+
+def bake_iouri_with_cache(scene_path=None):
+    """Bakes the selected controllers, or reloads the last bake of the exact same animation from the scene's bake cache.
+
+    scene_path is the artist's scene the cache sits next to, the open scene when it isn't given. Runs as one undo step either way.
+    """
+    selected_objects = cmds.ls(selection=True)
+    scene_path = scene_path or cmds.file(q=True, sceneName=True)
+    # Layered animation isn't connected straight to the controllers, always bake it
+    if not BakeCacheEnabled or not selected_objects or not scene_path or len(cmds.ls(type="animLayer")) > 1:
+        bake_selected_animation()
+        return
+
+    cache_path = f"{os.path.splitext(scene_path)[0]}_bake.npz"
+    cmds.undoInfo(openChunk=True, chunkName="bake_selected_animation")
+    try:
+        with timed_span("bake_cache_key", nodes=len(selected_objects)):
+            cache_key = get_bake_cache_key(selected_objects)
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as cache:
+                if str(cache["key"]) == cache_key:
+                    with timed_span("bake_cache_restore"):
+                        restore_bake_cache(cache, selected_objects)
+                    return
+
+        bake_selected_animation()
+        try:
+            with timed_span("bake_cache_write"):
+                write_bake_cache(cache_path, cache_key, selected_objects)
+        except OSError as e:
+            cmds.warning(f"Couldn't write the bake cache: {e}")
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+def get_worker_script_path():
+    """This script's path for the bake worker, the share copy when it was pasted in the Script Editor."""
+    script_path = globals().get("__file__")
+    if script_path and os.path.isfile(script_path):
+        return script_path
+    return WorkerScriptPath
+
+def export_iouri_assets(version_folder, scene_name, start_frame, end_frame):
+    """Exports Iouri's FX, SHD and EYES alembics from the (baked) scene."""
+    # Object lists (without namespaces)
+    fx_objects = ["gp_retopo_shoe_L", "gp_retopo_shoe_R", "msh_body_low3"]
+    shd_objects = ["GP_inside_mouth_low", "gp_eye_elements", "gp_retopo_shoe_L",
+                   "gp_retopo_shoe_R", "msh_body_low3", "msh_nails_low"]
+    eyes_objects = ["gp_eye_elements"]
+
+    export_abc(get_full_paths(fx_objects), "IOURI_FX", version_folder, scene_name, start_frame, end_frame)
+    if ExportFxPointCache == True:
+        update_export_progress("Exporting IOURI_FX point cache...")
+        with timed_span("export_point_cache IOURI_FX", frames=end_frame - start_frame + 1):
+            cache_folder = export_point_cache(get_full_paths(fx_objects), version_folder, f"{scene_name.rsplit('.', 1)[0]}_IOURI_FX", start_frame, end_frame)
+            if cache_folder:
+                exported_assets[os.path.basename(cache_folder)] = "IOURI_FX"
+    export_abc(get_full_paths(shd_objects), "IOURI_SHD", version_folder, scene_name, start_frame, end_frame)
+    export_abc(get_full_paths(eyes_objects), "IOURI_EYES", version_folder, scene_name, start_frame, end_frame)
+
+def bake_iouri_in_worker(version_folder, scene_name, start_frame, end_frame):
+    """Bakes and exports Iouri from a snapshot of the scene in a headless mayapy, the artist's scene is never touched."""
+    snapshot_folder = tempfile.mkdtemp(prefix="snapshot_", dir=LocalScratchDirectory)
+    snapshot_path = os.path.join(snapshot_folder, "snapshot.mb").replace("\\", "/")
+    log_path = os.path.join(snapshot_folder, "bake_worker.log")
+    worker = None
+    try:
+        # Unsaved changes included, references stay references so the snapshot stays small
+        update_export_progress("Saving a snapshot of the scene...")
+        with timed_span("scene_snapshot") as span:
+            cmds.file(snapshot_path, exportAll=True, preserveReferences=True, type="mayaBinary", force=True)
+            span["file_size"] = os.path.getsize(snapshot_path)
+
+        mayapy = os.path.join(os.environ["MAYA_LOCATION"], "bin", "mayapy.exe" if os.name == "nt" else "mayapy")
+        command = [mayapy, get_worker_script_path(), "--bake-worker", snapshot_path, version_folder, scene_name,
+                   cmds.file(q=True, sceneName=True), str(start_frame), str(end_frame),
+                   str(int(SplitStaticObjects)), str(int(ExportFxPointCache))]
+        with timed_span("bake_worker", frames=end_frame - start_frame + 1), open(log_path, "w") as log_file:
+            worker = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT,
+                                      creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0)
+            # Keeps the progress window alive, Esc kills the worker
+            while worker.poll() is None:
+                update_export_progress("Baking and exporting Iouri in a background Maya...")
+                time.sleep(0.5)
+
+        if worker.returncode != 0:
+            with open(log_path, "r") as log_file:
+                print(log_file.read())
+            raise ExportFailed(f"Iouri's bake worker failed (exit code {worker.returncode}), see the log above.")
+    finally:
+        if worker and worker.poll() is None:
+            worker.kill()
+            worker.wait()
+        shutil.rmtree(snapshot_folder, ignore_errors=True)
+
+def run_bake_worker(args):
+    """Entry point of the headless bake: opens the snapshot, bakes Iouri and exports its alembics into the version folder."""
+    global SplitStaticObjects, ExportFxPointCache
+    snapshot_path, version_folder, scene_name, scene_path = args[:4]
+    start_frame, end_frame = int(args[4]), int(args[5])
+    # Same options as the popup of the artist's Maya
+    SplitStaticObjects, ExportFxPointCache = args[6] == "1", args[7] == "1"
+
+    cmds.loadPlugin("AbcExport", quiet=True)
+    cmds.file(snapshot_path, open=True, force=True)
+    profile_spans.clear()
+    exported_alembics.clear()
+    exported_assets.clear()
+
+    with timed_span("select_iouri_controllers") as span:
+        select_iouri_controllers()
+        controllers = cmds.ls(selection=True)
+        span["nodes"] = len(controllers)
+    with timed_span("bake_selected_animation", frames=end_frame - start_frame + 1):
+        bake_iouri_with_cache(scene_path)
+    # QC report published with the alembics, before they get exported. On the baked controllers, not what the bake left selected
+    with timed_span("bake_qc"):
+        write_bake_qc_report(controllers, os.path.join(version_folder, f"{scene_name.rsplit('.', 1)[0]}_bake_qc.json"))
+    export_iouri_assets(version_folder, scene_name, start_frame, end_frame)
+    write_profile_report(version_folder, f"{scene_name.rsplit('.', 1)[0]}_bake_worker")
+    write_publish_manifest(version_folder, scene_name)
+
 def export_alembic():
-    
-    Iouri_Exported = False #Base Value for Undo Hack
+    global active_export_folder
     
     # Get the scene file name
     scene_name = cmds.file(q=True, sn=True, shn=True)
@@ -472,8 +1766,15 @@ def export_alembic():
     anim_folder = os.path.join(shot_folder, scene_name.rsplit(".", 1)[0])
     publish_folder = os.path.join(anim_folder, "_published")
 
-    # Get the next available version folder
-    version_folder = get_next_version_folder(publish_folder)
+    # Everything is written to the local disk first, the uploader then stages and promotes it on the share
+    os.makedirs(LocalScratchDirectory, exist_ok=True)
+    version_folder = tempfile.mkdtemp(prefix=f"{base_name}_", dir=LocalScratchDirectory)
+    active_export_folder = version_folder
+
+    # Fresh timing report and manifest for this publish
+    profile_spans.clear()
+    exported_alembics.clear()
+    exported_assets.clear()
 
     # Get the last frame of the current scene
     start_frame = StartFrame
@@ -487,26 +1788,11 @@ def export_alembic():
     
     if iouri_rig_found:
         print("Iouri Rig found! Proceeding with export.")
-        # Object lists (without namespaces)
-        fx_objects = ["gp_retopo_shoe_L", "gp_retopo_shoe_R", "msh_body_low3"]
-        shd_objects = ["GP_inside_mouth_low", "gp_eye_elements", "gp_retopo_shoe_L",
-                       "gp_retopo_shoe_R", "msh_body_low3", "msh_nails_low"]
-        eyes_objects = ["gp_eye_elements"]
 
         # Export Iouri's assets
         if ExportIouri == True :
-            #crazy stuff happens here
-            # Run selection function before baking
-            select_iouri_controllers()
-            #Bake in the export function ??
-            bake_selected_animation()
-		    
-            export_abc(get_full_paths(fx_objects), "IOURI_FX", version_folder, scene_name, start_frame, end_frame)
-            export_abc(get_full_paths(shd_objects), "IOURI_SHD", version_folder, scene_name, start_frame, end_frame)
-            export_abc(get_full_paths(eyes_objects), "IOURI_EYES", version_folder, scene_name, start_frame, end_frame)
-            
-            #UNDO HACK SETUP
-            Iouri_Exported = True
+            #crazy stuff happens here, in a background Maya so the scene stays as it is
+            bake_iouri_in_worker(version_folder, scene_name, start_frame, end_frame)
             
         else : 
             print("Iouri Export variable is set to false, ignoring Iouri for export")
@@ -561,20 +1847,40 @@ def export_alembic():
         
         # Export cameras as .mb file
         if ExportCameras == True:
+            update_export_progress("Exporting cameras .mb...")
             cmds.select(selected_cameras)
-            cmds.file(camera_file_path, exportSelected=True, type="mayaBinary")
-            export_abc(selected_cameras, "CAMERAS", version_folder, scene_name, start_frame, end_frame)
+            with timed_span("export_cameras_mb", nodes=len(selected_cameras)) as span:
+                cmds.file(camera_file_path, exportSelected=True, type="mayaBinary")
+                span["file_size"] = os.path.getsize(camera_file_path)
+            exported_assets[camera_filename] = "CAMERAS"
+            export_abc(selected_cameras, "CAMERAS", version_folder, scene_name, start_frame, end_frame, split_static=False)
+            update_export_progress("Exporting camera cache...")
+            with timed_span("export_camera_cache", frames=end_frame - start_frame + 1, nodes=len(selected_cameras)) as span:
+                camera_cache_path = export_camera_cache(selected_cameras, version_folder, base_name, start_frame, end_frame)
+                span["file_size"] = os.path.getsize(camera_cache_path)
+            exported_assets[os.path.basename(camera_cache_path)] = "CAMERAS"
             print(f"Exported cameras to: {camera_file_path}")
         else: 
             print("Export camera is set to False, not exporting cameras")
     else:
         print("No cameras found to export.")
-    
-        # UNDO HACK if iouri was baked                           
-    if Iouri_Exported == True:
-        cmds.evalDeferred(lambda: cmds.undo())  # Delayed undo
-        print("Undo cause Iouri was Baked")   
-        Iouri_Exported = False
+
+    # Last chance to cancel before the files are handed to the uploader
+    update_export_progress("Uploading in the background...")
+
+    # Upload and promote the exported files to the next version, or drop the folder if nothing was exported
+    if os.listdir(version_folder):
+        write_profile_report(version_folder, scene_name.rsplit(".", 1)[0])
+        write_publish_manifest(version_folder, scene_name)
+        queue_upload(version_folder, publish_folder)
     else:
-        print ("Didn't Undo")                               
-    
\ No newline at end of file
+        shutil.rmtree(version_folder, ignore_errors=True)
+        print("Nothing was exported, no version published.")
+
+
+# Headless worker bakes and exports Iouri, otherwise display the popup, now that everything it uses is defined
+if "--bake-worker" in sys.argv:
+    run_bake_worker(sys.argv[sys.argv.index("--bake-worker") + 1:])
+    maya.standalone.uninitialize()
+else:
+    export_options_popup()